@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.db_connection import primary_session
+from app.models import CacheVersion
+
+
+class VersionedCache:
+    """Per-worker snapshot of a table, rebuilt lazily when it goes stale.
+
+    Writes in this worker call invalidate() after their commit. Writes from
+    other workers are noticed through the cache_version row of the table,
+    which is read at most once every check_interval seconds.
+
+    The version check and rebuild always read the primary: a snapshot built
+    from a lagging replica would serve stale rows to every client of the
+    worker, including the one that just wrote.
+    """
+
+    def __init__(self, name: str, build, check_interval: float):
+        self.name = name
+        self.build = build
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def get_version(self, db: Session):
+        name = self.name
+        return db.scalar(
+            lambda_stmt(
+                lambda: select(CacheVersion.version).where(CacheVersion.name == name)
+            )
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    def get(self, db: Session):
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and time.monotonic() - self._checked_at < self.check_interval
+        ):
+            return snapshot
+
+        with self._lock, primary_session(db) as primary:
+            version = self.get_version(primary)
+            if self._snapshot is None or version != self._version:
+                self._snapshot = self.build(primary)
+                self._version = version
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+
+class TTLCache:
+    """Small per-worker LRU cache whose entries also expire after ttl seconds.
+
+    For results that are cheap to recompute but requested over and over, where
+    serving something up to ttl seconds old is acceptable.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import sys
+
+from app.config import EXPORT_BATCH_SIZE, IMPORT_CHUNK_SIZE
+from app.db_connection import SessionLocal
+from app.utils.product_export import EXPORT_WRITERS, export_products
+from app.utils.product_import import IMPORT_READERS, get_import_format, import_products
+
+
+def import_command(args):
+    import_format = args.format or get_import_format(args.path)
+    with open(args.path, encoding="utf-8", newline="") as lines:
+        with SessionLocal() as db:
+            result = import_products(db, lines, import_format, args.chunk_size)
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if result["skipped"] else 0
+
+
+def export_command(args):
+    batches = export_products(args.format, args.after_id, args.gzip, args.batch_size)
+    if args.output == "-":
+        sys.stdout.buffer.writelines(batches)
+    else:
+        with open(args.output, "wb") as output:
+            output.writelines(batches)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser(
+        "import", help="stream a CSV or NDJSON product feed into the catalog"
+    )
+    importer.add_argument("path")
+    importer.add_argument(
+        "--format",
+        choices=sorted(IMPORT_READERS),
+        help="defaults to the file extension",
+    )
+    importer.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    importer.set_defaults(handler=import_command)
+
+    exporter = commands.add_parser(
+        "export", help="stream the catalog as CSV or NDJSON, in product id order"
+    )
+    exporter.add_argument("--format", choices=sorted(EXPORT_WRITERS), default="ndjson")
+    exporter.add_argument("--gzip", action="store_true")
+    exporter.add_argument(
+        "--after-id", type=int, help="resume after the last product received complete"
+    )
+    exporter.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    exporter.add_argument("-o", "--output", default="-", help="defaults to stdout")
+    exporter.set_defaults(handler=export_command)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except ValueError as error:
+        parser.error(str(error))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import os
+
+
+def get_bool_env(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+DEV_DATABASE_URL = os.getenv("DEV_DATABASE_URL")
+
+# serve the category write routes with an asyncpg AsyncSession instead of the
+# sync psycopg2 Session (which runs each request in Starlette's threadpool)
+DB_ASYNC_MODE = get_bool_env("DB_ASYNC_MODE")
+
+# connection pool, per engine and per worker process: keep
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below Postgres max_connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_PRE_PING = get_bool_env("DB_POOL_PRE_PING")
+
+# answer category tree reads from the category_closure table instead of
+# walking category.parent_id with a recursive CTE
+CATEGORY_CLOSURE_TABLE = get_bool_env("CATEGORY_CLOSURE_TABLE")
+
+# seconds between cache_version checks of the in-process caches, i.e. how long
+# other workers may serve a snapshot older than a committed write
+CACHE_CHECK_INTERVAL = float(os.getenv("CACHE_CHECK_INTERVAL", "1"))
+
+# fallback lazy loader strategy of the ORM relationships, the test suite runs
+# with "raise_on_sql" so that any load not covered by a loader preset fails
+ORM_LAZY_LOAD = os.getenv("ORM_LAZY_LOAD", "select")
+
+# per-worker cache of suggest results, keyed by the normalised query
+SUGGEST_CACHE_SIZE = int(os.getenv("SUGGEST_CACHE_SIZE", "1024"))
+SUGGEST_CACHE_TTL = float(os.getenv("SUGGEST_CACHE_TTL", "30"))
+
+# products validated, staged and merged per transaction by the catalog import
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+# rows fetched per round trip from the export's server-side cursor, and sent
+# to the client as one chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# comma separated read replica URLs, GET routes are balanced over them round
+# robin. Empty serves reads from the primary
+DB_REPLICA_URLS = [url for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url]
+# seconds a client reads from the primary after a write (read your writes),
+# cover the replica lag
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+
+# compiled SQL statements kept per engine (SQLAlchemy's query_cache_size), hit
+# rates are served at /api/db/statement-cache
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+# log statements running at least this many seconds, with their parameter
+# values redacted. Negative disables the log
+DB_SLOW_QUERY_SECONDS = float(os.getenv("DB_SLOW_QUERY_SECONDS", "0.5"))
+# report each request's query count and database time in a Server-Timing
+# header, off by default as it tells clients about the database
+DB_SERVER_TIMING = get_bool_env("DB_SERVER_TIMING")
+
+# directory the uvicorn workers share their Prometheus samples through, read by
+# prometheus_client itself. Must exist and be emptied before the server starts,
+# unset with a single worker
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
@@ -1,20 +1,168 @@
-import os
+from contextlib import contextmanager
+from itertools import cycle
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-DEV_DATABASE_URL = os.getenv("DEV_DATABASE_URL")
+from app.config import (
+    DB_ASYNC_MODE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_QUERY_CACHE_SIZE,
+    DB_REPLICA_STICKY_SECONDS,
+    DB_REPLICA_URLS,
+    DB_SLOW_QUERY_SECONDS,
+    DEV_DATABASE_URL,
+)
+from app.db_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    register_pool_metrics,
+    register_query_timing,
+    register_statement_cache_metrics,
+)
 
-engine = create_engine(DEV_DATABASE_URL)
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+ENGINE_OPTIONS = {**POOL_OPTIONS, "query_cache_size": DB_QUERY_CACHE_SIZE}
+
+engine = create_engine(
+    DEV_DATABASE_URL, poolclass=InstrumentedQueuePool, **ENGINE_OPTIONS
+)
+register_pool_metrics(engine, "primary")
+register_statement_cache_metrics(engine, "primary")
+register_query_timing(engine, DB_SLOW_QUERY_SECONDS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=True, bind=engine)
 
+replica_engines = []
+for index, replica_url in enumerate(DB_REPLICA_URLS):
+    replica_engines.append(
+        create_engine(replica_url, poolclass=InstrumentedQueuePool, **ENGINE_OPTIONS)
+    )
+    register_pool_metrics(replica_engines[-1], f"replica_{index}")
+    register_statement_cache_metrics(replica_engines[-1], f"replica_{index}")
+    register_query_timing(replica_engines[-1], DB_SLOW_QUERY_SECONDS)
+replica_cycle = cycle(replica_engines)
+
+# the async engine is only built when enabled, so asyncpg stays optional
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC_MODE:
+    async_engine = create_async_engine(
+        make_url(DEV_DATABASE_URL).set(drivername="postgresql+asyncpg"),
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        **ENGINE_OPTIONS,
+    )
+    register_pool_metrics(async_engine.sync_engine, "primary_async")
+    register_statement_cache_metrics(async_engine.sync_engine, "primary_async")
+    register_query_timing(async_engine.sync_engine, DB_SLOW_QUERY_SECONDS)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=True, expire_on_commit=False
+    )
+
 Base = declarative_base()
 
 
-def get_db_session():
+# a client that committed a write is pinned to the primary for its next reads,
+# see ReadYourWritesMiddleware
+READ_PRIMARY_COOKIE = "db_read_primary"
+
+
+def mark_request_wrote(request: Request | None):
+    # every commit counts as a write: the write routes' statements cannot all
+    # be told apart from reads, e.g. an UPDATE ... RETURNING inside a select()
+    if request is not None:
+        request.state.db_wrote = True
+
+
+def get_read_engine():
+    # round robin over the replicas, the primary when there are none
+    return next(replica_cycle, engine)
+
+
+@contextmanager
+def primary_session(db):
+    # db itself unless it may be bound to a replica, then a short lived session
+    # of the primary, for reads that must not see replica lag
+    if not replica_engines or db.get_bind() is engine:
+        yield db
+    else:
+        with SessionLocal(bind=engine) as primary:
+            yield primary
+
+
+def get_db_session(request: Request = None):
+    # one session per request: commit what the route left pending, roll back on
+    # any error, and always close so the connection goes back to the pool
     db = SessionLocal()
     try:
-        return db
+        yield db
+        db.commit()
+        mark_request_wrote(request)
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
+
+
+def get_read_db_session(request: Request = None):
+    # read only routes, served by a replica unless this client wrote within the
+    # last DB_REPLICA_STICKY_SECONDS and must see its own writes
+    pinned = request is not None and READ_PRIMARY_COOKIE in request.cookies
+    db = SessionLocal(bind=engine if pinned else get_read_engine())
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db_session(request: Request = None):
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+            mark_request_wrote(request)
+        except Exception:
+            await db.rollback()
+            raise
+
+
+class ReadYourWritesMiddleware:
+    """Set the READ_PRIMARY_COOKIE on responses to requests that committed a
+    write, a pure ASGI middleware so streamed responses pass through as is."""
+
+    def __init__(self, app, max_age: int = DB_REPLICA_STICKY_SECONDS):
+        self.app = app
+        self.cookie = (
+            f"{READ_PRIMARY_COOKIE}=1; Max-Age={max_age}; Path=/; HttpOnly; "
+            "SameSite=lax"
+        ).encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_engines:
+            return await self.app(scope, receive, send)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and scope.get("state", {}).get(
+                "db_wrote"
+            ):
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", self.cookie),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
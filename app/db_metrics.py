@@ -0,0 +1,266 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import DB_SERVER_TIMING
+
+POOL_METRICS = {}
+STATEMENT_CACHE_METRICS = {}
+# the SQL of the last misses, enough to spot a statement that never hits
+RECENT_MISSES = 20
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checkout_wait": {
+                    "count": self.wait_count,
+                    "total_seconds": self.wait_total,
+                    "max_seconds": self.wait_max,
+                    "avg_seconds": (
+                        self.wait_total / self.wait_count if self.wait_count else 0.0
+                    ),
+                },
+            }
+
+
+class CheckoutTimingMixin:
+    # pool events only fire once a connection has been handed out, so the time
+    # spent waiting for a free slot is measured around Pool.connect() instead
+    metrics = None
+
+    def connect(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def register_pool_metrics(engine, name: str) -> PoolMetrics:
+    metrics = PoolMetrics()
+    engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+    POOL_METRICS[name] = (engine, metrics)
+    return metrics
+
+
+def get_pool_metrics() -> dict:
+    return {
+        name: metrics.snapshot(engine.pool)
+        for name, (engine, metrics) in POOL_METRICS.items()
+    }
+
+
+class StatementCacheMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # statements that cannot be cached at all, e.g. driver SQL or a construct
+        # without a cache key, they are compiled on every execution
+        self.uncached = 0
+        self.recent_misses = deque(maxlen=RECENT_MISSES)
+
+    def record(self, cache_hit, statement: str):
+        with self._lock:
+            if cache_hit == CACHE_HIT:
+                self.hits += 1
+            elif cache_hit == CACHE_MISS:
+                self.misses += 1
+                self.recent_misses.append(statement[:200])
+            else:
+                self.uncached += 1
+
+    def snapshot(self, engine) -> dict:
+        # the engine's LRU cache of compiled statements, sized by query_cache_size
+        compiled_cache = engine._compiled_cache
+        if compiled_cache is None:  # query_cache_size=0
+            size, capacity = 0, 0
+        else:
+            size, capacity = len(compiled_cache), compiled_cache.capacity
+        with self._lock:
+            cached = self.hits + self.misses
+            return {
+                "size": size,
+                "capacity": capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "uncached": self.uncached,
+                "hit_rate": self.hits / cached if cached else 0.0,
+                "recent_misses": list(self.recent_misses),
+            }
+
+
+def register_statement_cache_metrics(engine, name: str) -> StatementCacheMetrics:
+    metrics = StatementCacheMetrics()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            metrics.record(context.cache_hit, statement)
+
+    STATEMENT_CACHE_METRICS[name] = (engine, metrics)
+    return metrics
+
+
+def get_statement_cache_metrics() -> dict:
+    return {
+        name: metrics.snapshot(engine)
+        for name, (engine, metrics) in STATEMENT_CACHE_METRICS.items()
+    }
+
+
+class RequestQueries:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def server_timing(self) -> bytes:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'.encode()
+
+
+# queries of the request being served, set by QueryTimingMiddleware. Routes
+# run in the threadpool with a copy of the context, which still holds the same
+# RequestQueries
+REQUEST_QUERIES = ContextVar("request_queries", default=None)
+
+
+def redact_parameters(parameters, executemany: bool):
+    # the types tell which branch a statement took, the values may be personal
+    if executemany:
+        return f"<{len(parameters)} rows>"
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def register_query_timing(engine, slow_query_seconds: float):
+    @event.listens_for(engine, "before_cursor_execute")
+    def on_before_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def on_after_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is None:
+            return
+        seconds = time.perf_counter() - context.query_start
+
+        queries = REQUEST_QUERIES.get()
+        if queries is not None:
+            queries.count += 1
+            queries.seconds += seconds
+
+        if 0 <= slow_query_seconds <= seconds:
+            logger.warning(
+                "Slow query (%.3f s): %s parameters=%s",
+                seconds,
+                statement,
+                redact_parameters(parameters, executemany),
+            )
+
+
+class QueryTimingMiddleware:
+    """Count the queries of each request and report them with their total
+    time in a Server-Timing header, a no-op unless enabled."""
+
+    def __init__(self, app, enabled: bool = DB_SERVER_TIMING):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+
+        queries = RequestQueries()
+
+        async def send_with_timing(message):
+            # a streamed response's later queries run after the headers are sent
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", queries.server_timing()),
+                ]
+            await send(message)
+
+        token = REQUEST_QUERIES.set(queries)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUEST_QUERIES.reset(token)
@@ -0,0 +1,114 @@
+import os
+import time
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.config import PROMETHEUS_MULTIPROC_DIR
+
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+# paths no route matched, labelled as one series so scanners cannot create
+# a series per url
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving the request to sending the last response byte",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS = Counter(
+    "http_requests", "Requests by status code", ["method", "route", "status"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size",
+    ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000),
+)
+# livesum: summed over the running workers, a dead worker's requests no longer
+# count as in progress
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being served",
+    multiprocess_mode="livesum",
+)
+
+
+def get_route(scope) -> str:
+    route = scope.get("route")
+    return route.path if route is not None else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Record latency, status and response size per route template, a pure
+    ASGI middleware so streamed responses are measured to their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+        # labelled children by (method, route, status), looked up once instead
+        # of going through labels() on every request
+        self.children = {}
+
+    def get_children(self, method: str, route: str, status: int):
+        key = (method, route, status)
+        children = self.children.get(key)
+        if children is None:
+            children = self.children[key] = (
+                REQUEST_DURATION.labels(method, route),
+                REQUESTS.labels(method, route, str(status)),
+                RESPONSE_SIZE.labels(method, route),
+            )
+        return children
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            method = scope["method"] if scope["method"] in METHODS else "other"
+            duration, requests, response_size = self.get_children(
+                method, get_route(scope), status
+            )
+            duration.observe(time.perf_counter() - start)
+            requests.inc()
+            response_size.observe(size)
+
+
+def generate_metrics() -> bytes:
+    if PROMETHEUS_MULTIPROC_DIR is None:
+        return generate_latest(REGISTRY)
+    # every worker writes its samples to its own files in the directory, a
+    # scrape hitting any worker aggregates all of them
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, PROMETHEUS_MULTIPROC_DIR)
+    return generate_latest(registry)
+
+
+def mark_worker_dead():
+    # drop the exiting worker's livesum gauge files
+    if PROMETHEUS_MULTIPROC_DIR is not None:
+        multiprocess.mark_process_dead(os.getpid(), PROMETHEUS_MULTIPROC_DIR)
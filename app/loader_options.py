@@ -0,0 +1,16 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import AttributeValue, Product, ProductLine
+
+# one preset per endpoint: every relationship the response schema reads is
+# loaded up front, with a fixed number of queries however big the product is.
+# joinedload for many-to-one, selectinload for collections.
+
+PRODUCT_DETAIL = (
+    joinedload(Product.category),
+    selectinload(Product.product_types),
+    selectinload(Product.product_lines).options(
+        selectinload(ProductLine.product_images),
+        selectinload(ProductLine.attribute_values).joinedload(AttributeValue.attribute),
+    ),
+)
@@ -1,14 +1,50 @@
 import logging
 import logging.config
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from app.routes import category_routes
+from app.db_connection import ReadYourWritesMiddleware
+from app.db_metrics import QueryTimingMiddleware
+from app.http_metrics import MetricsMiddleware, mark_worker_dead
+from app.routes import (
+    category_routes,
+    db_routes,
+    metrics_routes,
+    product_routes,
+    product_type_routes,
+    seasonal_event_routes,
+    stock_routes,
+)
 
 logging.config.fileConfig("logging.conf", disable_existing_loggers=False)
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    mark_worker_dead()
+
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryTimingMiddleware)
+# added last so it is outermost and times the whole middleware stack
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(category_routes.router, prefix="/api/category", tags=["Category"])
+app.include_router(product_routes.router, prefix="/api/product", tags=["Product"])
+app.include_router(
+    product_type_routes.router, prefix="/api/product-type", tags=["Product Type"]
+)
+app.include_router(
+    seasonal_event_routes.router,
+    prefix="/api/seasonal-event",
+    tags=["Seasonal Event"],
+)
+app.include_router(stock_routes.router, prefix="/api/stock", tags=["Stock"])
+app.include_router(db_routes.router, prefix="/api/db", tags=["Database"])
+app.include_router(metrics_routes.router, tags=["Metrics"])
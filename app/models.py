@@ -1,21 +1,26 @@
 import sqlalchemy
 from sqlalchemy import (
     DECIMAL,
+    BigInteger,
     Boolean,
     CheckConstraint,
     Column,
+    Computed,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
     text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
+from .config import ORM_LAZY_LOAD
 from .db_connection import Base
 
 
@@ -38,6 +43,39 @@ class Category(Base):
         CheckConstraint("LENGTH(slug) > 0", name="category_slug_length_check"),
         UniqueConstraint("name", "level", name="uq_category_name_level"),
         UniqueConstraint("slug", name="uq_category_slug"),
+        Index("ix_category_level_name", "level", "name"),  # keyset pagination
+        Index(
+            "ix_category_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
+
+class CategoryClosure(Base):
+    # every (ancestor, descendant) pair of the category tree, each category is
+    # also paired with itself at depth 0. Rows are written by the
+    # category_closure_insert/_reparent triggers and removed by ON DELETE CASCADE
+    __tablename__ = "category_closure"
+
+    ancestor_id = Column(
+        Integer,
+        ForeignKey("category.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    descendant_id = Column(
+        Integer,
+        ForeignKey("category.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("depth >= 0", name="category_closure_depth_check"),
+        Index("ix_category_closure_descendant_id_depth", "descendant_id", "depth"),
     )
 
 
@@ -73,6 +111,36 @@ class Product(Base):
     )
     category_id = Column(Integer, ForeignKey("category.id"), nullable=False)
     seasonal_id = Column(Integer, ForeignKey("seasonal_event.id"), nullable=True)
+    # generated by postgres, name matches rank above description. Deferred as
+    # it is only ever used inside search queries
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english'::regconfig, name), 'A') || "
+                "setweight(to_tsvector('english'::regconfig, "
+                "coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
+
+    # relationships are loaded by the presets in app/loader_options.py, the
+    # lazy strategy is only a fallback (and raise_on_sql in the test suite)
+    category = relationship("Category", lazy=ORM_LAZY_LOAD)
+    seasonal_event = relationship("SeasonalEvents", lazy=ORM_LAZY_LOAD)
+    product_lines = relationship(
+        "ProductLine",
+        back_populates="product",
+        order_by="ProductLine.order",
+        lazy=ORM_LAZY_LOAD,
+    )
+    product_types = relationship(
+        "ProductType",
+        secondary="product_product_type",
+        back_populates="products",
+        lazy=ORM_LAZY_LOAD,
+    )
 
     __table_args__ = (
         CheckConstraint("LENGTH(name) > 0", name="product_name_length_check"),
@@ -80,6 +148,35 @@ class Product(Base):
         UniqueConstraint("name", name="uq_product_name"),
         UniqueConstraint("slug", name="uq_product_slug"),
         UniqueConstraint("pid", name="uq_product_pid"),
+        Index("ix_product_category_id_id", "category_id", "id"),
+        Index("ix_product_seasonal_id_id", "seasonal_id", "id"),
+        Index("ix_product_search_vector", "search_vector", postgresql_using="gin"),
+        # stock_status is kept by the product_stock_status_* triggers on
+        # product_line, in stock listings only scan these partial indexes
+        Index(
+            "ix_product_in_stock_id",
+            "id",
+            postgresql_where=text("stock_status = 'is'"),
+        ),
+        Index(
+            "ix_product_in_stock_category_id_id",
+            "category_id",
+            "id",
+            postgresql_where=text("stock_status = 'is'"),
+        ),
+        # pg_trgm, serves the ILIKE prefix and word similarity suggest queries
+        Index(
+            "ix_product_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_product_slug_trgm",
+            "slug",
+            postgresql_using="gin",
+            postgresql_ops={"slug": "gin_trgm_ops"},
+        ),
     )
 
 
@@ -102,6 +199,22 @@ class ProductLine(Base):
     )
     product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
 
+    product = relationship(
+        "Product", back_populates="product_lines", lazy=ORM_LAZY_LOAD
+    )
+    product_images = relationship(
+        "ProductImage",
+        back_populates="product_line",
+        order_by="ProductImage.order",
+        lazy=ORM_LAZY_LOAD,
+    )
+    attribute_values = relationship(
+        "AttributeValue",
+        secondary="product_line_attribute_value",
+        back_populates="product_lines",
+        lazy=ORM_LAZY_LOAD,
+    )
+
     __table_args__ = (
         CheckConstraint(
             "price >= 0 AND price <= 999.99", name="product_line_max_value"
@@ -113,6 +226,7 @@ class ProductLine(Base):
             "order", "product_id", name="uq_product_line_order_product_id"
         ),
         UniqueConstraint("sku", name="uq_product_line_sku"),
+        Index("ix_product_line_product_id_order", "product_id", "order"),
     )
 
 
@@ -125,6 +239,10 @@ class ProductImage(Base):
     order = Column(Integer, nullable=False)
     product_line_id = Column(Integer, ForeignKey("product_line.id"), nullable=False)
 
+    product_line = relationship(
+        "ProductLine", back_populates="product_images", lazy=ORM_LAZY_LOAD
+    )
+
     __table_args__ = (
         CheckConstraint(
             '"order" >= 0 AND "order" <= 20', name="product_image_order_range"
@@ -137,6 +255,7 @@ class ProductImage(Base):
         UniqueConstraint(
             "order", "product_line_id", name="uq_product_image_order_product_line_id"
         ),
+        Index("ix_product_image_product_line_id_order", "product_line_id", "order"),
     )
 
 
@@ -154,6 +273,7 @@ class SeasonalEvents(Base):
             name="seasonal_event_name_length_check",
         ),
         UniqueConstraint("name", name="uq_seasonal_event_name"),
+        Index("ix_seasonal_event_start_date_end_date", "start_date", "end_date"),
     )
 
 
@@ -164,6 +284,10 @@ class Attribute(Base):
     name = Column(String(100), nullable=False)
     description = Column(String(100), nullable=True)
 
+    attribute_values = relationship(
+        "AttributeValue", back_populates="attribute", lazy=ORM_LAZY_LOAD
+    )
+
     __table_args__ = (
         CheckConstraint(
             "LENGTH(name) > 0",
@@ -185,6 +309,13 @@ class ProductType(Base):
         Integer, ForeignKey("product_type.id"), nullable=True
     )  # nullable is the default but we add it
 
+    products = relationship(
+        "Product",
+        secondary="product_product_type",
+        back_populates="product_types",
+        lazy=ORM_LAZY_LOAD,
+    )
+
     __table_args__ = (
         CheckConstraint("LENGTH(name) > 0", name="product_type_name_length_check"),
         UniqueConstraint("name", "level", name="uq_product_type_name_level"),
@@ -199,9 +330,19 @@ class AttributeValue(Base):
     )  # nullable is the default but we add it
     attribute_value = Column(String(100), nullable=False)
     attribute_id = Column(
-        Integer, ForeignKey("attribute_value.id"), nullable=False
+        Integer, ForeignKey("attribute.id"), nullable=False
     )  # nullable is the default but we add it
 
+    attribute = relationship(
+        "Attribute", back_populates="attribute_values", lazy=ORM_LAZY_LOAD
+    )
+    product_lines = relationship(
+        "ProductLine",
+        secondary="product_line_attribute_value",
+        back_populates="attribute_values",
+        lazy=ORM_LAZY_LOAD,
+    )
+
     __table_args__ = (
         CheckConstraint(
             "LENGTH(attribute_value) > 0", name="attribute_value_name_length_check"
@@ -231,6 +372,35 @@ class ProductLineAttributeValue(Base):
             "product_line_id",
             name="uq_product_line_attribute_value",
         ),
+        Index(
+            "ix_product_line_attribute_value_product_line_id",
+            "product_line_id",
+            "attribute_value_id",
+        ),
+    )
+
+
+class ProductFacet(Base):
+    # products per attribute value, a product has a value when any of its lines
+    # does. Maintained by the product_facet_* triggers on product_line and
+    # product_line_attribute_value, line_count drops the row once it hits zero
+    __tablename__ = "product_facet"
+
+    product_id = Column(
+        Integer, ForeignKey("product.id"), primary_key=True, nullable=False
+    )
+    attribute_value_id = Column(
+        Integer, ForeignKey("attribute_value.id"), primary_key=True, nullable=False
+    )
+    line_count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # products of the filtered values, read by the facet matches and counts
+        Index(
+            "ix_product_facet_attribute_value_id_product_id",
+            "attribute_value_id",
+            "product_id",
+        ),
     )
 
 
@@ -254,3 +424,12 @@ class ProductProductType(Base):
             name="uq_product_id_product_type_id",
         ),
     )
+
+
+class CacheVersion(Base):
+    # one row per cached table, bumped by a statement trigger on every write so
+    # that in-process caches can check for changes with a primary key lookup
+    __tablename__ = "cache_version"
+
+    name = Column(String(50), primary_key=True, nullable=False)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -1,23 +1,159 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db_connection import SessionLocal, get_db_session
+from app.config import DB_ASYNC_MODE
+from app.db_connection import (
+    get_async_db_session,
+    get_db_session,
+    get_read_db_session,
+)
 from app.models import Category
-from app.schemas.category_schemas import CategoryCreate, CategoryReturn
-from app.utils.category_routes import check_existing_category
+from app.schemas.category_schemas import (
+    CategoryBulkCreate,
+    CategoryBulkReturn,
+    CategoryCreate,
+    CategoryReturn,
+    CategoryTree,
+)
+from app.schemas.pagination_schemas import Page
+from app.schemas.suggest_schemas import Suggestion
+from app.utils.category_cache import category_cache
+from app.utils.category_routes import (
+    MAX_CATEGORY_TREE_DEPTH,
+    build_category_tree,
+    bulk_insert_categories,
+    get_category_tree_rows,
+    insert_category,
+    insert_category_async,
+    list_categories_query,
+)
+from app.utils.fields import FIELDS_QUERY, narrow_model, parse_fields, sparse_response
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    build_page,
+    decode_cursor,
+)
+from app.utils.suggest import (
+    DEFAULT_SUGGESTIONS,
+    MAX_SUGGESTIONS,
+    category_suggest_cache,
+    get_suggestions,
+)
 
 router = APIRouter()
-db = SessionLocal()
 
 
-@router.post("/", response_model=CategoryReturn, status_code=201)
 def create_category(
     category_data: CategoryCreate, db: Session = Depends(get_db_session)
 ):
-    check_existing_category(db, category_data)
-
-    new_category = Category(**category_data.model_dump())
-    db.add(new_category)
+    new_category = insert_category(db, category_data)
     db.commit()
-    db.refresh(new_category)
+    category_cache.invalidate()
+    category_suggest_cache.clear()
+    return new_category
+
+
+async def create_category_async(
+    category_data: CategoryCreate, db: AsyncSession = Depends(get_async_db_session)
+):
+    new_category = await insert_category_async(db, category_data)
+    await db.commit()
+    category_cache.invalidate()
+    category_suggest_cache.clear()
     return new_category
+
+
+router.add_api_route(
+    "/",
+    create_category_async if DB_ASYNC_MODE else create_category,
+    methods=["POST"],
+    response_model=CategoryReturn,
+    status_code=201,
+)
+
+
+@router.post("/bulk", response_model=CategoryBulkReturn, status_code=201)
+def create_categories_bulk(
+    categories_data: list[CategoryBulkCreate], db: Session = Depends(get_db_session)
+):
+    result = bulk_insert_categories(db, categories_data)
+    db.commit()
+    category_cache.invalidate()
+    category_suggest_cache.clear()
+    return result
+
+
+@router.get("/{category_id:int}/subtree", response_model=CategoryTree)
+def get_category_subtree(
+    category_id: int,
+    max_depth: int = Query(MAX_CATEGORY_TREE_DEPTH, ge=0, le=MAX_CATEGORY_TREE_DEPTH),
+    db: Session = Depends(get_read_db_session),
+):
+    rows = get_category_tree_rows(db, category_id, max_depth)
+    return build_category_tree(rows)
+
+
+@router.get("/{category_id:int}/ancestors", response_model=list[CategoryReturn])
+def get_category_ancestors(
+    category_id: int,
+    max_depth: int = Query(MAX_CATEGORY_TREE_DEPTH, ge=0, le=MAX_CATEGORY_TREE_DEPTH),
+    db: Session = Depends(get_read_db_session),
+):
+    # breadcrumbs: root first, the requested category last
+    rows = get_category_tree_rows(db, category_id, max_depth, ancestors=True)
+    return rows[::-1]
+
+
+@router.get("/tree", response_model=list[CategoryTree])
+def get_category_tree(db: Session = Depends(get_read_db_session)):
+    return Response(
+        content=category_cache.get(db).tree_json(), media_type="application/json"
+    )
+
+
+@router.get("/suggest", response_model=list[Suggestion])
+def suggest_categories(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(DEFAULT_SUGGESTIONS, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_read_db_session),
+):
+    return get_suggestions(
+        db, category_suggest_cache, Category, q, limit, [Category.name]
+    )
+
+
+@router.get("/slug/{slug}", response_model=CategoryReturn)
+def get_category_by_slug(
+    slug: str,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_read_db_session),
+):
+    fields = parse_fields(fields, CategoryReturn)
+    category = category_cache.get(db).get_by_slug(slug)
+    if category is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    if fields:
+        return sparse_response(narrow_model(CategoryReturn, fields), category)
+    return category
+
+
+@router.get("/", response_model=Page[CategoryReturn])
+def list_categories(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_read_db_session),
+):
+    fields = parse_fields(fields, CategoryReturn)
+    after = decode_cursor(cursor, (int, str)) if cursor else None
+    rows = db.execute(list_categories_query(after, limit, fields)).mappings().all()
+    page = build_page(rows, limit, lambda row: (row["level"], row["name"]))
+
+    if fields:
+        return sparse_response(Page[narrow_model(CategoryReturn, fields)], page)
+    return page
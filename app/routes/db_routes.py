@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from app.db_metrics import get_pool_metrics, get_statement_cache_metrics
+
+router = APIRouter()
+
+
+@router.get("/pool")
+def pool_metrics():
+    return get_pool_metrics()
+
+
+@router.get("/statement-cache")
+def statement_cache_metrics():
+    return get_statement_cache_metrics()
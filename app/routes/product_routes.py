@@ -0,0 +1,163 @@
+import io
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db_connection import get_db_session, get_read_db_session
+from app.models import Product
+from app.schemas.import_schemas import ImportResult
+from app.schemas.pagination_schemas import Page
+from app.schemas.product_schemas import (
+    ProductDetail,
+    ProductDocument,
+    ProductFilterPage,
+    ProductReturn,
+    ProductSearchResult,
+)
+from app.schemas.suggest_schemas import Suggestion
+from app.utils.fields import FIELDS_QUERY, narrow_model, parse_fields, sparse_response
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    build_page,
+    decode_cursor,
+)
+from app.utils.product_export import EXPORT_MEDIA_TYPES, export_products
+from app.utils.product_import import get_import_format, import_products
+from app.utils.product_routes import (
+    filter_products,
+    get_product_detail,
+    get_product_document,
+    list_products_query,
+    search_products_query,
+)
+from app.utils.suggest import (
+    DEFAULT_SUGGESTIONS,
+    MAX_SUGGESTIONS,
+    get_suggestions,
+    product_suggest_cache,
+)
+
+router = APIRouter()
+
+
+@router.get("/", response_model=Page[ProductReturn])
+def list_products(
+    category_id: Optional[int] = None,
+    in_stock: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_read_db_session),
+):
+    fields = parse_fields(fields, ProductReturn)
+    after_id = decode_cursor(cursor, (int,))[0] if cursor else None
+    rows = db.execute(
+        list_products_query(after_id, limit, category_id, fields, in_stock)
+    )
+    page = build_page(rows.mappings().all(), limit, lambda row: (row["id"],))
+
+    if fields:
+        return sparse_response(Page[narrow_model(ProductReturn, fields)], page)
+    return page
+
+
+@router.get("/search", response_model=Page[ProductSearchResult])
+def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db_session),
+):
+    after = decode_cursor(cursor, (float, int)) if cursor else None
+    rows = db.execute(search_products_query(q, after, limit))
+    return build_page(
+        rows.mappings().all(), limit, lambda row: (row["rank"], row["id"])
+    )
+
+
+@router.get("/suggest", response_model=list[Suggestion])
+def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(DEFAULT_SUGGESTIONS, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_read_db_session),
+):
+    return get_suggestions(
+        db, product_suggest_cache, Product, q, limit, [Product.name, Product.slug]
+    )
+
+
+@router.get("/filter", response_model=ProductFilterPage)
+def filter_products_by_attribute_values(
+    attribute_value_id: list[int] = Query(..., min_length=1),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db_session),
+):
+    after_id = decode_cursor(cursor, (int,))[0] if cursor else None
+    return filter_products(db, attribute_value_id, after_id, limit)
+
+
+@router.post("/import", response_model=ImportResult)
+def import_product_feed(
+    file: UploadFile,
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    db: Session = Depends(get_db_session),
+):
+    # uploads are spooled to disk by starlette and read back line by line, so
+    # the feed is never held in memory
+    if format is None:
+        try:
+            format = get_import_format(file.filename or "")
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    result = import_products(db, lines, format)
+    product_suggest_cache.clear()
+    return result
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_product_feed(
+    format: Literal["csv", "ndjson"] = "ndjson",
+    gzip: bool = False,
+    after_id: Optional[int] = Query(None, ge=0),
+):
+    # no request session, the stream outlives it and opens its own
+    filename = f"catalog.{format}.gz" if gzip else f"catalog.{format}"
+    return StreamingResponse(
+        export_products(format, after_id, gzip),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/{product_id}", response_model=ProductDetail)
+def get_product(product_id: int, db: Session = Depends(get_read_db_session)):
+    return get_product_detail(db, product_id)
+
+
+# the document is built and serialised by postgres, so these skip the ORM and
+# response_model validation and pass the json through untouched
+@router.get(
+    "/slug/{slug}",
+    response_class=Response,
+    responses={200: {"model": ProductDocument}},
+)
+def get_product_by_slug(slug: str, db: Session = Depends(get_read_db_session)):
+    document = get_product_document(db, Product.slug == slug)
+    return Response(content=document, media_type="application/json")
+
+
+@router.get(
+    "/pid/{pid}",
+    response_class=Response,
+    responses={200: {"model": ProductDocument}},
+)
+def get_product_by_pid(pid: UUID, db: Session = Depends(get_read_db_session)):
+    document = get_product_document(db, Product.pid == pid)
+    return Response(content=document, media_type="application/json")
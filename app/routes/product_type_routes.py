@@ -0,0 +1,74 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db_connection import get_read_db_session
+from app.schemas.pagination_schemas import Page
+from app.schemas.product_schemas import ProductReturn
+from app.schemas.product_type_schemas import ProductTypeReturn, ProductTypeTree
+from app.utils.fields import FIELDS_QUERY, narrow_model, parse_fields, sparse_response
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    build_page,
+    decode_cursor,
+)
+from app.utils.product_routes import list_products_query
+from app.utils.product_type_cache import product_type_cache
+
+router = APIRouter()
+
+
+@router.get("/tree", response_model=list[ProductTypeTree])
+def get_product_type_tree(db: Session = Depends(get_read_db_session)):
+    return product_type_cache.get(db).build_tree()
+
+
+@router.get("/{product_type_id}/subtree", response_model=ProductTypeTree)
+def get_product_type_subtree(
+    product_type_id: int, db: Session = Depends(get_read_db_session)
+):
+    return product_type_cache.get(db).get_subtree(product_type_id)
+
+
+@router.get("/{product_type_id}/ancestors", response_model=list[ProductTypeReturn])
+def get_product_type_ancestors(
+    product_type_id: int, db: Session = Depends(get_read_db_session)
+):
+    # root first, the type itself is not included
+    return product_type_cache.get(db).get_ancestors(product_type_id)
+
+
+@router.get("/{product_type_id}/products", response_model=Page[ProductReturn])
+def list_product_type_products(
+    product_type_id: int,
+    include_subtypes: bool = True,
+    in_stock: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_read_db_session),
+):
+    fields = parse_fields(fields, ProductReturn)
+    after_id = decode_cursor(cursor, (int,))[0] if cursor else None
+
+    snapshot = product_type_cache.get(db)
+    product_type_ids = [snapshot.get(product_type_id)["id"]]
+    if include_subtypes:
+        product_type_ids = snapshot.get_descendant_ids(product_type_id)
+
+    rows = db.execute(
+        list_products_query(
+            after_id,
+            limit,
+            fields=fields,
+            in_stock=in_stock,
+            product_type_ids=product_type_ids,
+        )
+    )
+    page = build_page(rows.mappings().all(), limit, lambda row: (row["id"],))
+
+    if fields:
+        return sparse_response(Page[narrow_model(ProductReturn, fields)], page)
+    return page
@@ -0,0 +1,56 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db_connection import get_read_db_session
+from app.schemas.pagination_schemas import Page
+from app.schemas.product_schemas import ProductReturn
+from app.schemas.seasonal_event_schemas import SeasonalEventReturn
+from app.utils.fields import FIELDS_QUERY, narrow_model, parse_fields, sparse_response
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    build_page,
+    decode_cursor,
+)
+from app.utils.product_routes import list_products_query
+from app.utils.seasonal_schedule import get_seasonal_schedule
+
+router = APIRouter()
+
+
+@router.get("/active", response_model=list[SeasonalEventReturn])
+def get_active_seasonal_events(db: Session = Depends(get_read_db_session)):
+    return get_seasonal_schedule(db).events
+
+
+@router.get("/active/products", response_model=Page[ProductReturn])
+def list_active_seasonal_products(
+    in_stock: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_read_db_session),
+):
+    fields = parse_fields(fields, ProductReturn)
+    after_id = decode_cursor(cursor, (int,))[0] if cursor else None
+
+    event_ids = get_seasonal_schedule(db).event_ids
+    rows = []
+    if event_ids:
+        rows = db.execute(
+            list_products_query(
+                after_id,
+                limit,
+                fields=fields,
+                in_stock=in_stock,
+                seasonal_ids=event_ids,
+            )
+        )
+        rows = rows.mappings().all()
+    page = build_page(rows, limit, lambda row: (row["id"],))
+
+    if fields:
+        return sparse_response(Page[narrow_model(ProductReturn, fields)], page)
+    return page
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+
+from app.db_connection import get_db_session
+from app.schemas.stock_schemas import StockReservationCreate, StockReservationReturn
+from app.utils.stock_routes import reserve_stock
+
+router = APIRouter()
+
+
+@router.post("/reserve", response_model=StockReservationReturn)
+def reserve_stock_items(
+    reservation: StockReservationCreate,
+    response: Response,
+    db: Session = Depends(get_db_session),
+):
+    items = reserve_stock(db, reservation.items)
+    reserved = all(item["reserved"] for item in items)
+
+    if reservation.all_or_nothing and not reserved:
+        # nothing is kept, the results still tell which skus were short
+        db.rollback()
+        response.status_code = 409
+        for item in items:
+            if item["reserved"]:
+                item["reserved"] = False
+                item["stock_qty"] += item["qty"]
+        return {"reserved": False, "items": items}
+
+    db.commit()
+    return {"reserved": reserved, "items": items}
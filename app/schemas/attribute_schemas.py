@@ -0,0 +1,15 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class AttributeReturn(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+
+
+class AttributeValueReturn(BaseModel):
+    id: int
+    attribute_value: str
+    attribute: AttributeReturn
@@ -1,6 +1,6 @@
 from typing import Annotated, Optional
 
-from pydantic import BaseModel, StringConstraints
+from pydantic import BaseModel, StringConstraints, model_validator
 
 
 class CategoryBase(BaseModel):
@@ -15,5 +15,31 @@ class CategoryCreate(CategoryBase):
     pass
 
 
+class CategoryBulkCreate(CategoryCreate):
+    # slug of a category created earlier in the same batch, or already stored
+    parent_slug: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_single_parent_reference(self):
+        if self.parent_id is not None and self.parent_slug is not None:
+            raise ValueError("Set either parent_id or parent_slug, not both")
+        return self
+
+
 class CategoryReturn(CategoryBase):
     id: int
+
+
+class CategoryTree(CategoryReturn):
+    children: list["CategoryTree"] = []
+
+
+class CategoryBulkConflict(BaseModel):
+    index: int
+    slug: str
+    detail: str
+
+
+class CategoryBulkReturn(BaseModel):
+    created: list[CategoryReturn]
+    conflicts: list[CategoryBulkConflict]
@@ -0,0 +1,69 @@
+from decimal import Decimal
+from typing import Annotated, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, StringConstraints, model_validator
+
+# mirror the check constraints of the tables, a row breaking one is reported
+# as a validation error instead of failing the whole chunk in the database
+Name = Annotated[str, StringConstraints(min_length=1, max_length=100)]
+
+
+class ProductImageImport(BaseModel):
+    url: Name
+    alternative_text: Name
+    order: Annotated[int, Field(ge=0, le=20)]
+
+
+class ProductLineImport(BaseModel):
+    sku: UUID
+    price: Annotated[Decimal, Field(ge=0, le=Decimal("999.99"), decimal_places=2)]
+    stock_qty: Annotated[int, Field(ge=0)] = 0
+    is_active: bool = False
+    order: Annotated[int, Field(ge=1, le=20)]
+    weight: float
+    product_images: list[ProductImageImport] = []
+    # attribute name -> value, both are created when missing
+    attribute_values: dict[Name, Name] = {}
+
+    @model_validator(mode="after")
+    def check_unique_image_order(self):
+        orders = [image.order for image in self.product_images]
+        if len(orders) != len(set(orders)):
+            raise ValueError("Image order must be unique per product line")
+        return self
+
+
+class ProductImport(BaseModel):
+    slug: Annotated[str, StringConstraints(min_length=1, max_length=220)]
+    name: Annotated[str, StringConstraints(min_length=1, max_length=200)]
+    description: Optional[str] = None
+    is_digital: bool = False
+    is_active: bool = False
+    category_id: int
+    seasonal_id: Optional[int] = None
+    product_lines: list[ProductLineImport] = []
+
+    @model_validator(mode="after")
+    def check_unique_line_order(self):
+        orders = [line.order for line in self.product_lines]
+        if len(orders) != len(set(orders)):
+            raise ValueError("Product line order must be unique per product")
+        return self
+
+
+class ImportRowError(BaseModel):
+    # line of the input file the record starts on
+    line: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    records: int
+    # rows inserted or changed, rows already matching the feed are not rewritten
+    products: int
+    product_lines: int
+    product_images: int
+    attribute_values: int
+    skipped: int
+    errors: list[ImportRowError]
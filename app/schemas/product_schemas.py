@@ -0,0 +1,78 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.schemas.attribute_schemas import AttributeValueReturn
+from app.schemas.category_schemas import CategoryReturn
+from app.schemas.pagination_schemas import Page
+from app.schemas.product_type_schemas import ProductTypeReturn
+
+
+class ProductBase(BaseModel):
+    name: str
+    slug: str
+    description: Optional[str] = None
+    is_digital: bool = False
+    is_active: bool = False
+    stock_status: Literal["oos", "is", "obo"] = "oos"
+    category_id: int
+    seasonal_id: Optional[int] = None
+
+
+class ProductReturn(ProductBase):
+    id: int
+    pid: UUID
+    created_at: datetime
+    updated_at: datetime
+
+
+class ProductSearchResult(ProductReturn):
+    rank: float
+
+
+class ProductImageReturn(BaseModel):
+    id: int
+    alternative_text: str
+    url: str
+    order: int
+
+
+class ProductLineReturn(BaseModel):
+    id: int
+    price: Decimal
+    sku: UUID
+    stock_qty: int
+    is_active: bool
+    order: int
+    weight: float
+    created_at: datetime
+
+
+class ProductLineDetail(ProductLineReturn):
+    product_images: list[ProductImageReturn]
+    attribute_values: list[AttributeValueReturn]
+
+
+class ProductDetail(ProductReturn):
+    category: CategoryReturn
+    product_types: list[ProductTypeReturn]
+    product_lines: list[ProductLineDetail]
+
+
+class ProductDocument(ProductReturn):
+    product_lines: list[ProductLineDetail]
+
+
+class FacetCount(BaseModel):
+    attribute_id: int
+    attribute: str
+    attribute_value_id: int
+    attribute_value: str
+    count: int
+
+
+class ProductFilterPage(Page[ProductReturn]):
+    facets: list[FacetCount]
@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ProductTypeReturn(BaseModel):
+    id: int
+    name: str
+    level: int
+    parent_id: Optional[int] = None
+
+
+class ProductTypeTree(ProductTypeReturn):
+    children: list["ProductTypeTree"] = []
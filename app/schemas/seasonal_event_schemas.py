@@ -0,0 +1,10 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SeasonalEventReturn(BaseModel):
+    id: int
+    name: str
+    start_date: datetime
+    end_date: datetime
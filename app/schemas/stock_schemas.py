@@ -0,0 +1,32 @@
+from typing import Annotated, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+MAX_RESERVATION_ITEMS = 1000
+
+
+class StockReservationItem(BaseModel):
+    sku: UUID
+    qty: Annotated[int, Field(gt=0)]
+
+
+class StockReservationCreate(BaseModel):
+    items: Annotated[
+        list[StockReservationItem],
+        Field(min_length=1, max_length=MAX_RESERVATION_ITEMS),
+    ]
+    # reserve every sku or none of them
+    all_or_nothing: bool = False
+
+
+class StockReservationResult(StockReservationItem):
+    reserved: bool
+    # left after the reservation, or currently available when it failed
+    stock_qty: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class StockReservationReturn(BaseModel):
+    reserved: bool
+    items: list[StockReservationResult]
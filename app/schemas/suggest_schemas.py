@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+    id: int
+    name: str
+    slug: str
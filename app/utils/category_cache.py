@@ -0,0 +1,49 @@
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.cache import VersionedCache
+from app.config import CACHE_CHECK_INTERVAL
+from app.models import Category
+from app.schemas.category_schemas import CategoryTree
+
+category_forest_adapter = TypeAdapter(list[CategoryTree])
+
+
+class CategorySnapshot:
+    def __init__(self, categories):
+        self.by_id = {category["id"]: category for category in categories}
+        self.id_by_slug = {category["slug"]: category["id"] for category in categories}
+        self.children = {}
+        for category in categories:
+            self.children.setdefault(category["parent_id"], []).append(category["id"])
+        self._tree_json = None
+
+    def get_by_slug(self, slug: str):
+        category_id = self.id_by_slug.get(slug)
+        return self.by_id.get(category_id)
+
+    def build_tree(self, parent_id=None) -> list[dict]:
+        return [
+            {**self.by_id[child_id], "children": self.build_tree(child_id)}
+            for child_id in self.children.get(parent_id, [])
+        ]
+
+    def tree_json(self) -> bytes:
+        # serialized once per snapshot, every request after that reuses the bytes
+        if self._tree_json is None:
+            tree = category_forest_adapter.validate_python(self.build_tree())
+            self._tree_json = category_forest_adapter.dump_json(tree)
+        return self._tree_json
+
+
+def build_category_snapshot(db: Session) -> CategorySnapshot:
+    categories = db.execute(
+        select(*Category.__table__.c).order_by(Category.level, Category.name)
+    )
+    return CategorySnapshot([dict(category) for category in categories.mappings()])
+
+
+category_cache = VersionedCache(
+    "category", build_category_snapshot, CACHE_CHECK_INTERVAL
+)
@@ -1,21 +1,36 @@
 from fastapi import HTTPException
+from sqlalchemy import lambda_stmt, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models import Category
-from app.schemas.category_schemas import CategoryCreate
+from app.config import CATEGORY_CLOSURE_TABLE
+from app.models import Category, CategoryClosure
+from app.schemas.category_schemas import CategoryBulkCreate, CategoryCreate
+from app.utils.fields import select_columns
 
+BULK_INSERT_BATCH_SIZE = 1000
+# also bounds the recursive queries if a parent_id cycle ever slips in
+MAX_CATEGORY_TREE_DEPTH = 50
 
-def check_existing_category(db: Session, category_data: CategoryCreate):
-    existing_category = (
-        db.query(Category)
-        .filter(
-            (Category.slug == category_data.slug)
-            | (Category.name == category_data.name)
-            & (Category.level == category_data.level)
+
+def existing_category_query(category_data: CategoryCreate):
+    # hot path of every create, as a lambda statement it is built and cache
+    # keyed once, later calls only pull slug, name and level out as parameters
+    slug, name, level = category_data.slug, category_data.name, category_data.level
+    return lambda_stmt(
+        lambda: (
+            select(Category)
+            .where(
+                (Category.slug == slug)
+                | (Category.name == name) & (Category.level == level)
+            )
+            .limit(1)
         )
-        .first()
     )
 
+
+def raise_existing_category(existing_category, category_data: CategoryCreate):
     if existing_category:
         if (
             existing_category.name == category_data.name
@@ -26,3 +41,294 @@ def check_existing_category(db: Session, category_data: CategoryCreate):
             detail_msg = "Category slug already exists"
 
         raise HTTPException(status_code=400, detail=detail_msg)
+
+
+def check_existing_category(db: Session, category_data: CategoryCreate):
+    existing_category = db.scalar(existing_category_query(category_data))
+    raise_existing_category(existing_category, category_data)
+
+
+async def check_existing_category_async(
+    db: AsyncSession, category_data: CategoryCreate
+):
+    existing_category = await db.scalar(existing_category_query(category_data))
+    raise_existing_category(existing_category, category_data)
+
+
+def insert_category_query(category_data: CategoryCreate):
+    # uq_category_slug and uq_category_name_level turn a duplicate into an empty
+    # RETURNING instead of an error, so the happy path is a single round trip.
+    # The postgresql insert() has no cache key and would be compiled on every
+    # call, the lambda lets the compiled statement be cached
+    name, slug = category_data.name, category_data.slug
+    is_active, level = category_data.is_active, category_data.level
+    parent_id = category_data.parent_id
+    return lambda_stmt(
+        lambda: (
+            insert(Category)
+            .values(
+                name=name,
+                slug=slug,
+                is_active=is_active,
+                level=level,
+                parent_id=parent_id,
+            )
+            .on_conflict_do_nothing()
+            .returning(*Category.__table__.c)
+        )
+    )
+
+
+def raise_category_conflict():
+    # the conflicting row was removed between the INSERT and the lookup
+    raise HTTPException(status_code=400, detail="Category already exists")
+
+
+def insert_category(db: Session, category_data: CategoryCreate):
+    new_category = db.execute(insert_category_query(category_data)).first()
+
+    if new_category is None:
+        check_existing_category(db, category_data)
+        raise_category_conflict()
+
+    return new_category
+
+
+async def insert_category_async(db: AsyncSession, category_data: CategoryCreate):
+    new_category = (await db.execute(insert_category_query(category_data))).first()
+
+    if new_category is None:
+        await check_existing_category_async(db, category_data)
+        raise_category_conflict()
+
+    return new_category
+
+
+def get_category_ids_by_slug(db: Session, slugs: set[str]) -> dict:
+    if not slugs:
+        return {}
+    return dict(
+        db.execute(
+            select(Category.slug, Category.id).where(Category.slug.in_(slugs))
+        ).all()
+    )
+
+
+def get_existing_category_ids(db: Session, ids: set[int]) -> set:
+    if not ids:
+        return set()
+    return set(db.scalars(select(Category.id).where(Category.id.in_(ids))).all())
+
+
+def insert_category_rows(db: Session, rows: list[dict]):
+    return db.execute(
+        insert(Category)
+        .values(rows)
+        .on_conflict_do_nothing()
+        .returning(*Category.__table__.c)
+    ).all()
+
+
+def get_bulk_conflict_details(
+    db: Session, categories: list[CategoryBulkCreate], indexes: list[int]
+) -> dict:
+    conflicting = [categories[index] for index in indexes]
+    existing_categories = db.execute(
+        select(Category.name, Category.slug, Category.level).where(
+            Category.slug.in_({category.slug for category in conflicting})
+            | tuple_(Category.name, Category.level).in_(
+                {(category.name, category.level) for category in conflicting}
+            )
+        )
+    ).all()
+
+    existing_names = {(row.name, row.level) for row in existing_categories}
+    existing_slugs = {row.slug for row in existing_categories}
+
+    details = {}
+    for index in indexes:
+        category = categories[index]
+        if (category.name, category.level) in existing_names:
+            details[index] = "Category name and level already exists"
+        elif category.slug in existing_slugs:
+            details[index] = "Category slug already exists"
+        else:
+            details[index] = "Category already exists"
+    return details
+
+
+def bulk_insert_categories(db: Session, categories: list[CategoryBulkCreate]):
+    """Insert categories in multi-row INSERT ... ON CONFLICT DO NOTHING batches.
+
+    Categories whose parent_slug points into the batch are inserted in a later
+    wave, once their parent id is known. Returns the created rows and a
+    conflict detail per failed input index.
+    """
+    batch_slugs = {}
+    for index, category in enumerate(categories):
+        batch_slugs.setdefault(category.slug, index)
+
+    stored_parent_ids = get_category_ids_by_slug(
+        db,
+        {
+            category.parent_slug
+            for category in categories
+            if category.parent_slug and category.parent_slug not in batch_slugs
+        },
+    )
+    stored_ids = get_existing_category_ids(
+        db,
+        {
+            category.parent_id
+            for category in categories
+            if category.parent_slug is None and category.parent_id is not None
+        },
+    )
+
+    created, conflicts = {}, {}
+    children = {}
+    ready = []
+    for index, category in enumerate(categories):
+        parent_index = batch_slugs.get(category.parent_slug)
+        if category.parent_slug is None:
+            if category.parent_id is None or category.parent_id in stored_ids:
+                ready.append((index, category.parent_id))
+            else:
+                conflicts[index] = "Parent category not found"
+        elif parent_index is not None and parent_index != index:
+            children.setdefault(parent_index, []).append(index)
+        elif category.parent_slug in stored_parent_ids:
+            ready.append((index, stored_parent_ids[category.parent_slug]))
+        else:
+            conflicts[index] = "Parent category not found"
+
+    duplicates = []
+    while ready:
+        next_ready = []
+        for start in range(0, len(ready), BULK_INSERT_BATCH_SIZE):
+            batch = ready[start : start + BULK_INSERT_BATCH_SIZE]
+            rows = insert_category_rows(
+                db,
+                [
+                    {
+                        **categories[index].model_dump(exclude={"parent_slug"}),
+                        "parent_id": parent_id,
+                    }
+                    for index, parent_id in batch
+                ],
+            )
+            inserted = {(row.slug, row.name, row.level): row for row in rows}
+
+            for index, _ in batch:
+                category = categories[index]
+                row = inserted.pop((category.slug, category.name, category.level), None)
+                if row is None:
+                    duplicates.append(index)
+                    continue
+                created[index] = row
+                next_ready.extend((child, row.id) for child in children.pop(index, []))
+        ready = next_ready
+
+    if duplicates:
+        conflicts.update(get_bulk_conflict_details(db, categories, duplicates))
+
+    # children of a parent that was not inserted (or of a parent cycle)
+    for child_indexes in children.values():
+        for index in child_indexes:
+            conflicts[index] = "Parent category was not created"
+
+    return {
+        "created": [created[index] for index in sorted(created)],
+        "conflicts": [
+            {"index": index, "slug": categories[index].slug, "detail": detail}
+            for index, detail in sorted(conflicts.items())
+        ],
+    }
+
+
+def category_tree_query(category_id: int, max_depth: int, ancestors: bool = False):
+    """WITH RECURSIVE walk from one category down to its descendants, or up to
+    its ancestors, stopping max_depth levels away from the start."""
+    category_table = Category.__table__
+    tree = (
+        select(*category_table.c, literal(0).label("depth"))
+        .where(category_table.c.id == category_id)
+        .cte("category_tree", recursive=True)
+    )
+
+    relative = category_table.alias("relative")
+    if ancestors:
+        join_condition = relative.c.id == tree.c.parent_id
+    else:
+        join_condition = relative.c.parent_id == tree.c.id
+
+    tree = tree.union_all(
+        select(*relative.c, tree.c.depth + 1)
+        .join(tree, join_condition)
+        .where(tree.c.depth < max_depth)
+    )
+    return select(tree).order_by(tree.c.depth, tree.c.id)
+
+
+def category_closure_tree_query(
+    category_id: int, max_depth: int, ancestors: bool = False
+):
+    """Same rows as category_tree_query, read from category_closure with an
+    index lookup instead of a recursive walk."""
+    category_table = Category.__table__
+    closure = CategoryClosure.__table__
+    if ancestors:
+        start, relative = closure.c.descendant_id, closure.c.ancestor_id
+    else:
+        start, relative = closure.c.ancestor_id, closure.c.descendant_id
+
+    return (
+        select(*category_table.c, closure.c.depth)
+        .join(closure, relative == category_table.c.id)
+        .where(start == category_id, closure.c.depth <= max_depth)
+        .order_by(closure.c.depth, category_table.c.id)
+    )
+
+
+def category_descendants_query(category_id: int):
+    # the category itself and everything below it
+    return select(CategoryClosure.descendant_id).where(
+        CategoryClosure.ancestor_id == category_id
+    )
+
+
+def get_category_tree_rows(
+    db: Session, category_id: int, max_depth: int, ancestors: bool = False
+):
+    if CATEGORY_CLOSURE_TABLE:
+        query = category_closure_tree_query(category_id, max_depth, ancestors)
+    else:
+        query = category_tree_query(category_id, max_depth, ancestors)
+
+    rows = db.execute(query)
+    rows = rows.mappings().all()
+
+    if not rows:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return rows
+
+
+def build_category_tree(rows) -> dict:
+    # rows come ordered by depth, so every parent is seen before its children
+    nodes = {}
+    for row in rows:
+        node = {**row, "children": []}
+        node.pop("depth")
+        nodes[node["id"]] = node
+        if row["depth"] > 0:
+            nodes[node["parent_id"]]["children"].append(node)
+    return nodes[rows[0]["id"]]
+
+
+def list_categories_query(after: list | None, limit: int, fields=None):
+    # (level, name) is unique, so it can serve as the keyset on its own
+    columns = select_columns(Category.__table__, fields, key_fields=("level", "name"))
+    query = select(*columns).order_by(Category.level, Category.name).limit(limit + 1)
+    if after is not None:
+        query = query.where(tuple_(Category.level, Category.name) > tuple_(*after))
+    return query
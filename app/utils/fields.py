@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, create_model
+
+FIELDS_QUERY = Query(None, description="Comma separated list of fields to return")
+
+
+def parse_fields(fields: Optional[str], model: type[BaseModel]):
+    """Turn ?fields=a,b into a tuple of field names of model, or None for all."""
+    if not fields:
+        return None
+
+    names = (name.strip() for name in fields.split(","))
+    requested = tuple(dict.fromkeys(name for name in names if name))
+    if not requested:
+        return None
+
+    unknown = [name for name in requested if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return requested
+
+
+@lru_cache(maxsize=256)
+def narrow_model(model: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(
+        f"{model.__name__}Fields",
+        **{
+            name: (model.model_fields[name].annotation, model.model_fields[name])
+            for name in fields
+        },
+    )
+
+
+def select_columns(table, fields, key_fields=()):
+    # keyset columns are always fetched, the cursor is built from them
+    if fields is None:
+        return list(table.c)
+    return [column for column in table.c if column.name in (*fields, *key_fields)]
+
+
+def sparse_response(model: type[BaseModel], content) -> Response:
+    # the narrowed model leaves out what was not asked for, and returning a
+    # Response skips the route's full response_model
+    return Response(
+        content=model.model_validate(content, from_attributes=True).model_dump_json(),
+        media_type="application/json",
+    )
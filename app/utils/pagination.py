@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+import math
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(*values) -> str:
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def is_cursor_value(value, value_type) -> bool:
+    # ints are ids or levels, never negative, floats take any finite number
+    if isinstance(value, bool):
+        return False
+    if value_type is int:
+        return isinstance(value, int) and value >= 0
+    if value_type is float:
+        return isinstance(value, (int, float)) and math.isfinite(value)
+    return isinstance(value, value_type)
+
+
+def decode_cursor(cursor: str, types: tuple) -> list:
+    """Decode a cursor holding one value of each type, e.g. (float, int).
+
+    Cursors come back from clients, anything else is rejected with a 400
+    before it reaches a query.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(map(is_cursor_value, values, types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def build_page(rows, limit: int, cursor_key) -> dict:
+    # queries fetch limit + 1 rows, the extra row only tells there is a next page
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(*cursor_key(items[-1]))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,205 @@
+import csv
+import io
+import json
+import zlib
+
+from sqlalchemy import Text, cast, func, select, text
+from sqlalchemy.orm import Session
+
+from app.config import EXPORT_BATCH_SIZE
+from app.db_connection import SessionLocal, get_read_engine
+from app.models import (
+    Attribute,
+    AttributeValue,
+    Product,
+    ProductImage,
+    ProductLine,
+    ProductLineAttributeValue,
+)
+from app.utils.product_import import (
+    CSV_ATTRIBUTE_PREFIX,
+    CSV_IMAGES_COLUMN,
+    CSV_LINE_COLUMNS,
+    IMAGE_COLUMNS,
+    LINE_COLUMNS,
+    PRODUCT_COLUMNS,
+)
+from app.utils.product_routes import json_array, json_object
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def table_columns(table, names):
+    return [table.c[name] for name in names]
+
+
+def line_images_query():
+    return (
+        select(
+            json_array(
+                json_object(table_columns(ProductImage.__table__, IMAGE_COLUMNS)),
+                ProductImage.order,
+            )
+        )
+        .where(ProductImage.product_line_id == ProductLine.id)
+        .scalar_subquery()
+    )
+
+
+def line_attribute_values_query():
+    return (
+        select(
+            func.coalesce(
+                func.json_object_agg(Attribute.name, AttributeValue.attribute_value),
+                text("'{}'::json"),
+            )
+        )
+        .join_from(ProductLineAttributeValue, AttributeValue)
+        .join(Attribute)
+        .where(ProductLineAttributeValue.product_line_id == ProductLine.id)
+        .scalar_subquery()
+    )
+
+
+def export_documents_query(after_id: int | None):
+    # one json document per product in the ProductImport shape, so an export
+    # can be fed back to the import as is
+    product_lines = (
+        select(
+            json_array(
+                json_object(
+                    table_columns(ProductLine.__table__, LINE_COLUMNS),
+                    product_images=line_images_query(),
+                    attribute_values=line_attribute_values_query(),
+                ),
+                ProductLine.order,
+            )
+        )
+        .where(ProductLine.product_id == Product.id)
+        .scalar_subquery()
+    )
+    query = select(
+        cast(
+            json_object(
+                table_columns(Product.__table__, ("id", *PRODUCT_COLUMNS)),
+                product_lines=product_lines,
+            ),
+            Text,
+        )
+    ).order_by(Product.id)
+    if after_id is not None:
+        query = query.where(Product.id > after_id)
+    return query
+
+
+def export_rows_query(after_id: int | None):
+    # one row per product line, products without lines get a single row
+    line_columns = [
+        ProductLine.__table__.c[name].label(column)
+        for column, name in CSV_LINE_COLUMNS.items()
+    ]
+    query = (
+        select(
+            *table_columns(Product.__table__, ("id", *PRODUCT_COLUMNS)),
+            *line_columns,
+            cast(line_images_query(), Text).label(CSV_IMAGES_COLUMN),
+            cast(line_attribute_values_query(), Text).label("attribute_values"),
+        )
+        .outerjoin(ProductLine, ProductLine.product_id == Product.id)
+        .order_by(Product.id, ProductLine.order)
+    )
+    if after_id is not None:
+        query = query.where(Product.id > after_id)
+    return query
+
+
+def write_ndjson(db: Session, after_id: int | None, batch_size: int):
+    result = db.execute(
+        export_documents_query(after_id).execution_options(yield_per=batch_size)
+    )
+    for documents in result.scalars().partitions():
+        yield "".join(f"{document}\n" for document in documents)
+
+
+def split_last_product(rows: list) -> tuple[list, list]:
+    # rows are in product id order, the last product may have more to come
+    end = len(rows)
+    while end and rows[end - 1]["id"] == rows[-1]["id"]:
+        end -= 1
+    return rows[:end], rows[end:]
+
+
+def write_csv(db: Session, after_id: int | None, batch_size: int):
+    attributes = db.scalars(select(Attribute.name).order_by(Attribute.name)).all()
+    columns = ["id", *PRODUCT_COLUMNS, *CSV_LINE_COLUMNS, CSV_IMAGES_COLUMN]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(
+        columns + [f"{CSV_ATTRIBUTE_PREFIX}{attribute}" for attribute in attributes]
+    )
+
+    def write_rows(rows):
+        for row in rows:
+            values = json.loads(row["attribute_values"])
+            writer.writerow(
+                [row[column] for column in columns]
+                + [values.get(attribute) for attribute in attributes]
+            )
+
+    result = db.execute(
+        export_rows_query(after_id).execution_options(yield_per=batch_size)
+    )
+    pending = []
+    for rows in result.mappings().partitions():
+        # a partition can stop partway through a product's lines, those are
+        # held back for the next batch so every batch ends on a whole product
+        rows, pending = split_last_product(pending + list(rows))
+        if rows:
+            write_rows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    write_rows(pending)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+EXPORT_WRITERS = {"csv": write_csv, "ndjson": write_ndjson}
+
+
+def gzip_batches(batches):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for batch in batches:
+        # a sync flush per batch hands each batch to the client right away
+        # instead of holding it back in the compressor
+        yield compressor.compress(batch) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_products(
+    export_format: str,
+    after_id: int | None = None,
+    gzip: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+):
+    """Stream the catalog in id order as bytes, about batch_size rows at a time.
+
+    Rows come from a server-side cursor (yield_per), so memory does not grow
+    with the catalog and the first batch is sent as soon as it is fetched.
+    Batches end on whole products. A download cut off mid batch resumes with
+    after_id set to the last product received complete: the last whole NDJSON
+    line, or for CSV the id before the last one received, whose rows may have
+    been cut short.
+    The generator owns its session, it outlives the request's session, and
+    reads one REPEATABLE READ snapshot (of a replica when there are any) so a
+    CSV header matches its rows.
+    """
+    with SessionLocal(bind=get_read_engine()) as db:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        batches = (
+            batch.encode()
+            for batch in EXPORT_WRITERS[export_format](db, after_id, batch_size)
+        )
+        yield from gzip_batches(batches) if gzip else batches
@@ -0,0 +1,82 @@
+from fastapi import HTTPException
+from sqlalchemy import func, intersect, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models import Attribute, AttributeValue, ProductFacet
+
+
+def group_by_attribute(db: Session, value_ids) -> dict[int, list[int]]:
+    attribute_ids = dict(
+        db.execute(
+            select(AttributeValue.id, AttributeValue.attribute_id).where(
+                AttributeValue.id.in_(set(value_ids))
+            )
+        ).all()
+    )
+    unknown = [value_id for value_id in value_ids if value_id not in attribute_ids]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown attribute values: {', '.join(map(str, unknown))}",
+        )
+
+    groups = {}
+    for value_id in dict.fromkeys(value_ids):
+        groups.setdefault(attribute_ids[value_id], []).append(value_id)
+    return groups
+
+
+def matching_products_query(groups: dict[int, list[int]], exclude=None):
+    # values of one attribute are alternatives (OR), attributes narrow (AND).
+    # None when no attribute is left to narrow by
+    selects = [
+        select(ProductFacet.product_id).where(
+            ProductFacet.attribute_value_id.in_(value_ids)
+        )
+        for attribute_id, value_ids in groups.items()
+        if attribute_id != exclude
+    ]
+    if len(selects) > 1:
+        return intersect(*selects)
+    return selects[0] if selects else None
+
+
+def value_counts_query(matched):
+    query = (
+        select(ProductFacet.attribute_value_id, func.count().label("count"))
+        .join(AttributeValue)
+        .group_by(ProductFacet.attribute_value_id)
+    )
+    if matched is not None:
+        query = query.where(ProductFacet.product_id.in_(matched))
+    return query
+
+
+def facet_counts_query(groups: dict[int, list[int]]):
+    # each attribute is counted against the other attributes' filters only, so
+    # picking a size still shows how many products the other sizes have
+    counts = [
+        value_counts_query(matching_products_query(groups, exclude=attribute_id)).where(
+            AttributeValue.attribute_id == attribute_id
+        )
+        for attribute_id in groups
+    ]
+    counts.append(
+        value_counts_query(matching_products_query(groups)).where(
+            AttributeValue.attribute_id.not_in(list(groups))
+        )
+    )
+    counts = union_all(*counts).subquery("facet_counts")
+
+    return (
+        select(
+            AttributeValue.attribute_id,
+            Attribute.name.label("attribute"),
+            AttributeValue.id.label("attribute_value_id"),
+            AttributeValue.attribute_value,
+            func.coalesce(counts.c.count, 0).label("count"),
+        )
+        .join(Attribute)
+        .outerjoin(counts, counts.c.attribute_value_id == AttributeValue.id)
+        .order_by(Attribute.name, AttributeValue.attribute_value)
+    )
@@ -0,0 +1,516 @@
+import csv
+import io
+import json
+from itertools import groupby, islice
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    delete,
+    exists,
+    func,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import IMPORT_CHUNK_SIZE
+from app.models import (
+    Attribute,
+    AttributeValue,
+    Category,
+    Product,
+    ProductImage,
+    ProductLine,
+    ProductLineAttributeValue,
+    SeasonalEvents,
+)
+from app.schemas.import_schemas import ProductImport
+
+MAX_IMPORT_ERRORS = 100
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+PRODUCT_COLUMNS = (
+    "slug",
+    "name",
+    "description",
+    "is_digital",
+    "is_active",
+    "category_id",
+    "seasonal_id",
+)
+LINE_COLUMNS = ("sku", "price", "stock_qty", "is_active", "order", "weight")
+IMAGE_COLUMNS = ("url", "alternative_text", "order")
+
+# CSV feeds have one row per product line, consecutive rows with the same slug
+# are one product. The line's is_active is renamed to keep it apart from the
+# product's, images are a JSON array and each attribute gets its own column
+CSV_LINE_COLUMNS = {
+    "sku": "sku",
+    "price": "price",
+    "stock_qty": "stock_qty",
+    "line_is_active": "is_active",
+    "order": "order",
+    "weight": "weight",
+}
+CSV_IMAGES_COLUMN = "images"
+CSV_ATTRIBUTE_PREFIX = "attribute."
+
+# per connection and emptied by every commit, kept out of Base.metadata so
+# alembic does not pick them up
+staging_metadata = MetaData()
+
+
+def staging_table(name: str, *columns) -> Table:
+    return Table(
+        name,
+        staging_metadata,
+        *columns,
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DELETE ROWS",
+    )
+
+
+def copy_columns(table: Table, names) -> list[Column]:
+    return [Column(name, table.c[name].type) for name in names]
+
+
+import_product = staging_table(
+    "import_product",
+    Column("line", Integer, nullable=False),
+    *copy_columns(Product.__table__, PRODUCT_COLUMNS),
+)
+import_product_line = staging_table(
+    "import_product_line",
+    Column("product_slug", Product.__table__.c.slug.type),
+    *copy_columns(ProductLine.__table__, LINE_COLUMNS),
+)
+import_product_image = staging_table(
+    "import_product_image",
+    Column("sku", ProductLine.__table__.c.sku.type),
+    *copy_columns(ProductImage.__table__, IMAGE_COLUMNS),
+)
+import_product_line_attribute_value = staging_table(
+    "import_product_line_attribute_value",
+    Column("sku", ProductLine.__table__.c.sku.type),
+    Column("attribute", String(100)),
+    Column("attribute_value", String(100)),
+)
+
+
+def get_import_format(filename: str) -> str:
+    for suffix, import_format in IMPORT_FORMATS.items():
+        if filename.lower().endswith(suffix):
+            return import_format
+    raise ValueError(
+        f"Unknown import format, expected one of: {', '.join(IMPORT_FORMATS)}"
+    )
+
+
+def read_ndjson(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def csv_product_line(row: dict) -> dict | None:
+    product_line = {
+        key: row[column] for column, key in CSV_LINE_COLUMNS.items() if row.get(column)
+    }
+    if not product_line:
+        return None
+
+    images = row.get(CSV_IMAGES_COLUMN)
+    if images:
+        try:
+            product_line["product_images"] = json.loads(images)
+        except json.JSONDecodeError:
+            # left as is, validation then reports it against the field
+            product_line["product_images"] = images
+    product_line["attribute_values"] = {
+        column.removeprefix(CSV_ATTRIBUTE_PREFIX): value
+        for column, value in row.items()
+        if column and column.startswith(CSV_ATTRIBUTE_PREFIX) and value
+    }
+    return product_line
+
+
+def read_csv(lines):
+    reader = csv.DictReader(lines)
+    read_error = None
+
+    def rows():
+        # grouping reads one row ahead, a read error is held back until the
+        # product before the bad line is yielded
+        nonlocal read_error
+        try:
+            for row in reader:
+                yield reader.line_num, row
+        except (UnicodeDecodeError, csv.Error) as error:
+            read_error = error
+
+    for _, group in groupby(rows(), key=lambda item: item[1].get("slug")):
+        group = list(group)
+        line_number, first = group[0]
+        # empty cells fall back to the schema defaults
+        product = {
+            column: first[column] for column in PRODUCT_COLUMNS if first.get(column)
+        }
+        product_lines = (csv_product_line(row) for _, row in group)
+        product["product_lines"] = [line for line in product_lines if line]
+        yield line_number, product
+
+    if read_error is not None:
+        raise read_error
+
+
+IMPORT_READERS = {
+    "csv": (read_csv, ProductImport.model_validate),
+    "ndjson": (read_ndjson, ProductImport.model_validate_json),
+}
+
+
+def validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, detail['loc'])) or 'record'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def staging_rows(chunk: list[tuple[int, ProductImport]]) -> dict[Table, list[dict]]:
+    # a slug or sku repeated inside the chunk is merged once, the last one wins.
+    # A repeated slug takes the last record's lines too, so the line orders of
+    # a staged product are the ones validated together
+    products, product_lines, images, attribute_values = {}, {}, {}, {}
+    for line_number, product in chunk:
+        if product.slug in products:
+            for sku, row in list(product_lines.items()):
+                if row["product_slug"] == product.slug:
+                    del product_lines[sku], images[sku], attribute_values[sku]
+        products[product.slug] = {
+            "line": line_number,
+            **product.model_dump(include=set(PRODUCT_COLUMNS)),
+        }
+        for product_line in product.product_lines:
+            sku = product_line.sku
+            product_lines[sku] = {
+                "product_slug": product.slug,
+                **product_line.model_dump(include=set(LINE_COLUMNS)),
+            }
+            images[sku] = [
+                {"sku": sku, **image.model_dump()}
+                for image in product_line.product_images
+            ]
+            attribute_values[sku] = [
+                {"sku": sku, "attribute": attribute, "attribute_value": value}
+                for attribute, value in product_line.attribute_values.items()
+            ]
+
+    return {
+        import_product: list(products.values()),
+        import_product_line: list(product_lines.values()),
+        import_product_image: [row for rows in images.values() for row in rows],
+        import_product_line_attribute_value: [
+            row for rows in attribute_values.values() for row in rows
+        ],
+    }
+
+
+def copy_value(value) -> str:
+    # COPY text format, NULL is \N and backslashes and separators are escaped
+    if value is None:
+        return "\\N"
+    if not isinstance(value, str):
+        return str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(db: Session, table: Table, rows: list[dict]):
+    if not rows:
+        return
+    columns = [column.name for column in table.c]
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({quoted}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+
+def reject_products_queries():
+    staged = import_product
+    earlier = import_product.alias("earlier")
+    staged_line = import_product_line
+    return [
+        (
+            ~exists().where(Category.id == staged.c.category_id),
+            "Category not found",
+        ),
+        (
+            and_(
+                staged.c.seasonal_id.is_not(None),
+                ~exists().where(SeasonalEvents.id == staged.c.seasonal_id),
+            ),
+            "Seasonal event not found",
+        ),
+        (
+            exists().where(
+                Product.name == staged.c.name, Product.slug != staged.c.slug
+            ),
+            "Product name already exists",
+        ),
+        (
+            exists().where(
+                earlier.c.name == staged.c.name, earlier.c.line < staged.c.line
+            ),
+            "Product name repeated in the feed",
+        ),
+        (
+            # checked row by row by the upsert, so two stored lines swapping
+            # their orders in one import are rejected too
+            exists()
+            .where(staged_line.c.product_slug == staged.c.slug)
+            .where(Product.slug == staged.c.slug)
+            .where(ProductLine.product_id == Product.id)
+            .where(ProductLine.order == staged_line.c.order)
+            .where(ProductLine.sku != staged_line.c.sku),
+            "Product line order already exists",
+        ),
+    ]
+
+
+def reject_staged_products(db: Session) -> list[tuple[int, str]]:
+    """Drop staged products that would fail a foreign key or unique constraint,
+    together with their lines, so one bad record does not fail its chunk.
+
+    Checks run in order, a product rejected by one is gone for the next, so
+    of two records sharing a name only the later one is rejected.
+    """
+    rejected = []
+    for condition, detail in reject_products_queries():
+        lines = db.scalars(
+            delete(import_product).where(condition).returning(import_product.c.line)
+        )
+        rejected.extend((line, detail) for line in lines)
+
+    if rejected:
+        db.execute(
+            delete(import_product_line).where(
+                import_product_line.c.product_slug.not_in(select(import_product.c.slug))
+            )
+        )
+        for table in (import_product_image, import_product_line_attribute_value):
+            db.execute(
+                delete(table).where(
+                    table.c.sku.not_in(select(import_product_line.c.sku))
+                )
+            )
+    return rejected
+
+
+def upsert_changed(statement, constraint: str, columns, **values):
+    # rows already matching the feed are not rewritten, so re-importing an
+    # unchanged feed leaves no dead tuples and fires no row triggers
+    table = statement.table
+    return statement.on_conflict_do_update(
+        constraint=constraint,
+        set_={**{name: statement.excluded[name] for name in columns}, **values},
+        where=tuple_(*(table.c[name] for name in columns)).is_distinct_from(
+            tuple_(*(statement.excluded[name] for name in columns))
+        ),
+    )
+
+
+def upsert_products_query():
+    columns = [name for name in PRODUCT_COLUMNS if name != "slug"]
+    statement = insert(Product).from_select(
+        PRODUCT_COLUMNS, select(*(import_product.c[name] for name in PRODUCT_COLUMNS))
+    )
+    return upsert_changed(statement, "uq_product_slug", columns, updated_at=func.now())
+
+
+def upsert_product_lines_query():
+    staged = import_product_line
+    statement = insert(ProductLine).from_select(
+        ["product_id", *LINE_COLUMNS],
+        select(Product.id, *(staged.c[name] for name in LINE_COLUMNS)).join(
+            Product, Product.slug == staged.c.product_slug
+        ),
+    )
+    columns = ["product_id", *(name for name in LINE_COLUMNS if name != "sku")]
+    return upsert_changed(statement, "uq_product_line_sku", columns)
+
+
+def upsert_product_images_query():
+    staged = import_product_image
+    statement = insert(ProductImage).from_select(
+        ["product_line_id", *IMAGE_COLUMNS],
+        select(ProductLine.id, *(staged.c[name] for name in IMAGE_COLUMNS)).join(
+            ProductLine, ProductLine.sku == staged.c.sku
+        ),
+    )
+    return upsert_changed(
+        statement,
+        "uq_product_image_order_product_line_id",
+        ["url", "alternative_text"],
+    )
+
+
+def merge_attribute_values_queries():
+    staged = import_product_line_attribute_value
+    attributes = (
+        insert(Attribute)
+        .from_select(["name"], select(staged.c.attribute).distinct())
+        .on_conflict_do_nothing(constraint="uq_attribute_name")
+    )
+    values = (
+        insert(AttributeValue)
+        .from_select(
+            ["attribute_value", "attribute_id"],
+            select(staged.c.attribute_value, Attribute.id)
+            .join(Attribute, Attribute.name == staged.c.attribute)
+            .distinct(),
+        )
+        .on_conflict_do_nothing(constraint="uq_attribute_value_attribute_id")
+    )
+    # a line has one value per attribute, the value it had before is replaced
+    replaced = delete(ProductLineAttributeValue).where(
+        ProductLineAttributeValue.product_line_id == ProductLine.id,
+        ProductLine.sku == staged.c.sku,
+        ProductLineAttributeValue.attribute_value_id == AttributeValue.id,
+        AttributeValue.attribute_id == Attribute.id,
+        Attribute.name == staged.c.attribute,
+        AttributeValue.attribute_value != staged.c.attribute_value,
+    )
+    line_values = (
+        insert(ProductLineAttributeValue)
+        .from_select(
+            ["product_line_id", "attribute_value_id"],
+            select(ProductLine.id, AttributeValue.id)
+            .select_from(staged)
+            .join(ProductLine, ProductLine.sku == staged.c.sku)
+            .join(Attribute, Attribute.name == staged.c.attribute)
+            .join(
+                AttributeValue,
+                and_(
+                    AttributeValue.attribute_id == Attribute.id,
+                    AttributeValue.attribute_value == staged.c.attribute_value,
+                ),
+            ),
+        )
+        .on_conflict_do_nothing(constraint="uq_product_line_attribute_value")
+    )
+    return attributes, values, replaced, line_values
+
+
+def merge_chunk(db: Session, chunk: list[tuple[int, ProductImport]]):
+    staging_metadata.create_all(db.connection(), checkfirst=True)
+    for table, rows in staging_rows(chunk).items():
+        copy_rows(db, table, rows)
+
+    rejected = reject_staged_products(db)
+    counts = {
+        "products": db.execute(upsert_products_query()).rowcount,
+        "product_lines": db.execute(upsert_product_lines_query()).rowcount,
+        "product_images": db.execute(upsert_product_images_query()).rowcount,
+    }
+    *attribute_queries, line_values = merge_attribute_values_queries()
+    for statement in attribute_queries:
+        db.execute(statement)
+    counts["attribute_values"] = db.execute(line_values).rowcount
+    return counts, rejected
+
+
+def import_products(
+    db: Session, lines, import_format: str, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> dict:
+    """Stream a CSV or NDJSON feed into the catalog, chunk_size products at a time.
+
+    Each chunk is validated, COPY'd into the staging tables and merged with
+    set-based upserts keyed by product slug, line sku, image order and
+    attribute name, then committed. Only one chunk is held in memory, and a
+    chunk failing in the database is rolled back and reported without
+    stopping the import. A line that is not valid UTF-8 or CSV is reported
+    and ends the import. Lines, images and attribute values missing from the
+    feed are left in place.
+    """
+    read, validate = IMPORT_READERS[import_format]
+    result = {
+        "records": 0,
+        "products": 0,
+        "product_lines": 0,
+        "product_images": 0,
+        "attribute_values": 0,
+        "skipped": 0,
+        "errors": [],
+    }
+
+    def skip(line_number: int, detail: str):
+        result["skipped"] += 1
+        if len(result["errors"]) < MAX_IMPORT_ERRORS:
+            result["errors"].append({"line": line_number, "detail": detail})
+
+    read_lines = 0
+
+    def counted(lines):
+        nonlocal read_lines
+        for read_lines, line in enumerate(lines, start=1):
+            yield line
+
+    def validated(records):
+        # a feed that cannot be decoded or parsed further ends the import, the
+        # records read before it are still merged
+        try:
+            for line_number, record in records:
+                result["records"] += 1
+                try:
+                    yield line_number, validate(record)
+                except ValidationError as error:
+                    skip(line_number, validation_detail(error))
+        except UnicodeDecodeError as error:
+            skip(
+                read_lines + 1,
+                f"Feed not read from this line: not valid UTF-8, {error.reason}",
+            )
+        except csv.Error as error:
+            skip(read_lines, f"Feed not read from this line: {error}")
+
+    for chunk in chunked(validated(read(counted(lines))), chunk_size):
+        try:
+            counts, rejected = merge_chunk(db, chunk)
+            db.commit()
+        except IntegrityError as error:
+            db.rollback()
+            detail = f"Chunk not imported: {str(error.orig).splitlines()[0]}"
+            rejected = [(line_number, detail) for line_number, _ in chunk]
+            counts = {}
+
+        for key, count in counts.items():
+            result[key] += count
+        for line_number, detail in sorted(rejected):
+            skip(line_number, detail)
+    return result
@@ -0,0 +1,210 @@
+from itertools import chain
+
+from fastapi import HTTPException
+from sqlalchemy import REAL, Text, and_, cast, func, literal, or_, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.loader_options import PRODUCT_DETAIL
+from app.models import (
+    Attribute,
+    AttributeValue,
+    Product,
+    ProductImage,
+    ProductLine,
+    ProductLineAttributeValue,
+    ProductProductType,
+)
+from app.schemas.attribute_schemas import AttributeReturn
+from app.schemas.product_schemas import (
+    ProductImageReturn,
+    ProductLineReturn,
+    ProductReturn,
+)
+from app.utils.category_routes import category_descendants_query
+from app.utils.fields import select_columns
+from app.utils.pagination import build_page
+from app.utils.product_facets import (
+    facet_counts_query,
+    group_by_attribute,
+    matching_products_query,
+)
+
+# the columns behind ProductReturn, product also has the search_vector column
+PRODUCT_FIELDS = tuple(ProductReturn.model_fields)
+# must match the configuration the search_vector column is generated with
+SEARCH_CONFIG = "english"
+
+
+def list_products_query(
+    after_id: int | None,
+    limit: int,
+    category_id=None,
+    fields=None,
+    in_stock=None,
+    seasonal_ids=None,
+    product_type_ids=None,
+):
+    query = (
+        select(
+            *select_columns(
+                Product.__table__, fields or PRODUCT_FIELDS, key_fields=("id",)
+            )
+        )
+        .order_by(Product.id)
+        .limit(limit + 1)
+    )
+    if after_id is not None:
+        query = query.where(Product.id > after_id)
+    if category_id is not None:
+        # the category and all of its descendants, via category_closure
+        query = query.where(
+            Product.category_id.in_(category_descendants_query(category_id))
+        )
+    if seasonal_ids is not None:
+        query = query.where(Product.seasonal_id.in_(seasonal_ids))
+    if product_type_ids is not None:
+        # served by uq_product_id_product_type_id, product_type_id leads it
+        query = query.where(
+            Product.id.in_(
+                select(ProductProductType.product_id).where(
+                    ProductProductType.product_type_id.in_(product_type_ids)
+                )
+            )
+        )
+    if in_stock is not None:
+        # stock_status is trigger maintained, in stock matches the partial indexes
+        query = query.where(
+            Product.stock_status == "is" if in_stock else Product.stock_status != "is"
+        )
+    return query
+
+
+def search_products_query(search: str, after: list | None, limit: int):
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, search)
+    rank = func.ts_rank(Product.search_vector, query)
+    statement = (
+        select(*select_columns(Product.__table__, PRODUCT_FIELDS), rank.label("rank"))
+        .where(Product.search_vector.bool_op("@@")(query))
+        .order_by(rank.desc(), Product.id)
+        .limit(limit + 1)
+    )
+    if after is not None:
+        # ts_rank is a real, the cursor keeps it exact only if compared as one
+        after_rank, after_id = cast(after[0], REAL), after[1]
+        statement = statement.where(
+            or_(rank < after_rank, and_(rank == after_rank, Product.id > after_id))
+        )
+    return statement
+
+
+def filter_products(
+    db: Session, attribute_value_ids: list[int], after_id: int | None, limit: int
+) -> dict:
+    # matching and counting run on the trigger maintained product_facet rows,
+    # only the rows of the page are loaded
+    groups = group_by_attribute(db, attribute_value_ids)
+    query = (
+        select(*select_columns(Product.__table__, PRODUCT_FIELDS))
+        .where(Product.id.in_(matching_products_query(groups)))
+        .order_by(Product.id)
+        .limit(limit + 1)
+    )
+    if after_id is not None:
+        query = query.where(Product.id > after_id)
+
+    page = build_page(
+        db.execute(query).mappings().all(), limit, lambda row: (row["id"],)
+    )
+    facets = db.execute(facet_counts_query(groups)).mappings().all()
+    return {**page, "facets": facets}
+
+
+def get_product_detail(db: Session, product_id: int) -> Product:
+    product = db.scalar(
+        select(Product).options(*PRODUCT_DETAIL).where(Product.id == product_id)
+    )
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+
+def schema_columns(table, schema):
+    return [table.c[name] for name in schema.model_fields]
+
+
+def json_object(columns, **nested):
+    # json_build_object rather than the jsonb variant keeps keys in schema order
+    pairs = [(column.key, column) for column in columns] + list(nested.items())
+    return func.json_build_object(
+        *chain.from_iterable((literal(key), value) for key, value in pairs)
+    )
+
+
+def json_array(element, order_by):
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(element, order_by)), text("'[]'::json")
+    )
+
+
+def product_document_query(where):
+    # the whole product page in one statement, each level is a correlated
+    # subquery aggregating its children into a json array
+    images = (
+        select(
+            json_array(
+                json_object(schema_columns(ProductImage.__table__, ProductImageReturn)),
+                ProductImage.order,
+            )
+        )
+        .where(ProductImage.product_line_id == ProductLine.id)
+        .scalar_subquery()
+    )
+    attribute_values = (
+        select(
+            json_array(
+                json_object(
+                    [AttributeValue.id, AttributeValue.attribute_value],
+                    attribute=json_object(
+                        schema_columns(Attribute.__table__, AttributeReturn)
+                    ),
+                ),
+                AttributeValue.id,
+            )
+        )
+        .join_from(ProductLineAttributeValue, AttributeValue)
+        .join(Attribute)
+        .where(ProductLineAttributeValue.product_line_id == ProductLine.id)
+        .scalar_subquery()
+    )
+    product_lines = (
+        select(
+            json_array(
+                json_object(
+                    schema_columns(ProductLine.__table__, ProductLineReturn),
+                    product_images=images,
+                    attribute_values=attribute_values,
+                ),
+                ProductLine.order,
+            )
+        )
+        .where(ProductLine.product_id == Product.id)
+        .scalar_subquery()
+    )
+    # cast to text so the driver hands back the document without parsing it
+    return select(
+        cast(
+            json_object(
+                schema_columns(Product.__table__, ProductReturn),
+                product_lines=product_lines,
+            ),
+            Text,
+        )
+    ).where(where)
+
+
+def get_product_document(db: Session, where) -> str:
+    document = db.scalar(product_document_query(where))
+    if document is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return document
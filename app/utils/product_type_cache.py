@@ -0,0 +1,84 @@
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.cache import VersionedCache
+from app.config import CACHE_CHECK_INTERVAL
+from app.models import ProductType
+
+
+class ProductTypeSnapshot:
+    """The product type tree with the ancestors and descendants of every type."""
+
+    def __init__(self, product_types):
+        self.by_id = {
+            product_type["id"]: product_type for product_type in product_types
+        }
+        self.children = {}
+        for product_type in product_types:
+            self.children.setdefault(product_type["parent_id"], []).append(
+                product_type["id"]
+            )
+
+        # root first, a parent_id cycle stops at the first repeated type
+        self.ancestor_ids = {}
+        for product_type_id in self.by_id:
+            path = []
+            parent_id = self.by_id[product_type_id]["parent_id"]
+            while parent_id in self.by_id and parent_id not in path:
+                path.append(parent_id)
+                parent_id = self.by_id[parent_id]["parent_id"]
+            self.ancestor_ids[product_type_id] = path[::-1]
+
+        # the type itself included
+        self.descendant_ids = {product_type_id: [] for product_type_id in self.by_id}
+        for product_type_id, ancestor_ids in self.ancestor_ids.items():
+            for ancestor_id in (*ancestor_ids, product_type_id):
+                self.descendant_ids[ancestor_id].append(product_type_id)
+
+    def get(self, product_type_id: int) -> dict:
+        product_type = self.by_id.get(product_type_id)
+        if product_type is None:
+            raise HTTPException(status_code=404, detail="Product type not found")
+        return product_type
+
+    def get_ancestors(self, product_type_id: int) -> list[dict]:
+        self.get(product_type_id)
+        return [
+            self.by_id[ancestor_id]
+            for ancestor_id in self.ancestor_ids[product_type_id]
+        ]
+
+    def get_descendant_ids(self, product_type_id: int) -> list[int]:
+        self.get(product_type_id)
+        return self.descendant_ids[product_type_id]
+
+    def build_tree(self, parent_id=None, seen=frozenset()) -> list[dict]:
+        return [
+            {
+                **self.by_id[child_id],
+                "children": self.build_tree(child_id, seen | {child_id}),
+            }
+            for child_id in self.children.get(parent_id, [])
+            if child_id not in seen
+        ]
+
+    def get_subtree(self, product_type_id: int) -> dict:
+        return {
+            **self.get(product_type_id),
+            "children": self.build_tree(product_type_id, frozenset({product_type_id})),
+        }
+
+
+def build_product_type_snapshot(db: Session) -> ProductTypeSnapshot:
+    product_types = db.execute(
+        select(*ProductType.__table__.c).order_by(ProductType.level, ProductType.name)
+    )
+    return ProductTypeSnapshot(
+        [dict(product_type) for product_type in product_types.mappings()]
+    )
+
+
+product_type_cache = VersionedCache(
+    "product_type", build_product_type_snapshot, CACHE_CHECK_INTERVAL
+)
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.cache import VersionedCache
+from app.config import CACHE_CHECK_INTERVAL
+from app.models import SeasonalEvents
+
+
+class SeasonalSchedule:
+    """The events running at one moment, valid until the next one starts or ends.
+
+    An event is running from its start_date (included) to its end_date
+    (excluded). Dates are naive, in the same timezone as datetime.now().
+    """
+
+    def __init__(self, events, next_start: datetime | None):
+        self.events = events
+        self.event_ids = [event["id"] for event in events]
+        changes = [event["end_date"] for event in events]
+        if next_start is not None:
+            changes.append(next_start)
+        self.next_change = min(changes, default=None)
+
+    def expired(self, now: datetime) -> bool:
+        return self.next_change is not None and now >= self.next_change
+
+
+def build_seasonal_schedule(db: Session) -> SeasonalSchedule:
+    # both reads are range scans of ix_seasonal_event_start_date_end_date
+    now = datetime.now()
+    events = db.execute(
+        select(*SeasonalEvents.__table__.c)
+        .where(SeasonalEvents.start_date <= now, SeasonalEvents.end_date > now)
+        .order_by(SeasonalEvents.start_date, SeasonalEvents.id)
+    )
+    next_start = db.scalar(
+        select(func.min(SeasonalEvents.start_date)).where(
+            SeasonalEvents.start_date > now
+        )
+    )
+    return SeasonalSchedule([dict(event) for event in events.mappings()], next_start)
+
+
+seasonal_schedule_cache = VersionedCache(
+    "seasonal_event", build_seasonal_schedule, CACHE_CHECK_INTERVAL
+)
+
+
+def get_seasonal_schedule(db: Session) -> SeasonalSchedule:
+    # writes are picked up through cache_version, the passing of time is not,
+    # so the snapshot is also dropped once its next start or end is reached
+    schedule = seasonal_schedule_cache.get(db)
+    if schedule.expired(datetime.now()):
+        seasonal_schedule_cache.invalidate()
+        schedule = seasonal_schedule_cache.get(db)
+    return schedule
@@ -0,0 +1,96 @@
+from sqlalchemy import Integer, and_, bindparam, cast, column, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session
+
+from app.models import ProductLine
+from app.schemas.stock_schemas import StockReservationItem
+
+
+def aggregate_reservation_items(items: list[StockReservationItem]) -> dict:
+    # a sku listed twice is reserved once with the summed quantity
+    quantities = {}
+    for item in items:
+        quantities[item.sku] = quantities.get(item.sku, 0) + item.qty
+    return quantities
+
+
+def reserve_stock_query(quantities: dict):
+    # the items are sent as two arrays and unnested into rows. Unlike a VALUES
+    # list (which has no cache key) the SQL is the same for any number of items,
+    # so it is compiled once and then served from the statement cache
+    requested_values = (
+        func.unnest(
+            cast(bindparam("skus", list(quantities)), ARRAY(UUID(as_uuid=True))),
+            cast(bindparam("qtys", list(quantities.values())), ARRAY(Integer)),
+        )
+        .table_valued(column("sku", UUID(as_uuid=True)), column("qty", Integer))
+        .render_derived(name="requested_values")
+    )
+    requested = select(requested_values.c.sku, requested_values.c.qty).cte("requested")
+
+    # lock the lines in id order, concurrent batches sharing skus then queue
+    # behind each other instead of deadlocking
+    locked = (
+        select(ProductLine.id, requested.c.qty)
+        .join(requested, ProductLine.sku == requested.c.sku)
+        .where(ProductLine.stock_qty >= requested.c.qty)
+        .order_by(ProductLine.id)
+        .with_for_update(of=ProductLine)
+        .cte("locked")
+    )
+    reserved = (
+        update(ProductLine)
+        .where(
+            and_(
+                ProductLine.id == locked.c.id,
+                ProductLine.stock_qty >= locked.c.qty,
+            )
+        )
+        .values(stock_qty=ProductLine.stock_qty - locked.c.qty)
+        .returning(ProductLine.sku, ProductLine.stock_qty)
+        .cte("reserved")
+    )
+    # product_line here is the snapshot from before the update, it only
+    # reports the stock available to the skus that could not be reserved
+    return (
+        select(
+            requested.c.sku,
+            requested.c.qty,
+            (reserved.c.sku.is_not(None)).label("reserved"),
+            ProductLine.stock_qty.label("available"),
+            reserved.c.stock_qty,
+        )
+        .select_from(requested)
+        .outerjoin(reserved, reserved.c.sku == requested.c.sku)
+        .outerjoin(ProductLine, ProductLine.sku == requested.c.sku)
+    )
+
+
+def reservation_result(row) -> dict:
+    if row.reserved:
+        return {
+            "sku": row.sku,
+            "qty": row.qty,
+            "reserved": True,
+            "stock_qty": row.stock_qty,
+        }
+    if row.available is None:
+        return {
+            "sku": row.sku,
+            "qty": row.qty,
+            "reserved": False,
+            "detail": "SKU not found",
+        }
+    return {
+        "sku": row.sku,
+        "qty": row.qty,
+        "reserved": False,
+        "stock_qty": row.available,
+        "detail": "Insufficient stock",
+    }
+
+
+def reserve_stock(db: Session, items: list[StockReservationItem]) -> list[dict]:
+    quantities = aggregate_reservation_items(items)
+    rows = {row.sku: row for row in db.execute(reserve_stock_query(quantities))}
+    return [reservation_result(rows[sku]) for sku in quantities]
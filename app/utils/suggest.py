@@ -0,0 +1,45 @@
+from sqlalchemy import func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.config import SUGGEST_CACHE_SIZE, SUGGEST_CACHE_TTL
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 20
+
+category_suggest_cache = TTLCache(SUGGEST_CACHE_SIZE, SUGGEST_CACHE_TTL)
+product_suggest_cache = TTLCache(SUGGEST_CACHE_SIZE, SUGGEST_CACHE_TTL)
+
+
+def suggest_query(model, search: str, limit: int, prefix_columns):
+    # both conditions are served by the gin_trgm_ops indexes: prefix matches
+    # come first, then names containing a word similar to what was typed
+    prefix = or_(
+        *(column.istartswith(search, autoescape=True) for column in prefix_columns)
+    )
+    similar = literal(search).op("<%")(model.name)
+    return (
+        select(model.id, model.name, model.slug)
+        .where(or_(prefix, similar))
+        .order_by(
+            prefix.desc(), func.word_similarity(search, model.name).desc(), model.name
+        )
+        .limit(limit)
+    )
+
+
+def get_suggestions(
+    db: Session, cache: TTLCache, model, search: str, limit: int, prefix_columns
+) -> list[dict]:
+    search = " ".join(search.split())
+    if not search:
+        return []
+
+    # matching is case insensitive, so is the cache
+    key = (search.casefold(), limit)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        rows = db.execute(suggest_query(model, search, limit, prefix_columns))
+        suggestions = [dict(row) for row in rows.mappings()]
+        cache.set(key, suggestions)
+    return suggestions
@@ -0,0 +1,31 @@
+"""product type cache version
+
+Revision ID: 2cc6c4aa8aaa
+Revises: cd6ccbc95819
+Create Date: 2026-10-18 16:03:11.719566
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2cc6c4aa8aaa'
+down_revision: Union[str, None] = 'cd6ccbc95819'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRODUCT_TYPE_CACHE_VERSION_TRIGGER = """
+CREATE TRIGGER product_type_cache_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON product_type
+FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version('product_type');
+"""
+
+
+def upgrade() -> None:
+    op.execute(PRODUCT_TYPE_CACHE_VERSION_TRIGGER)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER product_type_cache_version ON product_type")
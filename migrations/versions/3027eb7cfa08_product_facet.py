@@ -0,0 +1,122 @@
+"""product facet
+
+Revision ID: 3027eb7cfa08
+Revises: fd8dfc757ce3
+Create Date: 2026-10-18 15:51:58.724950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3027eb7cfa08'
+down_revision: Union[str, None] = 'fd8dfc757ce3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRODUCT_FACET_FUNCTIONS = """
+CREATE FUNCTION product_facet_adjust(
+    facet_product_id integer, facet_attribute_value_id integer, delta integer
+) RETURNS void AS $$
+BEGIN
+    IF delta > 0 THEN
+        INSERT INTO product_facet AS facet (product_id, attribute_value_id, line_count)
+        VALUES (facet_product_id, facet_attribute_value_id, delta)
+        ON CONFLICT (product_id, attribute_value_id)
+        DO UPDATE SET line_count = facet.line_count + delta;
+    ELSE
+        UPDATE product_facet SET line_count = line_count + delta
+        WHERE product_id = facet_product_id
+          AND attribute_value_id = facet_attribute_value_id;
+        DELETE FROM product_facet
+        WHERE product_id = facet_product_id
+          AND attribute_value_id = facet_attribute_value_id
+          AND line_count <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION product_facet_line_attribute_value() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM product_facet_adjust(product_id, OLD.attribute_value_id, -1)
+        FROM product_line WHERE id = OLD.product_line_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM product_facet_adjust(product_id, NEW.attribute_value_id, 1)
+        FROM product_line WHERE id = NEW.product_line_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION product_facet_line_move() RETURNS trigger AS $$
+BEGIN
+    PERFORM product_facet_adjust(OLD.product_id, attribute_value_id, -1),
+            product_facet_adjust(NEW.product_id, attribute_value_id, 1)
+    FROM product_line_attribute_value WHERE product_line_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER product_facet_line_attribute_value
+AFTER INSERT OR UPDATE OR DELETE ON product_line_attribute_value
+FOR EACH ROW EXECUTE FUNCTION product_facet_line_attribute_value();
+
+CREATE TRIGGER product_facet_line_move
+AFTER UPDATE OF product_id ON product_line
+FOR EACH ROW
+WHEN (OLD.product_id IS DISTINCT FROM NEW.product_id)
+EXECUTE FUNCTION product_facet_line_move();
+"""
+
+PRODUCT_FACET_BACKFILL = """
+INSERT INTO product_facet (product_id, attribute_value_id, line_count)
+SELECT product_line.product_id, line_value.attribute_value_id, COUNT(*)
+FROM product_line_attribute_value AS line_value
+JOIN product_line ON product_line.id = line_value.product_line_id
+GROUP BY product_line.product_id, line_value.attribute_value_id;
+"""
+
+# the facet index also holds attribute and value names, so those bump it too
+PRODUCT_FACET_CACHE_VERSION_TABLES = ("product_facet", "attribute", "attribute_value")
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('product_facet',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('attribute_value_id', sa.Integer(), nullable=False),
+    sa.Column('line_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['attribute_value_id'], ['attribute_value.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('product_id', 'attribute_value_id')
+    )
+    # ### end Alembic commands ###
+    op.execute(PRODUCT_FACET_FUNCTIONS)
+    op.execute(PRODUCT_FACET_BACKFILL)
+    for table in PRODUCT_FACET_CACHE_VERSION_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_product_facet_cache_version "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version('product_facet')"
+        )
+
+
+def downgrade() -> None:
+    for table in PRODUCT_FACET_CACHE_VERSION_TABLES:
+        op.execute(f"DROP TRIGGER {table}_product_facet_cache_version ON {table}")
+    op.execute("DROP TRIGGER product_facet_line_move ON product_line")
+    op.execute(
+        "DROP TRIGGER product_facet_line_attribute_value "
+        "ON product_line_attribute_value"
+    )
+    op.execute("DROP FUNCTION product_facet_line_move()")
+    op.execute("DROP FUNCTION product_facet_line_attribute_value()")
+    op.execute("DROP FUNCTION product_facet_adjust(integer, integer, integer)")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('product_facet')
+    # ### end Alembic commands ###
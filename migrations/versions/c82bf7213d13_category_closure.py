@@ -0,0 +1,113 @@
+"""category closure
+
+Revision ID: c82bf7213d13
+Revises: 9c2cb9c4c880
+Create Date: 2026-10-18 15:43:19.322122
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c82bf7213d13'
+down_revision: Union[str, None] = '9c2cb9c4c880'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATEGORY_CLOSURE_FUNCTIONS = """
+CREATE FUNCTION category_closure_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+    SELECT NEW.id, NEW.id, 0
+    UNION ALL
+    SELECT ancestor_id, NEW.id, depth + 1
+    FROM category_closure
+    WHERE descendant_id = NEW.parent_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION category_closure_reparent() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM category_closure
+        WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+    ) THEN
+        RAISE EXCEPTION 'category % cannot be moved under its own descendant %',
+            NEW.id, NEW.parent_id;
+    END IF;
+
+    -- unlink the subtree from its old ancestors
+    DELETE FROM category_closure AS link
+    USING category_closure AS subtree, category_closure AS old_path
+    WHERE subtree.ancestor_id = NEW.id
+      AND link.descendant_id = subtree.descendant_id
+      AND old_path.descendant_id = NEW.id
+      AND old_path.depth > 0
+      AND link.ancestor_id = old_path.ancestor_id;
+
+    -- and link it under the ancestors of its new parent
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+    SELECT above.ancestor_id, subtree.descendant_id, above.depth + subtree.depth + 1
+    FROM category_closure AS above
+    CROSS JOIN category_closure AS subtree
+    WHERE above.descendant_id = NEW.parent_id
+      AND subtree.ancestor_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER category_closure_insert
+AFTER INSERT ON category
+FOR EACH ROW EXECUTE FUNCTION category_closure_insert();
+
+CREATE TRIGGER category_closure_reparent
+AFTER UPDATE OF parent_id ON category
+FOR EACH ROW
+WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+EXECUTE FUNCTION category_closure_reparent();
+"""
+
+CATEGORY_CLOSURE_BACKFILL = """
+INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE paths AS (
+    SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+    FROM category
+    UNION ALL
+    SELECT paths.ancestor_id, category.id, paths.depth + 1
+    FROM paths
+    JOIN category ON category.parent_id = paths.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM paths;
+"""
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('category_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.CheckConstraint('depth >= 0', name='category_closure_depth_check'),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['category.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['category.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_category_closure_descendant_id_depth', 'category_closure', ['descendant_id', 'depth'], unique=False)
+    # ### end Alembic commands ###
+    op.execute(CATEGORY_CLOSURE_FUNCTIONS)
+    op.execute(CATEGORY_CLOSURE_BACKFILL)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER category_closure_reparent ON category")
+    op.execute("DROP TRIGGER category_closure_insert ON category")
+    op.execute("DROP FUNCTION category_closure_reparent()")
+    op.execute("DROP FUNCTION category_closure_insert()")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_category_closure_descendant_id_depth', table_name='category_closure')
+    op.drop_table('category_closure')
+    # ### end Alembic commands ###
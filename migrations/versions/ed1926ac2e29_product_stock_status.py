@@ -0,0 +1,109 @@
+"""product stock status
+
+Revision ID: ed1926ac2e29
+Revises: 0592d6e904cd
+Create Date: 2026-10-18 16:00:33.814476
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ed1926ac2e29'
+down_revision: Union[str, None] = '0592d6e904cd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# a product is in stock while any of its active lines has stock. Without stock
+# it stays on back order if it was, and is out of stock otherwise
+PRODUCT_STOCK_STATUS_FUNCTIONS = """
+CREATE FUNCTION product_stock_status_refresh(product_ids integer[]) RETURNS void AS $$
+BEGIN
+    UPDATE product
+    SET stock_status = computed.stock_status
+    FROM (
+        SELECT product.id,
+               CASE
+                   WHEN EXISTS (
+                       SELECT 1 FROM product_line
+                       WHERE product_line.product_id = product.id
+                         AND product_line.is_active
+                         AND product_line.stock_qty > 0
+                   ) THEN 'is'
+                   WHEN product.stock_status = 'obo' THEN 'obo'
+                   ELSE 'oos'
+               END::status_enum AS stock_status
+        FROM product
+        WHERE product.id = ANY(product_ids)
+    ) AS computed
+    WHERE product.id = computed.id
+      AND product.stock_status <> computed.stock_status;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION product_stock_status_lines() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM product_stock_status_refresh(
+            ARRAY(SELECT DISTINCT product_id FROM new_lines)
+        );
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM product_stock_status_refresh(
+            ARRAY(SELECT DISTINCT product_id FROM old_lines)
+        );
+    ELSE
+        -- only lines whose stock, active flag or product actually changed
+        PERFORM product_stock_status_refresh(ARRAY(
+            SELECT unnest(ARRAY[old_lines.product_id, new_lines.product_id])
+            FROM old_lines JOIN new_lines ON new_lines.id = old_lines.id
+            WHERE (old_lines.stock_qty, old_lines.is_active, old_lines.product_id)
+                IS DISTINCT FROM
+                  (new_lines.stock_qty, new_lines.is_active, new_lines.product_id)
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER product_stock_status_insert
+AFTER INSERT ON product_line
+REFERENCING NEW TABLE AS new_lines
+FOR EACH STATEMENT EXECUTE FUNCTION product_stock_status_lines();
+
+CREATE TRIGGER product_stock_status_update
+AFTER UPDATE ON product_line
+REFERENCING OLD TABLE AS old_lines NEW TABLE AS new_lines
+FOR EACH STATEMENT EXECUTE FUNCTION product_stock_status_lines();
+
+CREATE TRIGGER product_stock_status_delete
+AFTER DELETE ON product_line
+REFERENCING OLD TABLE AS old_lines
+FOR EACH STATEMENT EXECUTE FUNCTION product_stock_status_lines();
+"""
+
+PRODUCT_STOCK_STATUS_BACKFILL = """
+SELECT product_stock_status_refresh(ARRAY(SELECT id FROM product));
+"""
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_index('ix_product_in_stock_category_id_id', 'product', ['category_id', 'id'], unique=False, postgresql_where=sa.text("stock_status = 'is'"))
+    op.create_index('ix_product_in_stock_id', 'product', ['id'], unique=False, postgresql_where=sa.text("stock_status = 'is'"))
+    # ### end Alembic commands ###
+    op.execute(PRODUCT_STOCK_STATUS_FUNCTIONS)
+    op.execute(PRODUCT_STOCK_STATUS_BACKFILL)
+
+
+def downgrade() -> None:
+    for trigger in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER product_stock_status_{trigger} ON product_line")
+    op.execute("DROP FUNCTION product_stock_status_lines()")
+    op.execute("DROP FUNCTION product_stock_status_refresh(integer[])")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_product_in_stock_id', table_name='product', postgresql_where=sa.text("stock_status = 'is'"))
+    op.drop_index('ix_product_in_stock_category_id_id', table_name='product', postgresql_where=sa.text("stock_status = 'is'"))
+    # ### end Alembic commands ###
@@ -0,0 +1,9 @@
+-- Extensions used by the migrations. Run by the postgres image on first start
+-- (see docker-compose.yml and tests/utils/docker_utils.py), in POSTGRES_DB and
+-- in template1 so that databases created afterwards have them too.
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+\connect template1
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
@@ -1,3 +1,8 @@
+import os
+
 from dotenv import load_dotenv
 
 load_dotenv()  # take environment variables from .env.
+
+# fail any relationship load that is not covered by a loader preset
+os.environ.setdefault("ORM_LAZY_LOAD", "raise_on_sql")
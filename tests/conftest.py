@@ -1,2 +1,2 @@
-from .fixtures import client, db_session  # noqa: F401
+from .fixtures import client, db_session, max_queries  # noqa: F401
 from .utils.pytest_utils import pytest_collection_modifyitems  # noqa: F401
@@ -30,3 +30,20 @@ def get_random_category_dict(id_: int = None):
         "level": faker.random_int(1, 20),
         "parent_id": None,
     }
+
+
+def get_random_product_dict(id_: int = None, category_id: int = None):
+    return {
+        "id": id_ or faker.random_int(1, 1000),
+        "pid": str(faker.uuid4()),
+        "name": faker.unique.sentence(nb_words=2),
+        "slug": faker.unique.slug(),
+        "description": faker.text(),
+        "is_digital": faker.boolean(),
+        "is_active": faker.boolean(),
+        "stock_status": faker.random_element(["oos", "is", "obo"]),
+        "category_id": category_id or faker.random_int(1, 1000),
+        "seasonal_id": None,
+        "created_at": faker.date_time().isoformat(),
+        "updated_at": faker.date_time().isoformat(),
+    }
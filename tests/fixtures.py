@@ -1,10 +1,12 @@
 import os
+from contextlib import contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+from app import db_connection
 from app.main import app
 from tests.utils.database_utils import migrate_to_db
 from tests.utils.docker_utils import start_database_container
@@ -33,3 +35,39 @@ def db_session():
 def client():
     with TestClient(app) as _client:
         yield _client
+
+
+@pytest.fixture(scope="function")
+def max_queries():
+    """Fail when the block runs more than limit queries, e.g.
+
+    with max_queries(2):
+        client.get("/api/category/")
+
+    Counts every statement sent by the app's engines, the failure lists them.
+    """
+
+    @contextmanager
+    def assert_max_queries(limit: int):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engines = [db_connection.engine, *db_connection.replica_engines]
+        if db_connection.async_engine is not None:
+            engines.append(db_connection.async_engine.sync_engine)
+        for engine in engines:
+            event.listen(engine, "after_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "after_cursor_execute", record)
+
+        assert len(statements) <= limit, (
+            f"{len(statements)} queries, expected at most {limit}:\n"
+            + "\n".join(statements)
+        )
+
+    return assert_max_queries
@@ -1 +1 @@
-from fixtures import db_inspector  # noqa: F401
+from fixtures import db, db_inspector  # noqa: F401
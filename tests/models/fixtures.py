@@ -6,3 +6,12 @@ from sqlalchemy import inspect
 @pytest.fixture(scope="function")
 def db_inspector(db_session):
     return inspect(db_session().bind)
+
+
+@pytest.fixture(scope="function")
+def db(db_session):
+    # writes go through the real triggers inside one transaction that is rolled
+    # back, so every test starts from the migrated, empty database
+    with db_session() as session:
+        yield session
+        session.rollback()
@@ -44,6 +44,7 @@ def test_model_structure_column_foreign_key(db_inspector):
         None,
     )
     assert attribute_value_foreign_key is not None
+    assert attribute_value_foreign_key["referred_table"] == "attribute"
 
 
 """
@@ -0,0 +1,132 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import BigInteger, String, delete, insert, select, update
+
+from app.models import CacheVersion, Category, ProductType, SeasonalEvents
+
+"""
+## Table and Column Validation
+"""
+
+"""
+- [ ] Confirm the presence of all required tables within the database schema.
+"""
+
+
+def test_model_structure_table_exists(db_inspector):
+    assert db_inspector.has_table("cache_version")
+
+
+"""
+- [ ] Validate the existence of expected columns in each table, ensuring correct data types.
+"""
+
+
+def test_model_structure_column_data_types(db_inspector):
+    table = "cache_version"
+    columns = {columns["name"]: columns for columns in db_inspector.get_columns(table)}
+    assert isinstance(columns["name"]["type"], String)
+    assert isinstance(columns["version"]["type"], BigInteger)
+
+
+"""
+- [ ] Verify nullable or not nullable fields
+"""
+
+
+def test_model_structure_nullable_constrains(db_inspector):
+    table = "cache_version"
+    columns = db_inspector.get_columns(table)
+
+    expected_nullable = {"name": False, "version": False}
+
+    for column in columns:
+        column_name = column["name"]
+        assert column["nullable"] == expected_nullable.get(column_name), (
+            f"column '{column_name}' is not nullable as expected"
+        )
+
+
+"""
+- [ ] Verify the correctness of default values for relevant columns.
+"""
+
+
+def test_model_structure_default_values(db_inspector):
+    table = "cache_version"
+    columns = {columns["name"]: columns for columns in db_inspector.get_columns(table)}
+
+    assert columns["version"]["default"] == "'0'::bigint"
+
+
+"""
+- [ ] Ensure that column lengths align with defined requirements.
+"""
+
+
+def test_model_structure_column_lengths(db_inspector):
+    table = "cache_version"
+    columns = {columns["name"]: columns for columns in db_inspector.get_columns(table)}
+
+    assert columns["name"]["type"].length == 50
+
+
+"""
+- [ ]  Validate the primary key used by the version lookups.
+"""
+
+
+def test_model_structure_primary_key(db_inspector):
+    table = "cache_version"
+    primary_key = db_inspector.get_pk_constraint(table)
+
+    assert primary_key["constrained_columns"] == ["name"]
+
+
+"""
+## Trigger Behaviour
+"""
+
+
+def get_version(db, name) -> int:
+    version = db.scalar(select(CacheVersion.version).where(CacheVersion.name == name))
+    return version or 0
+
+
+"""
+- [ ] Test every write statement on a cached table bumps its version
+"""
+
+
+@pytest.mark.parametrize(
+    "name, model, values",
+    [
+        ("category", Category, {"name": "shoes", "slug": "shoes"}),
+        (
+            "seasonal_event",
+            SeasonalEvents,
+            {
+                "name": "summer",
+                "start_date": datetime(2026, 6, 1),
+                "end_date": datetime(2026, 9, 1),
+            },
+        ),
+        ("product_type", ProductType, {"name": "sneaker", "level": 0}),
+    ],
+)
+def test_model_cache_version_bump(db, name, model, values):
+    version = get_version(db, name)
+
+    row_id = db.scalar(insert(model).values(**values).returning(model.id))
+    assert get_version(db, name) == version + 1
+
+    db.execute(update(model).where(model.id == row_id).values(name="renamed"))
+    assert get_version(db, name) == version + 2
+
+    db.execute(delete(model).where(model.id == row_id))
+    assert get_version(db, name) == version + 3
+
+    # reads leave it alone
+    db.execute(select(model))
+    assert get_version(db, name) == version + 3
@@ -126,3 +126,19 @@ def test_model_structure_unique_constraints(db_inspector):
         constraint["name"] == "uq_category_name_level" for constraint in constraints
     )
     assert any(constraint["name"] == "uq_category_slug" for constraint in constraints)
+
+
+"""
+- [ ]  Validate the trigram index used by the suggest endpoint.
+"""
+
+
+def test_model_structure_trigram_index(db_inspector):
+    indexes = db_inspector.get_indexes("category")
+
+    assert any(
+        index["name"] == "ix_category_name_trgm"
+        and index["column_names"] == ["name"]
+        and index["dialect_options"]["postgresql_using"] == "gin"
+        for index in indexes
+    )
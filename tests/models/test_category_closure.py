@@ -0,0 +1,217 @@
+import pytest
+from sqlalchemy import Integer, exc, select
+
+from app.models import Category, CategoryClosure
+
+"""
+## Table and Column Validation
+"""
+
+"""
+- [ ] Confirm the presence of all required tables within the database schema.
+"""
+
+
+def test_model_structure_table_exists(db_inspector):
+    assert db_inspector.has_table("category_closure")
+
+
+"""
+- [ ] Validate the existence of expected columns in each table, ensuring correct data types.
+"""
+
+
+def test_model_structure_column_data_types(db_inspector):
+    table = "category_closure"
+    columns = {columns["name"]: columns for columns in db_inspector.get_columns(table)}
+    assert isinstance(columns["ancestor_id"]["type"], Integer)
+    assert isinstance(columns["descendant_id"]["type"], Integer)
+    assert isinstance(columns["depth"]["type"], Integer)
+
+
+"""
+- [ ] Ensure that column foreign keys correctly defined.
+"""
+
+
+def test_model_structure_column_foreign_key(db_inspector):
+    table = "category_closure"
+    foreign_keys = db_inspector.get_foreign_keys(table)
+
+    for column in ("ancestor_id", "descendant_id"):
+        category_foreign_key = next(
+            (fk for fk in foreign_keys if set(fk["constrained_columns"]) == {column}),
+            None,
+        )
+        assert category_foreign_key is not None
+        assert category_foreign_key["referred_table"] == "category"
+        assert category_foreign_key["options"]["ondelete"] == "CASCADE"
+
+
+"""
+- [ ] Verify nullable or not nullable fields
+"""
+
+
+def test_model_structure_nullable_constrains(db_inspector):
+    table = "category_closure"
+    columns = db_inspector.get_columns(table)
+
+    expected_nullable = {"ancestor_id": False, "descendant_id": False, "depth": False}
+
+    for column in columns:
+        column_name = column["name"]
+        assert column["nullable"] == expected_nullable.get(column_name), (
+            f"column '{column_name}' is not nullable as expected"
+        )
+
+
+"""
+- [ ] Test columns with specific constraints to ensure they are accurately defined.
+"""
+
+
+def test_model_structure_column_constrains(db_inspector):
+    table = "category_closure"
+    constraints = db_inspector.get_check_constraints(table)
+
+    assert any(
+        constraint["name"] == "category_closure_depth_check"
+        for constraint in constraints
+    )
+
+
+"""
+- [ ]  Validate the primary key and indexes used by the descendant lookups.
+"""
+
+
+def test_model_structure_primary_key_and_indexes(db_inspector):
+    table = "category_closure"
+
+    primary_key = db_inspector.get_pk_constraint(table)
+    assert primary_key["constrained_columns"] == ["ancestor_id", "descendant_id"]
+
+    indexes = db_inspector.get_indexes(table)
+    assert any(
+        index["name"] == "ix_category_closure_descendant_id_depth"
+        and index["column_names"] == ["descendant_id", "depth"]
+        for index in indexes
+    )
+
+
+"""
+## Trigger Behaviour
+"""
+
+
+def add_category(db, name, parent=None):
+    category = Category(name=name, slug=name, parent_id=parent.id if parent else None)
+    db.add(category)
+    db.flush()
+    return category
+
+
+def get_closure(db, categories) -> set:
+    ids = [category.id for category in categories]
+    rows = db.execute(
+        select(
+            CategoryClosure.ancestor_id,
+            CategoryClosure.descendant_id,
+            CategoryClosure.depth,
+        ).where(CategoryClosure.descendant_id.in_(ids))
+    )
+    return set(rows.tuples())
+
+
+@pytest.fixture(scope="function")
+def tree(db):
+    # shoes > running > trail, and boots on its own
+    shoes = add_category(db, "shoes")
+    running = add_category(db, "running", shoes)
+    trail = add_category(db, "trail", running)
+    boots = add_category(db, "boots")
+    return shoes, running, trail, boots
+
+
+"""
+- [ ] Test inserting a category links it to itself and all of its ancestors
+"""
+
+
+def test_model_category_closure_insert(db, tree):
+    shoes, running, trail, boots = tree
+
+    assert get_closure(db, tree) == {
+        (shoes.id, shoes.id, 0),
+        (running.id, running.id, 0),
+        (shoes.id, running.id, 1),
+        (trail.id, trail.id, 0),
+        (running.id, trail.id, 1),
+        (shoes.id, trail.id, 2),
+        (boots.id, boots.id, 0),
+    }
+
+
+"""
+- [ ] Test reparenting moves the whole subtree under the new ancestors
+"""
+
+
+def test_model_category_closure_reparent(db, tree):
+    shoes, running, trail, boots = tree
+
+    running.parent_id = boots.id
+    db.flush()
+
+    assert get_closure(db, tree) == {
+        (shoes.id, shoes.id, 0),
+        (running.id, running.id, 0),
+        (boots.id, running.id, 1),
+        (trail.id, trail.id, 0),
+        (running.id, trail.id, 1),
+        (boots.id, trail.id, 2),
+        (boots.id, boots.id, 0),
+    }
+
+    running.parent_id = None
+    db.flush()
+
+    assert get_closure(db, [running, trail]) == {
+        (running.id, running.id, 0),
+        (trail.id, trail.id, 0),
+        (running.id, trail.id, 1),
+    }
+
+
+"""
+- [ ] Test a category cannot be moved under itself or its own descendant
+"""
+
+
+@pytest.mark.parametrize("new_parent", [0, 1, 2])
+def test_model_category_closure_cycle(db, tree, new_parent):
+    shoes = tree[0]
+
+    shoes.parent_id = tree[new_parent].id
+    with pytest.raises(exc.DBAPIError, match="cannot be moved under its own"):
+        db.flush()
+
+
+"""
+- [ ] Test deleting a leaf category removes its closure rows
+"""
+
+
+def test_model_category_closure_delete(db, tree):
+    shoes, running, trail, _ = tree
+
+    db.delete(trail)
+    db.flush()
+
+    assert get_closure(db, [trail]) == set()
+    assert get_closure(db, [shoes, running]) == {
+        (shoes.id, shoes.id, 0),
+        (running.id, running.id, 0),
+        (shoes.id, running.id, 1),
+    }
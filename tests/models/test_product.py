@@ -1,5 +1,11 @@
-from sqlalchemy import Boolean, DateTime, Enum, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from uuid import uuid4
+
+from sqlalchemy import Boolean, DateTime, Enum, Integer, String, Text, select
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+
+from app.models import Category, Product, ProductLine
+from app.schemas.import_schemas import ProductImport
+from app.utils.product_import import merge_chunk
 
 """
 ## Table and Column Validation
@@ -35,6 +41,7 @@ def test_model_structure_column_data_types(db_inspector):
     assert isinstance(columns["stock_status"]["type"], Enum)
     assert isinstance(columns["category_id"]["type"], Integer)
     assert isinstance(columns["seasonal_id"]["type"], Integer)
+    assert isinstance(columns["search_vector"]["type"], TSVECTOR)
 
 
 """
@@ -80,13 +87,14 @@ def test_model_structure_nullable_constrains(db_inspector):
         "stock_status": False,
         "category_id": False,
         "seasonal_id": True,
+        "search_vector": True,
     }
 
     for column in columns:
         column_name = column["name"]
-        assert column["nullable"] == expected_nullable.get(
-            column_name
-        ), f"column '{column_name}' is not nullable as expected"
+        assert column["nullable"] == expected_nullable.get(column_name), (
+            f"column '{column_name}' is not nullable as expected"
+        )
 
 
 """
@@ -145,3 +153,104 @@ def test_model_structure_unique_constraints(db_inspector):
     assert any(constraint["name"] == "uq_product_name" for constraint in constraints)
     assert any(constraint["name"] == "uq_product_slug" for constraint in constraints)
     assert any(constraint["name"] == "uq_product_pid" for constraint in constraints)
+
+
+"""
+- [ ] Validate the generated search column and its GIN index.
+"""
+
+
+def test_model_structure_search_vector(db_inspector):
+    table = "product"
+    columns = {columns["name"]: columns for columns in db_inspector.get_columns(table)}
+    assert "setweight" in columns["search_vector"]["computed"]["sqltext"]
+    assert columns["search_vector"]["computed"]["persisted"] is True
+
+    indexes = db_inspector.get_indexes(table)
+    assert any(
+        index["name"] == "ix_product_search_vector"
+        and index["column_names"] == ["search_vector"]
+        and index["dialect_options"]["postgresql_using"] == "gin"
+        for index in indexes
+    )
+
+
+"""
+- [ ]  Validate the trigram indexes used by the suggest endpoint.
+"""
+
+
+def test_model_structure_trigram_indexes(db_inspector):
+    indexes = {index["name"]: index for index in db_inspector.get_indexes("product")}
+
+    for column in ("name", "slug"):
+        index = indexes[f"ix_product_{column}_trgm"]
+        assert index["column_names"] == [column]
+        assert index["dialect_options"]["postgresql_using"] == "gin"
+
+
+"""
+- [ ]  Validate the partial indexes behind the in stock listings.
+"""
+
+
+def test_model_structure_in_stock_indexes(db_inspector):
+    indexes = {index["name"]: index for index in db_inspector.get_indexes("product")}
+
+    for name, columns in (
+        ("ix_product_in_stock_id", ["id"]),
+        ("ix_product_in_stock_category_id_id", ["category_id", "id"]),
+    ):
+        assert indexes[name]["column_names"] == columns
+        assert (
+            "stock_status = 'is'"
+            in indexes[name]["dialect_options"]["postgresql_where"]
+        )
+
+
+"""
+## Catalog Import
+"""
+
+"""
+- [ ] Test records breaking a unique constraint are rejected, not their chunk
+"""
+
+
+def test_model_import_rejects_unique_conflicts(db):
+    category = Category(name="shoes", slug="shoes")
+    db.add(category)
+    db.flush()
+    stored = Product(name="runner", slug="runner", category_id=category.id)
+    db.add(stored)
+    db.flush()
+    stored_sku = uuid4()
+    db.add(
+        ProductLine(sku=stored_sku, price=10, order=1, weight=1.0, product_id=stored.id)
+    )
+    db.flush()
+
+    def record(slug, name):
+        line = {"sku": uuid4(), "price": "1.00", "order": 1, "weight": 1}
+        return ProductImport(
+            slug=slug, name=name, category_id=category.id, product_lines=[line]
+        )
+
+    chunk = [
+        (1, record("trail", "trail")),
+        (2, record("trail-2", "trail")),
+        (3, record("runner", "runner")),
+        (4, record("walker", "walker")),
+    ]
+
+    counts, rejected = merge_chunk(db, chunk)
+
+    assert rejected == [
+        (2, "Product name repeated in the feed"),
+        (3, "Product line order already exists"),
+    ]
+    assert counts["products"] == 2
+    assert set(db.scalars(select(Product.slug))) == {"runner", "trail", "walker"}
+    assert list(
+        db.scalars(select(ProductLine.sku).where(ProductLine.product_id == stored.id))
+    ) == [stored_sku]
@@ -0,0 +1,239 @@
+import pytest
+from sqlalchemy import Integer, delete, select, update
+
+from app.models import (
+    Attribute,
+    AttributeValue,
+    Category,
+    Product,
+    ProductFacet,
+    ProductLine,
+    ProductLineAttributeValue,
+)
+from app.utils.product_facets import facet_counts_query, matching_products_query
+
+"""
+## Table and Column Validation
+"""
+
+"""
+- [ ] Confirm the presence of all required tables within the database schema.
+"""
+
+
+def test_model_structure_table_exists(db_inspector):
+    assert db_inspector.has_table("product_facet")
+
+
+"""
+- [ ] Validate the existence of expected columns in each table, ensuring correct data types.
+"""
+
+
+def test_model_structure_column_data_types(db_inspector):
+    table = "product_facet"
+    columns = {columns["name"]: columns for columns in db_inspector.get_columns(table)}
+    assert isinstance(columns["product_id"]["type"], Integer)
+    assert isinstance(columns["attribute_value_id"]["type"], Integer)
+    assert isinstance(columns["line_count"]["type"], Integer)
+
+
+"""
+- [ ] Ensure that column foreign keys correctly defined.
+"""
+
+
+def test_model_structure_column_foreign_key(db_inspector):
+    table = "product_facet"
+    foreign_keys = db_inspector.get_foreign_keys(table)
+
+    for column, referred_table in (
+        ("product_id", "product"),
+        ("attribute_value_id", "attribute_value"),
+    ):
+        foreign_key = next(
+            (fk for fk in foreign_keys if set(fk["constrained_columns"]) == {column}),
+            None,
+        )
+        assert foreign_key is not None
+        assert foreign_key["referred_table"] == referred_table
+
+
+"""
+- [ ] Verify nullable or not nullable fields
+"""
+
+
+def test_model_structure_nullable_constrains(db_inspector):
+    table = "product_facet"
+    columns = db_inspector.get_columns(table)
+
+    expected_nullable = {
+        "product_id": False,
+        "attribute_value_id": False,
+        "line_count": False,
+    }
+
+    for column in columns:
+        column_name = column["name"]
+        assert column["nullable"] == expected_nullable.get(column_name), (
+            f"column '{column_name}' is not nullable as expected"
+        )
+
+
+"""
+- [ ]  Validate the primary key used by the facet upserts and the value index.
+"""
+
+
+def test_model_structure_primary_key_and_indexes(db_inspector):
+    primary_key = db_inspector.get_pk_constraint("product_facet")
+    assert primary_key["constrained_columns"] == ["product_id", "attribute_value_id"]
+
+    indexes = db_inspector.get_indexes("product_facet")
+    assert any(
+        index["name"] == "ix_product_facet_attribute_value_id_product_id"
+        and index["column_names"] == ["attribute_value_id", "product_id"]
+        for index in indexes
+    )
+
+
+"""
+## Trigger Behaviour
+"""
+
+
+def add(db, row):
+    db.add(row)
+    db.flush()
+    return row
+
+
+@pytest.fixture(scope="function")
+def catalog(db):
+    category = add(db, Category(name="shoes", slug="shoes"))
+    products = [
+        add(db, Product(name=name, slug=name, category_id=category.id))
+        for name in ("runner", "boot")
+    ]
+    lines = [
+        add(
+            db,
+            ProductLine(price=10, order=order, weight=1.0, product_id=products[0].id),
+        )
+        for order in (1, 2)
+    ]
+    size = add(db, Attribute(name="size"))
+    values = [
+        add(db, AttributeValue(attribute_value=value, attribute_id=size.id))
+        for value in ("S", "M")
+    ]
+    return products, lines, values
+
+
+def link(db, line, value):
+    return add(
+        db,
+        ProductLineAttributeValue(product_line_id=line.id, attribute_value_id=value.id),
+    )
+
+
+def unlink(db, line_value):
+    db.execute(
+        delete(ProductLineAttributeValue).where(
+            ProductLineAttributeValue.id == line_value.id
+        )
+    )
+
+
+def get_facets(db) -> set:
+    rows = db.execute(
+        select(
+            ProductFacet.product_id,
+            ProductFacet.attribute_value_id,
+            ProductFacet.line_count,
+        )
+    )
+    return set(rows.tuples())
+
+
+"""
+- [ ] Test linking and unlinking values counts a product's lines per value
+"""
+
+
+def test_model_product_facet_line_count(db, catalog):
+    (runner, _), (first, second), (small, medium) = catalog
+
+    first_small = link(db, first, small)
+    second_small = link(db, second, small)
+    link(db, second, medium)
+    assert get_facets(db) == {(runner.id, small.id, 2), (runner.id, medium.id, 1)}
+
+    unlink(db, first_small)
+    assert get_facets(db) == {(runner.id, small.id, 1), (runner.id, medium.id, 1)}
+
+    # the row goes once no line has the value
+    unlink(db, second_small)
+    assert get_facets(db) == {(runner.id, medium.id, 1)}
+
+
+"""
+- [ ] Test changing the value of a link moves its count to the new value
+"""
+
+
+def test_model_product_facet_value_change(db, catalog):
+    (runner, _), (first, _), (small, medium) = catalog
+
+    line_value = link(db, first, small)
+    db.execute(
+        update(ProductLineAttributeValue)
+        .where(ProductLineAttributeValue.id == line_value.id)
+        .values(attribute_value_id=medium.id)
+    )
+    assert get_facets(db) == {(runner.id, medium.id, 1)}
+
+
+"""
+- [ ] Test moving a line to another product moves its facet counts
+"""
+
+
+def test_model_product_facet_line_move(db, catalog):
+    (runner, boot), (first, second), (small, _) = catalog
+
+    link(db, first, small)
+    link(db, second, small)
+    db.execute(
+        update(ProductLine)
+        .where(ProductLine.id == second.id)
+        .values(product_id=boot.id)
+    )
+    assert get_facets(db) == {(runner.id, small.id, 1), (boot.id, small.id, 1)}
+
+
+"""
+- [ ] Test facet matches and counts read the trigger maintained rows
+"""
+
+
+def test_model_product_facet_queries(db, catalog):
+    (_, boot), (first, second), (small, medium) = catalog
+    db.execute(
+        update(ProductLine)
+        .where(ProductLine.id == second.id)
+        .values(product_id=boot.id)
+    )
+    link(db, first, small)
+    link(db, second, small)
+    link(db, second, medium)
+
+    groups = {small.attribute_id: [medium.id]}
+    assert db.scalars(matching_products_query(groups)).all() == [boot.id]
+
+    counts = db.execute(facet_counts_query(groups)).mappings().all()
+    assert {row["attribute_value"]: row["count"] for row in counts} == {
+        "S": 2,
+        "M": 1,
+    }
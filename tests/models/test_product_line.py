@@ -1,6 +1,18 @@
-from sqlalchemy import Boolean, DateTime, Float, Integer, Numeric
+import pytest
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Float,
+    Integer,
+    Numeric,
+    delete,
+    select,
+    update,
+)
 from sqlalchemy.dialects.postgresql import UUID
 
+from app.models import Category, Product, ProductLine
+
 """
 ## Table and Column Validation
 """
@@ -57,9 +69,9 @@ def test_model_structure_nullable_constrains(db_inspector):
 
     for column in columns:
         column_name = column["name"]
-        assert column["nullable"] == expected_nullable.get(
-            column_name
-        ), f"column '{column_name}' is not nullable as expected"
+        assert column["nullable"] == expected_nullable.get(column_name), (
+            f"column '{column_name}' is not nullable as expected"
+        )
 
 
 """
@@ -129,3 +141,111 @@ def test_model_structure_unique_constraints(db_inspector):
         constraint["name"] == "uq_product_line_order_product_id"
         for constraint in constraints
     )
+
+
+"""
+## Trigger Behaviour
+"""
+
+
+@pytest.fixture(scope="function")
+def product(db):
+    category = Category(name="shoes", slug="shoes")
+    db.add(category)
+    db.flush()
+    product = Product(name="runner", slug="runner", category_id=category.id)
+    db.add(product)
+    db.flush()
+    return product
+
+
+def add_line(db, product, order, stock_qty, is_active=True):
+    line = ProductLine(
+        price=10,
+        stock_qty=stock_qty,
+        is_active=is_active,
+        order=order,
+        weight=1.0,
+        product_id=product.id,
+    )
+    db.add(line)
+    db.flush()
+    return line
+
+
+def get_stock_status(db, product) -> str:
+    return db.scalar(select(Product.stock_status).where(Product.id == product.id))
+
+
+def set_line(db, line, **values):
+    db.execute(update(ProductLine).where(ProductLine.id == line.id).values(**values))
+
+
+"""
+- [ ] Test inserting lines recomputes the product stock status
+"""
+
+
+def test_model_stock_status_insert(db, product):
+    add_line(db, product, 1, stock_qty=5, is_active=False)
+    assert get_stock_status(db, product) == "oos"
+
+    add_line(db, product, 2, stock_qty=5)
+    assert get_stock_status(db, product) == "is"
+
+
+"""
+- [ ] Test updating stock or the active flag of a line recomputes the status
+"""
+
+
+def test_model_stock_status_update(db, product):
+    line = add_line(db, product, 1, stock_qty=5)
+    assert get_stock_status(db, product) == "is"
+
+    set_line(db, line, stock_qty=0)
+    assert get_stock_status(db, product) == "oos"
+
+    set_line(db, line, stock_qty=3)
+    assert get_stock_status(db, product) == "is"
+
+    set_line(db, line, is_active=False)
+    assert get_stock_status(db, product) == "oos"
+
+
+"""
+- [ ] Test a product on back order stays there until a line has stock
+"""
+
+
+def test_model_stock_status_back_order(db, product):
+    line = add_line(db, product, 1, stock_qty=0)
+    db.execute(
+        update(Product).where(Product.id == product.id).values(stock_status="obo")
+    )
+
+    # recomputed without stock, the back order is kept
+    set_line(db, line, is_active=False)
+    assert get_stock_status(db, product) == "obo"
+
+    set_line(db, line, is_active=True, stock_qty=1)
+    assert get_stock_status(db, product) == "is"
+
+    set_line(db, line, stock_qty=0)
+    assert get_stock_status(db, product) == "oos"
+
+
+"""
+- [ ] Test deleting the last line with stock puts the product out of stock
+"""
+
+
+def test_model_stock_status_delete(db, product):
+    in_stock = add_line(db, product, 1, stock_qty=2)
+    out_of_stock = add_line(db, product, 2, stock_qty=0)
+
+    db.execute(delete(ProductLine).where(ProductLine.id == out_of_stock.id))
+    assert get_stock_status(db, product) == "is"
+
+    db.execute(delete(ProductLine).where(ProductLine.id == in_stock.id))
+    assert get_stock_status(db, product) == "oos"
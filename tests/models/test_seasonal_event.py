@@ -100,3 +100,18 @@ def test_model_structure_unique_constraints(db_inspector):
     assert any(
         constraint["name"] == "uq_seasonal_event_name" for constraint in constraints
     )
+
+
+"""
+- [ ]  Validate the index used by the active event lookups.
+"""
+
+
+def test_model_structure_date_range_index(db_inspector):
+    indexes = db_inspector.get_indexes("seasonal_event")
+
+    assert any(
+        index["name"] == "ix_seasonal_event_start_date_end_date"
+        and index["column_names"] == ["start_date", "end_date"]
+        for index in indexes
+    )
@@ -0,0 +1,141 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import db_connection
+from app.cache import TTLCache, VersionedCache
+
+
+@pytest.fixture(scope="function")
+def counting_cache(monkeypatch):
+    versions = [1]
+    builds = []
+
+    def build(db):
+        builds.append(versions[0])
+        return {"version": versions[0]}
+
+    cache = VersionedCache("test", build, check_interval=60)
+    monkeypatch.setattr(cache, "get_version", lambda db: versions[0])
+    return cache, versions, builds
+
+
+"""
+- [ ] Test cache builds lazily once and serves the snapshot from memory
+"""
+
+
+def test_unit_versioned_cache_reuses_snapshot(counting_cache):
+    cache, _, builds = counting_cache
+
+    assert builds == []
+    assert cache.get(None) == {"version": 1}
+    assert cache.get(None) is cache.get(None)
+    assert builds == [1]
+
+
+"""
+- [ ] Test cache rebuilds when the database version changes
+"""
+
+
+def test_unit_versioned_cache_version_change(counting_cache):
+    cache, versions, builds = counting_cache
+    cache.check_interval = 0
+
+    cache.get(None)
+    cache.get(None)
+    assert builds == [1]
+
+    versions[0] = 2
+    assert cache.get(None) == {"version": 2}
+    assert builds == [1, 2]
+
+
+"""
+- [ ] Test cache skips the version check inside the check interval
+"""
+
+
+def test_unit_versioned_cache_check_interval(counting_cache):
+    cache, versions, builds = counting_cache
+
+    cache.get(None)
+    versions[0] = 2
+    assert cache.get(None) == {"version": 1}
+    assert builds == [1]
+
+
+"""
+- [ ] Test invalidate forces a rebuild on the next read
+"""
+
+
+def test_unit_versioned_cache_invalidate(counting_cache):
+    cache, _, builds = counting_cache
+
+    cache.get(None)
+    cache.invalidate()
+    cache.get(None)
+    assert builds == [1, 1]
+
+
+"""
+- [ ] Test cache checks and rebuilds from the primary when reads use a replica
+"""
+
+
+def test_unit_versioned_cache_reads_primary(monkeypatch, tmp_path):
+    primary, replica = (
+        create_engine(f"sqlite:///{tmp_path / f'{name}.db'}")
+        for name in ("primary", "replica")
+    )
+    monkeypatch.setattr(db_connection, "engine", primary)
+    monkeypatch.setattr(db_connection, "replica_engines", [replica])
+
+    binds = []
+    cache = VersionedCache("test", lambda db: binds.append(db.get_bind()), 60)
+    monkeypatch.setattr(cache, "get_version", lambda db: binds.append(db.get_bind()))
+
+    with Session(bind=replica) as db:
+        cache.get(db)
+    assert binds == [primary, primary]
+
+    with Session(bind=primary) as db:
+        cache.invalidate()
+        cache.get(db)
+    assert binds == [primary] * 4
+
+
+"""
+- [ ] Test TTL cache evicts the least recently used entry when full
+"""
+
+
+def test_unit_ttl_cache_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+"""
+- [ ] Test TTL cache entries expire after the ttl
+"""
+
+
+def test_unit_ttl_cache_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=30)
+
+    cache.set("a", 1)
+    now[0] += 29
+    assert cache.get("a") == 1
+    now[0] += 1
+    assert cache.get("a") is None
@@ -1,9 +1,22 @@
+import asyncio
+from types import SimpleNamespace
+
 import pytest
 from fastapi import HTTPException
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Category
-from app.schemas.category_schemas import CategoryCreate
+from app.routes.category_routes import create_category_async
+from app.schemas.category_schemas import (
+    CategoryBulkCreate,
+    CategoryCreate,
+    CategoryReturn,
+)
+from app.utils.category_cache import CategorySnapshot, category_cache
+from app.utils.category_routes import check_existing_category_async
+from app.utils.pagination import decode_cursor
+from app.utils.suggest import category_suggest_cache
 from tests.factories.models_factory import get_random_category_dict
 
 
@@ -11,6 +24,17 @@ def mock_output(return_value=None):
     return lambda *args, **kwargs: return_value
 
 
+def mock_result(row=None):
+    return SimpleNamespace(first=lambda: row)
+
+
+def mock_async_output(return_value=None):
+    async def mock(*args, **kwargs):
+        return return_value
+
+    return mock
+
+
 """
 - [ ] Test category schema valid and invalid data
 """
@@ -41,12 +65,11 @@ def test_unit_schema_category_validation():
 def test_unit_create_new_category_successfully(client, monkeypatch):
     category = get_random_category_dict()
 
-    for key, value in category.items():
-        monkeypatch.setattr(Category, key, value)
-
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute",
+        mock_output(mock_result(Category(**category))),
+    )
     monkeypatch.setattr("sqlalchemy.orm.Session.commit", mock_output())
-    monkeypatch.setattr("sqlalchemy.orm.Session.refresh", mock_output())
 
     body = category.copy()
     body.pop("id")
@@ -74,11 +97,11 @@ def test_unit_create_new_category_existing(
             raise HTTPException(status_code=400, detail=expected_detail)
 
     monkeypatch.setattr(
-        "app.routes.category_routes.check_existing_category",
+        "app.utils.category_routes.check_existing_category",
         mock_check_existing_category,
     )
 
-    monkeypatch.setattr("sqlalchemy.orm.Query.first", mock_output())
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_output(mock_result()))
 
     body = category_data.copy()
     body.pop("id")
@@ -87,3 +110,425 @@ def test_unit_create_new_category_existing(
 
     if expected_detail:
         assert response.json() == {"detail": expected_detail}
+
+
+"""
+- [ ] Test POST new category when the conflicting category is gone by the lookup
+"""
+
+
+def test_unit_create_new_category_conflict_removed(client, monkeypatch):
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_output(mock_result()))
+    monkeypatch.setattr("sqlalchemy.orm.Session.scalar", mock_output())
+
+    body = get_random_category_dict()
+    body.pop("id")
+    response = client.post("/api/category", json=body)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Category already exists"}
+
+
+"""
+- [ ] Test POST new category successfully with the async session
+"""
+
+
+def test_unit_create_new_category_async_successfully(monkeypatch):
+    category = get_random_category_dict()
+
+    monkeypatch.setattr(
+        AsyncSession, "execute", mock_async_output(mock_result(Category(**category)))
+    )
+    monkeypatch.setattr(AsyncSession, "commit", mock_async_output())
+
+    body = category.copy()
+    body.pop("id")
+    new_category = asyncio.run(
+        create_category_async(CategoryCreate(**body), db=AsyncSession())
+    )
+    assert (
+        CategoryReturn.model_validate(new_category, from_attributes=True).model_dump()
+        == category
+    )
+
+
+@pytest.mark.parametrize(
+    "existing_fields, expected_detail",
+    [
+        ({"slug": "other-slug"}, "Category name and level already exists"),
+        ({"name": "other name"}, "Category slug already exists"),
+    ],
+)
+def test_unit_check_existing_category_async(
+    monkeypatch, existing_fields, expected_detail
+):
+    category_data = CategoryCreate(**get_random_category_dict())
+    existing_category = Category(**{**category_data.model_dump(), **existing_fields})
+
+    monkeypatch.setattr(AsyncSession, "scalar", mock_async_output(existing_category))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_existing_category_async(AsyncSession(), category_data))
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == expected_detail
+
+
+class FakeCategoryTable:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def insert(self, db, rows):
+        inserted = []
+        for row in rows:
+            if any(
+                existing.slug == row["slug"]
+                or (existing.name, existing.level) == (row["name"], row["level"])
+                for existing in self.rows
+            ):
+                continue
+            new_row = SimpleNamespace(id=len(self.rows) + 1, **row)
+            self.rows.append(new_row)
+            inserted.append(new_row)
+        return inserted
+
+    def ids_by_slug(self, db, slugs):
+        return {row.slug: row.id for row in self.rows if row.slug in slugs}
+
+    def existing_ids(self, db, ids):
+        return {row.id for row in self.rows if row.id in ids}
+
+
+@pytest.fixture(scope="function")
+def fake_category_table(monkeypatch):
+    table = FakeCategoryTable(
+        [SimpleNamespace(id=1, name="stored", slug="stored", level=1, parent_id=None)]
+    )
+    monkeypatch.setattr("app.utils.category_routes.insert_category_rows", table.insert)
+    monkeypatch.setattr(
+        "app.utils.category_routes.get_category_ids_by_slug", table.ids_by_slug
+    )
+    monkeypatch.setattr(
+        "app.utils.category_routes.get_existing_category_ids", table.existing_ids
+    )
+    monkeypatch.setattr(
+        "app.utils.category_routes.get_bulk_conflict_details",
+        lambda db, categories, indexes: {index: "conflict" for index in indexes},
+    )
+    monkeypatch.setattr("sqlalchemy.orm.Session.commit", mock_output())
+    return table
+
+
+"""
+- [ ] Test bulk category schema rejects parent_id together with parent_slug
+"""
+
+
+def test_unit_schema_category_bulk_validation():
+    with pytest.raises(ValidationError):
+        CategoryBulkCreate(name="a", slug="a", parent_id=1, parent_slug="b")
+
+
+"""
+- [ ] Test POST bulk categories resolves parents inside the batch
+"""
+
+
+def test_unit_create_categories_bulk_parents(client, fake_category_table):
+    body = [
+        {
+            "name": "grandchild",
+            "slug": "grandchild",
+            "level": 3,
+            "parent_slug": "child",
+        },
+        {"name": "child", "slug": "child", "level": 2, "parent_slug": "root"},
+        {"name": "root", "slug": "root", "level": 1},
+        {"name": "leaf", "slug": "leaf", "level": 2, "parent_slug": "stored"},
+    ]
+    response = client.post("/api/category/bulk", json=body)
+    assert response.status_code == 201
+
+    created = {row["slug"]: row for row in response.json()["created"]}
+    assert list(created) == ["grandchild", "child", "root", "leaf"]
+    assert created["root"]["parent_id"] is None
+    assert created["child"]["parent_id"] == created["root"]["id"]
+    assert created["grandchild"]["parent_id"] == created["child"]["id"]
+    assert created["leaf"]["parent_id"] == 1
+    assert response.json()["conflicts"] == []
+
+
+"""
+- [ ] Test POST bulk categories reports per item conflicts
+"""
+
+
+def test_unit_create_categories_bulk_conflicts(client, fake_category_table):
+    body = [
+        {"name": "stored", "slug": "new-slug", "level": 1},
+        {"name": "orphan", "slug": "orphan", "level": 2, "parent_slug": "new-slug"},
+        {"name": "missing", "slug": "missing", "level": 2, "parent_slug": "nope"},
+        {"name": "fresh", "slug": "fresh", "level": 1},
+        {"name": "fresh again", "slug": "fresh", "level": 1},
+        {"name": "lost", "slug": "lost", "level": 2, "parent_id": 999},
+        {"name": "kept", "slug": "kept", "level": 2, "parent_id": 1},
+    ]
+    response = client.post("/api/category/bulk", json=body)
+    assert response.status_code == 201
+
+    created = {row["slug"]: row for row in response.json()["created"]}
+    assert list(created) == ["fresh", "kept"]
+    assert created["kept"]["parent_id"] == 1
+    assert response.json()["conflicts"] == [
+        {"index": 0, "slug": "new-slug", "detail": "conflict"},
+        {"index": 1, "slug": "orphan", "detail": "Parent category was not created"},
+        {"index": 2, "slug": "missing", "detail": "Parent category not found"},
+        {"index": 4, "slug": "fresh", "detail": "conflict"},
+        {"index": 5, "slug": "lost", "detail": "Parent category not found"},
+    ]
+
+
+def mock_tree_rows(rows):
+    return SimpleNamespace(mappings=lambda: SimpleNamespace(all=lambda: rows))
+
+
+def get_tree_row(id_, parent_id, depth):
+    return {
+        **get_random_category_dict(id_),
+        "parent_id": parent_id,
+        "depth": depth,
+    }
+
+
+"""
+- [ ] Test GET category subtree builds the nested tree
+"""
+
+
+def test_unit_get_category_subtree(client, monkeypatch):
+    rows = [
+        get_tree_row(1, None, 0),
+        get_tree_row(2, 1, 1),
+        get_tree_row(3, 1, 1),
+        get_tree_row(4, 3, 2),
+    ]
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute", mock_output(mock_tree_rows(rows))
+    )
+
+    response = client.get("/api/category/1/subtree")
+    assert response.status_code == 200
+
+    tree = response.json()
+    assert tree["id"] == 1
+    assert [child["id"] for child in tree["children"]] == [2, 3]
+    assert tree["children"][0]["children"] == []
+    assert [child["id"] for child in tree["children"][1]["children"]] == [4]
+
+
+"""
+- [ ] Test GET category ancestors returns breadcrumbs root first
+"""
+
+
+def test_unit_get_category_ancestors(client, monkeypatch):
+    rows = [get_tree_row(4, 3, 0), get_tree_row(3, 1, 1), get_tree_row(1, None, 2)]
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute", mock_output(mock_tree_rows(rows))
+    )
+
+    response = client.get("/api/category/4/ancestors")
+    assert response.status_code == 200
+    assert [category["id"] for category in response.json()] == [1, 3, 4]
+
+
+"""
+- [ ] Test GET category subtree when the category does not exist
+"""
+
+
+def test_unit_get_category_subtree_not_found(client, monkeypatch):
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute", mock_output(mock_tree_rows([]))
+    )
+
+    response = client.get("/api/category/1/subtree")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Category not found"}
+
+    response = client.get("/api/category/1/subtree?max_depth=-1")
+    assert response.status_code == 422
+
+
+"""
+- [ ] Test GET category subtree reads from the closure table when enabled
+"""
+
+
+def test_unit_get_category_subtree_closure_table(client, monkeypatch):
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(str(statement))
+        return mock_tree_rows([get_tree_row(1, None, 0)])
+
+    monkeypatch.setattr("app.utils.category_routes.CATEGORY_CLOSURE_TABLE", True)
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get("/api/category/1/subtree")
+    assert response.status_code == 200
+    assert "category_closure" in statements[0]
+    assert "RECURSIVE" not in statements[0]
+
+
+@pytest.fixture(scope="function")
+def category_snapshot(monkeypatch):
+    categories = [
+        {**get_random_category_dict(1), "parent_id": None},
+        {**get_random_category_dict(2), "parent_id": 1},
+        {**get_random_category_dict(3), "parent_id": None},
+    ]
+    snapshot = CategorySnapshot(categories)
+    monkeypatch.setattr(category_cache, "get", lambda db: snapshot)
+    return categories
+
+
+"""
+- [ ] Test GET category tree is served from the category cache
+"""
+
+
+def test_unit_get_category_tree(client, category_snapshot):
+    response = client.get("/api/category/tree")
+    assert response.status_code == 200
+
+    tree = response.json()
+    assert [category["id"] for category in tree] == [1, 3]
+    assert [category["id"] for category in tree[0]["children"]] == [2]
+    assert tree[1]["children"] == []
+
+
+"""
+- [ ] Test GET category by slug is served from the category cache
+"""
+
+
+def test_unit_get_category_by_slug(client, category_snapshot):
+    category = category_snapshot[1]
+
+    response = client.get(f"/api/category/slug/{category['slug']}")
+    assert response.status_code == 200
+    assert response.json() == category
+
+    response = client.get("/api/category/slug/not-a-category-slug")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Category not found"}
+
+
+"""
+- [ ] Test GET category by slug serves slugs that are also category sub-routes
+"""
+
+
+@pytest.mark.parametrize("slug", ["subtree", "ancestors"])
+def test_unit_get_category_by_route_slug(client, monkeypatch, slug):
+    category = {**get_random_category_dict(1), "slug": slug, "parent_id": None}
+    monkeypatch.setattr(category_cache, "get", lambda db: CategorySnapshot([category]))
+
+    response = client.get(f"/api/category/slug/{slug}")
+    assert response.status_code == 200
+    assert response.json() == category
+
+
+"""
+- [ ] Test POST new category invalidates the category and suggest caches
+"""
+
+
+def test_unit_create_new_category_invalidates_cache(client, monkeypatch):
+    category = get_random_category_dict()
+    invalidations = []
+
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute",
+        mock_output(mock_result(Category(**category))),
+    )
+    monkeypatch.setattr("sqlalchemy.orm.Session.commit", mock_output())
+    monkeypatch.setattr(category_cache, "invalidate", lambda: invalidations.append(1))
+    category_suggest_cache.set(("a", 10), [])
+
+    body = category.copy()
+    body.pop("id")
+    response = client.post("/api/category", json=body)
+    assert response.status_code == 201
+    assert invalidations == [1]
+    assert category_suggest_cache.get(("a", 10)) is None
+
+
+"""
+- [ ] Test GET categories pages on (level, name)
+"""
+
+
+def test_unit_list_categories(client, monkeypatch):
+    categories = [get_random_category_dict(id_) for id_ in range(1, 4)]
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return mock_tree_rows(categories)
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get("/api/category/?limit=2")
+    assert response.status_code == 200
+    assert response.json()["items"] == categories[:2]
+
+    last = categories[1]
+    cursor = response.json()["next_cursor"]
+    assert decode_cursor(cursor, (int, str)) == [last["level"], last["name"]]
+
+    response = client.get("/api/category/", params={"cursor": cursor, "limit": 2})
+    assert response.status_code == 200
+    assert "(category.level, category.name) > " in str(statements[1])
+
+
+"""
+- [ ] Test GET category by slug with fields
+"""
+
+
+def test_unit_get_category_by_slug_fields(client, category_snapshot):
+    category = category_snapshot[0]
+
+    response = client.get(f"/api/category/slug/{category['slug']}?fields=id,name")
+    assert response.status_code == 200
+    assert response.json() == {"id": category["id"], "name": category["name"]}
+
+    response = client.get(f"/api/category/slug/{category['slug']}?fields=secret")
+    assert response.status_code == 400
+
+
+"""
+- [ ] Test GET category suggestions only queries once per normalised query
+"""
+
+
+def test_unit_suggest_categories(client, monkeypatch):
+    suggestions = [{"id": 1, "name": "Shirts", "slug": "shirts"}]
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return SimpleNamespace(mappings=lambda: suggestions)
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+    category_suggest_cache.clear()
+
+    for q in ("Shi", " shi ", "SHI"):
+        response = client.get("/api/category/suggest", params={"q": q})
+        assert response.status_code == 200
+        assert response.json() == suggestions
+    assert len(statements) == 1
+    assert statements[0]._limit == 10
+    category_suggest_cache.clear()
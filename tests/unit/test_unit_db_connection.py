@@ -0,0 +1,220 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    event,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app import db_connection
+from app.db_connection import (
+    ReadYourWritesMiddleware,
+    get_db_session,
+    get_read_db_session,
+    get_read_engine,
+)
+
+metadata = MetaData()
+items = Table("items", metadata, Column("id", Integer, primary_key=True))
+
+
+@pytest.fixture(scope="function")
+def sqlite_session_local(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        connect_args={"check_same_thread": False},
+    )
+    SessionLocal = sessionmaker(autocommit=False, autoflush=True, bind=engine)
+    monkeypatch.setattr(db_connection, "SessionLocal", SessionLocal)
+
+    yield SessionLocal
+
+    engine.dispose()
+
+
+def run_request(fail=False):
+    session_dependency = get_db_session()
+    db = next(session_dependency)
+    db.execute(text("SELECT 1"))
+
+    if fail:
+        with pytest.raises(HTTPException):
+            session_dependency.throw(HTTPException(status_code=400))
+    else:
+        with pytest.raises(StopIteration):
+            next(session_dependency)
+
+
+"""
+- [ ] Test session dependency commits on success and rolls back on error
+"""
+
+
+def test_unit_db_session_commit_and_rollback(monkeypatch, sqlite_session_local):
+    calls = []
+    monkeypatch.setattr(Session, "commit", lambda self: calls.append("commit"))
+    monkeypatch.setattr(Session, "rollback", lambda self: calls.append("rollback"))
+    monkeypatch.setattr(Session, "close", lambda self: calls.append("close"))
+
+    run_request()
+    assert calls == ["commit", "close"]
+
+    calls.clear()
+    run_request(fail=True)
+    assert calls == ["rollback", "close"]
+
+
+"""
+- [ ] Test pool checkouts and checkins balance under concurrent requests
+"""
+
+
+def test_unit_db_session_returns_connections_to_pool(sqlite_session_local):
+    engine = sqlite_session_local.kw["bind"]
+    checkouts, checkins = [], []
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(*args):
+        checkouts.append(1)
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(*args):
+        checkins.append(1)
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        futures = [executor.submit(run_request, i % 4 == 0) for i in range(200)]
+        for future in futures:
+            future.result()
+
+    assert len(checkouts) == 200
+    assert len(checkins) == len(checkouts)
+    assert engine.pool.checkedout() == 0
+
+
+@pytest.fixture(scope="function")
+def sqlite_replicas(tmp_path, monkeypatch):
+    replicas = [
+        create_engine(
+            f"sqlite:///{tmp_path / f'replica_{index}.db'}",
+            connect_args={"check_same_thread": False},
+        )
+        for index in range(2)
+    ]
+    monkeypatch.setattr(db_connection, "replica_engines", replicas)
+    monkeypatch.setattr(db_connection, "replica_cycle", cycle(replicas))
+
+    yield replicas
+
+    for replica in replicas:
+        replica.dispose()
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, max_age=5)
+
+    @app.post("/items")
+    def create_item(db: Session = Depends(get_db_session)):
+        db.execute(insert(items).values(id=1))
+
+    @app.post("/items/renumber")
+    def renumber_items(db: Session = Depends(get_db_session)):
+        # a write the session cannot recognise, like an UPDATE in a select() CTE
+        db.execute(text("UPDATE items SET id = id + 1"))
+
+    @app.post("/items/invalid")
+    def create_invalid_item(db: Session = Depends(get_db_session)):
+        db.execute(insert(items).values(id=2))
+        raise HTTPException(status_code=400, detail="Invalid item")
+
+    @app.get("/items")
+    def read_item(db: Session = Depends(get_read_db_session)):
+        db.execute(select(items))
+        return {"primary": db.get_bind() is db_connection.engine}
+
+    return app
+
+
+"""
+- [ ] Test reads are balanced round robin over the replicas
+"""
+
+
+def test_unit_read_engine_round_robin(sqlite_replicas):
+    engines = [get_read_engine() for _ in range(4)]
+    assert engines == sqlite_replicas * 2
+
+
+"""
+- [ ] Test reads use the primary when no replica is configured
+"""
+
+
+def test_unit_read_engine_without_replicas(monkeypatch):
+    monkeypatch.setattr(db_connection, "replica_cycle", cycle([]))
+    assert get_read_engine() is db_connection.engine
+
+
+"""
+- [ ] Test a committed write pins the client's reads to the primary
+"""
+
+
+def test_unit_read_your_writes(monkeypatch, sqlite_session_local, sqlite_replicas):
+    primary = sqlite_session_local.kw["bind"]
+    monkeypatch.setattr(db_connection, "engine", primary)
+    metadata.create_all(primary)
+    for replica in sqlite_replicas:
+        metadata.create_all(replica)
+
+    with TestClient(build_app()) as client:
+        response = client.get("/items")
+        assert response.json() == {"primary": False}
+        assert "set-cookie" not in response.headers
+
+        response = client.post("/items")
+        assert response.headers["set-cookie"] == (
+            "db_read_primary=1; Max-Age=5; Path=/; HttpOnly; SameSite=lax"
+        )
+        assert client.get("/items").json() == {"primary": True}
+
+        client.cookies.clear()
+        assert client.get("/items").json() == {"primary": False}
+
+
+"""
+- [ ] Test any committed write route pins reads, a rolled back one does not
+"""
+
+
+def test_unit_read_your_writes_any_commit(
+    monkeypatch, sqlite_session_local, sqlite_replicas
+):
+    primary = sqlite_session_local.kw["bind"]
+    monkeypatch.setattr(db_connection, "engine", primary)
+    metadata.create_all(primary)
+
+    with TestClient(build_app()) as client:
+        response = client.post("/items/renumber")
+        assert response.status_code == 200
+        assert "db_read_primary=1" in response.headers["set-cookie"]
+
+        client.cookies.clear()
+        response = client.post("/items/invalid")
+        assert response.status_code == 400
+        assert "set-cookie" not in response.headers
@@ -0,0 +1,243 @@
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import bindparam, column, create_engine, exc, select, table, text
+
+from app import db_connection, db_metrics
+from app.config import DB_POOL_SIZE, DB_QUERY_CACHE_SIZE
+from app.db_metrics import (
+    InstrumentedQueuePool,
+    QueryTimingMiddleware,
+    register_pool_metrics,
+    register_query_timing,
+    register_statement_cache_metrics,
+)
+
+
+@pytest.fixture(scope="function")
+def sqlite_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_metrics, "POOL_METRICS", {})
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+    register_pool_metrics(engine, "test")
+
+    yield engine
+
+    engine.dispose()
+
+
+"""
+- [ ] Test pool metrics report checked out, idle and overflow connections
+"""
+
+
+def test_unit_pool_metrics_connection_counts(sqlite_engine):
+    connections = [sqlite_engine.connect() for _ in range(3)]
+
+    metrics = db_metrics.get_pool_metrics()["test"]
+    assert metrics["pool_size"] == 2
+    assert metrics["checked_out"] == 3
+    assert metrics["idle"] == 0
+    assert metrics["overflow"] == 1
+    assert metrics["checkouts"] == 3
+    assert metrics["connects"] == 3
+
+    for connection in connections:
+        connection.close()
+
+    metrics = db_metrics.get_pool_metrics()["test"]
+    assert metrics["checked_out"] == 0
+    assert metrics["idle"] == 2
+    assert metrics["checkins"] == 3
+    assert metrics["checkout_wait"]["count"] == 3
+
+
+"""
+- [ ] Test pool metrics record checkout wait time and timeouts
+"""
+
+
+def test_unit_pool_metrics_checkout_timeout(sqlite_engine):
+    connections = [sqlite_engine.connect() for _ in range(3)]
+
+    with pytest.raises(exc.TimeoutError):
+        sqlite_engine.connect()
+
+    metrics = db_metrics.get_pool_metrics()["test"]
+    assert metrics["timeouts"] == 1
+    assert metrics["checkout_wait"]["max_seconds"] >= 0.1
+
+    for connection in connections:
+        connection.close()
+
+
+"""
+- [ ] Test pool metrics survive engine dispose
+"""
+
+
+def test_unit_pool_metrics_after_dispose(sqlite_engine):
+    sqlite_engine.connect().close()
+    sqlite_engine.dispose()
+    sqlite_engine.connect().close()
+
+    metrics = db_metrics.get_pool_metrics()["test"]
+    assert metrics["checkouts"] == 2
+    assert metrics["checkout_wait"]["count"] == 2
+
+
+"""
+- [ ] Test GET pool metrics endpoint
+"""
+
+
+def test_unit_get_pool_metrics(client, max_queries):
+    with max_queries(0):
+        response = client.get("/api/db/pool")
+    assert response.status_code == 200
+    assert response.json()["primary"]["pool_size"] == DB_POOL_SIZE
+
+
+"""
+- [ ] Test statement cache metrics count hits, misses and uncached statements
+"""
+
+
+def test_unit_statement_cache_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_metrics, "STATEMENT_CACHE_METRICS", {})
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    register_statement_cache_metrics(engine, "test")
+    query = select(column("value")).select_from(table("numbers"))
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("CREATE TABLE numbers (value INTEGER)")
+        for _ in range(3):
+            connection.execute(query).all()
+        connection.exec_driver_sql("SELECT 1")
+
+    metrics = db_metrics.get_statement_cache_metrics()["test"]
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 1
+    assert metrics["uncached"] == 2
+    assert metrics["hit_rate"] == pytest.approx(2 / 3)
+    assert metrics["capacity"] == 500
+    assert metrics["size"] >= 1
+    assert metrics["recent_misses"] == ["SELECT value \nFROM numbers"]
+
+    engine.dispose()
+
+
+"""
+- [ ] Test GET statement cache metrics endpoint
+"""
+
+
+def test_unit_get_statement_cache_metrics(client):
+    response = client.get("/api/db/statement-cache")
+    assert response.status_code == 200
+    metrics = response.json()["primary"]
+    assert metrics["capacity"] == DB_QUERY_CACHE_SIZE
+    assert set(metrics) >= {"hits", "misses", "uncached", "hit_rate"}
+
+
+@pytest.fixture(scope="function")
+def timed_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'timing.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    register_query_timing(engine, slow_query_seconds=-1)
+
+    yield engine
+
+    engine.dispose()
+
+
+def build_timed_app(engine, enabled=True):
+    app = FastAPI()
+    app.add_middleware(QueryTimingMiddleware, enabled=enabled)
+
+    @app.get("/queries/{count}")
+    def run_queries(count: int):
+        with engine.connect() as connection:
+            for _ in range(count):
+                connection.execute(text("SELECT 1"))
+
+    return app
+
+
+"""
+- [ ] Test the Server-Timing header reports the request's query count and time
+"""
+
+
+def test_unit_query_timing_server_timing(timed_engine):
+    client = TestClient(build_timed_app(timed_engine))
+
+    response = client.get("/queries/3")
+    assert re.fullmatch(
+        r'db;dur=\d+\.\d;desc="3 queries"', response.headers["server-timing"]
+    )
+    assert client.get("/queries/0").headers["server-timing"] == (
+        'db;dur=0.0;desc="0 queries"'
+    )
+
+
+"""
+- [ ] Test no Server-Timing header is sent unless enabled
+"""
+
+
+def test_unit_query_timing_disabled(timed_engine):
+    client = TestClient(build_timed_app(timed_engine, enabled=False))
+    assert "server-timing" not in client.get("/queries/1").headers
+
+
+"""
+- [ ] Test slow queries are logged with their parameter values redacted
+"""
+
+
+def test_unit_slow_query_log(tmp_path, caplog, monkeypatch):
+    # the migration tests' fileConfig disables the loggers existing by then
+    monkeypatch.setattr(db_metrics.logger, "disabled", False)
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    register_query_timing(engine, slow_query_seconds=0)
+
+    with engine.connect() as connection:
+        connection.execute(
+            select(bindparam("email")), {"email": "jane@example.com"}
+        ).all()
+
+    assert "Slow query" in caplog.text
+    assert "parameters=['str']" in caplog.text
+    assert "jane@example.com" not in caplog.text
+
+    engine.dispose()
+
+
+"""
+- [ ] Test max_queries fails a block running more queries than allowed
+"""
+
+
+def test_unit_max_queries(timed_engine, monkeypatch, max_queries):
+    monkeypatch.setattr(db_connection, "engine", timed_engine)
+    monkeypatch.setattr(db_connection, "replica_engines", [])
+    client = TestClient(build_timed_app(timed_engine))
+
+    with max_queries(2) as statements:
+        client.get("/queries/2")
+    assert statements == ["SELECT 1", "SELECT 1"]
+
+    with pytest.raises(AssertionError, match="3 queries, expected at most 2"):
+        with max_queries(2):
+            client.get("/queries/3")
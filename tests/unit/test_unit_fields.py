@@ -0,0 +1,49 @@
+import pytest
+from fastapi import HTTPException
+
+from app.models import Product
+from app.schemas.product_schemas import ProductReturn
+from app.utils.fields import narrow_model, parse_fields, select_columns
+
+"""
+- [ ] Test fields parameter parsing
+"""
+
+
+def test_unit_parse_fields():
+    assert parse_fields(None, ProductReturn) is None
+    assert parse_fields(" , ", ProductReturn) is None
+    assert parse_fields("name, slug,name", ProductReturn) == ("name", "slug")
+
+    with pytest.raises(HTTPException) as exc_info:
+        parse_fields("name,secret", ProductReturn)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Unknown fields: secret"
+
+
+"""
+- [ ] Test narrowed response models only carry the requested fields
+"""
+
+
+def test_unit_narrow_model():
+    model = narrow_model(ProductReturn, ("id", "name"))
+
+    assert list(model.model_fields) == ["id", "name"]
+    assert model.model_fields["id"].annotation is int
+    assert narrow_model(ProductReturn, ("id", "name")) is model
+
+
+"""
+- [ ] Test only requested and keyset columns are selected
+"""
+
+
+def test_unit_select_columns():
+    table = Product.__table__
+
+    assert select_columns(table, None) == list(table.c)
+    assert [
+        column.name for column in select_columns(table, ("slug",), key_fields=("id",))
+    ] == ["id", "slug"]
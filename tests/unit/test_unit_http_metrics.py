@@ -0,0 +1,179 @@
+import os
+import subprocess
+import sys
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app import http_metrics
+from app.http_metrics import MetricsMiddleware
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a" * 1000, b"b" * 500]))
+
+    @app.get("/error")
+    def error():
+        raise RuntimeError("boom")
+
+    return app
+
+
+"""
+- [ ] Test requests are counted by route template and status code
+"""
+
+
+def test_unit_metrics_route_template_and_status():
+    client = TestClient(build_app())
+    before = sample(
+        "http_requests_total", method="GET", route="/items/{item_id}", status="200"
+    )
+    unmatched = sample(
+        "http_requests_total", method="GET", route="unmatched", status="404"
+    )
+    invalid = sample(
+        "http_requests_total", method="GET", route="/items/{item_id}", status="422"
+    )
+
+    for item_id in range(3):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/items/x").status_code == 422
+    assert client.get("/missing/1").status_code == 404
+
+    assert (
+        sample(
+            "http_requests_total",
+            method="GET",
+            route="/items/{item_id}",
+            status="200",
+        )
+        == before + 3
+    )
+    assert (
+        sample(
+            "http_requests_total",
+            method="GET",
+            route="/items/{item_id}",
+            status="422",
+        )
+        == invalid + 1
+    )
+    assert (
+        sample("http_requests_total", method="GET", route="unmatched", status="404")
+        == unmatched + 1
+    )
+    assert sample("http_requests_in_progress") == 0
+
+
+"""
+- [ ] Test latency and size of a streamed response are recorded to its last chunk
+"""
+
+
+def test_unit_metrics_streamed_response():
+    client = TestClient(build_app())
+    count = sample("http_request_duration_seconds_count", method="GET", route="/stream")
+    size = sample("http_response_size_bytes_sum", method="GET", route="/stream")
+
+    response = client.get("/stream")
+    assert len(response.content) == 1500
+
+    assert (
+        sample("http_request_duration_seconds_count", method="GET", route="/stream")
+        == count + 1
+    )
+    assert (
+        sample("http_response_size_bytes_sum", method="GET", route="/stream")
+        == size + 1500
+    )
+
+
+"""
+- [ ] Test an unhandled error is counted as a 500
+"""
+
+
+def test_unit_metrics_unhandled_error():
+    client = TestClient(build_app(), raise_server_exceptions=False)
+    before = sample("http_requests_total", method="GET", route="/error", status="500")
+
+    assert client.get("/error").status_code == 500
+
+    assert (
+        sample("http_requests_total", method="GET", route="/error", status="500")
+        == before + 1
+    )
+    assert sample("http_requests_in_progress") == 0
+
+
+"""
+- [ ] Test GET metrics endpoint serves the Prometheus text format
+"""
+
+
+def test_unit_get_metrics(client):
+    client.get("/api/db/pool")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_requests_total{method="GET",route="/api/db/pool",status="200"}'
+        in response.text
+    )
+
+
+WORKER = """
+import asyncio
+
+from app.http_metrics import MetricsMiddleware
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def send(message):
+    pass
+
+
+asyncio.run(MetricsMiddleware(endpoint)({"type": "http", "method": "GET"}, None, send))
+"""
+
+
+"""
+- [ ] Test metrics of several worker processes are aggregated
+"""
+
+
+def test_unit_metrics_multiprocess(tmp_path, monkeypatch):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", WORKER], env=env, check=True)
+    monkeypatch.setattr(http_metrics, "PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    metrics = http_metrics.generate_metrics().decode()
+    assert (
+        'http_requests_total{method="GET",route="unmatched",status="200"} 2.0'
+        in metrics
+    )
+    assert 'http_response_size_bytes_sum{method="GET",route="unmatched"} 4.0' in (
+        metrics
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import inspect
+
+from app.db_connection import Base
+
+"""
+- [ ] Test unplanned relationship loads raise in the test suite
+"""
+
+
+def test_unit_relationships_raise_on_lazy_load():
+    for mapper in Base.registry.mappers:
+        for relationship in mapper.relationships:
+            assert relationship.lazy == "raise_on_sql", (
+                f"{mapper.class_.__name__}.{relationship.key} would lazy load"
+            )
+
+
+"""
+- [ ] Test every relationship has its inverse declared
+"""
+
+
+def test_unit_relationships_back_populates():
+    for mapper in Base.registry.mappers:
+        for relationship in mapper.relationships:
+            if relationship.back_populates:
+                other = inspect(relationship.entity.class_)
+                assert other.relationships[
+                    relationship.back_populates
+                ].back_populates == (relationship.key)
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import HTTPException
+
+from app.utils.pagination import build_page, decode_cursor, encode_cursor
+
+"""
+- [ ] Test cursor tokens round trip the keyset values
+"""
+
+
+def test_unit_cursor_round_trip():
+    cursor = encode_cursor(2, "shoes")
+
+    assert isinstance(cursor, str)
+    assert decode_cursor(cursor, (int, str)) == [2, "shoes"]
+
+
+"""
+- [ ] Test invalid cursor tokens are rejected
+"""
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["not base64 !", encode_cursor(1, 2, 3), "bm90IGpzb24=", encode_cursor()],
+)
+def test_unit_cursor_invalid(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, (int, str))
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor"
+
+
+"""
+- [ ] Test cursors holding values of the wrong type are rejected
+"""
+
+
+@pytest.mark.parametrize(
+    "values, types",
+    [
+        (["x"], (int,)),
+        ([None], (int,)),
+        ([{}], (int,)),
+        ([-5], (int,)),
+        ([True], (int,)),
+        ([1.5], (int,)),
+        (["0.5", 2], (float, int)),
+        ([False, 2], (float, int)),
+        ([1, 2], (int, str)),
+        (["shoes", 1], (int, str)),
+    ],
+)
+def test_unit_cursor_wrong_types(values, types):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(encode_cursor(*values), types)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor"
+
+
+"""
+- [ ] Test floats also take integer values, e.g. a rank of 0
+"""
+
+
+def test_unit_cursor_float_accepts_int():
+    assert decode_cursor(encode_cursor(0, 2), (float, int)) == [0, 2]
+
+
+"""
+- [ ] Test pages only carry a next cursor when there are more rows
+"""
+
+
+def test_unit_build_page():
+    rows = [{"id": id_} for id_ in range(1, 5)]
+
+    page = build_page(rows, 3, lambda row: (row["id"],))
+    assert page["items"] == rows[:3]
+    assert decode_cursor(page["next_cursor"], (int,)) == [3]
+
+    page = build_page(rows, 4, lambda row: (row["id"],))
+    assert page["items"] == rows
+    assert page["next_cursor"] is None
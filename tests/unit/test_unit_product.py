@@ -0,0 +1,455 @@
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.loader_options import PRODUCT_DETAIL
+from app.models import (
+    Attribute,
+    AttributeValue,
+    Category,
+    Product,
+    ProductImage,
+    ProductLine,
+    ProductType,
+)
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.suggest import product_suggest_cache
+from tests.factories.models_factory import (
+    get_random_category_dict,
+    get_random_product_dict,
+)
+
+
+def mock_output(return_value=None):
+    return lambda *args, **kwargs: return_value
+
+
+def mock_rows(rows):
+    return SimpleNamespace(mappings=lambda: SimpleNamespace(all=lambda: rows))
+
+
+"""
+- [ ] Test GET products returns the first page and a cursor to the next one
+"""
+
+
+def test_unit_list_products(client, monkeypatch):
+    products = [get_random_product_dict(id_) for id_ in range(1, 4)]
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute", mock_output(mock_rows(products))
+    )
+
+    response = client.get("/api/product/?limit=2")
+    assert response.status_code == 200
+    assert response.json()["items"] == products[:2]
+    assert decode_cursor(response.json()["next_cursor"], (int,)) == [2]
+
+
+"""
+- [ ] Test GET product pages reject tampered cursors with a 400
+"""
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/api/product/", {}),
+        ("/api/product/search", {"q": "shoes"}),
+        ("/api/product/filter", {"attribute_value_id": 1}),
+    ],
+)
+@pytest.mark.parametrize("values", [["x"], [None], [{}], [-5], [True], ["x", 1]])
+def test_unit_product_pages_invalid_cursor(client, monkeypatch, path, params, values):
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_output())
+
+    response = client.get(path, params={**params, "cursor": encode_cursor(*values)})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+"""
+- [ ] Test GET products seeks past the cursor and filters by category subtree
+"""
+
+
+def test_unit_list_products_cursor(client, monkeypatch):
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return mock_rows([])
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get(
+        "/api/product/", params={"cursor": encode_cursor(40), "category_id": 7}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
+
+    statement = statements[0].compile()
+    assert "product.id > " in str(statement)
+    assert "category_closure" in str(statement)
+    assert statement.params["id_1"] == 40
+
+
+"""
+- [ ] Test GET products filters on the trigger maintained stock status
+"""
+
+
+@pytest.mark.parametrize(
+    "in_stock, condition",
+    [("true", "product.stock_status = "), ("false", "product.stock_status != ")],
+)
+def test_unit_list_products_in_stock(client, monkeypatch, in_stock, condition):
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return mock_rows([])
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get("/api/product/", params={"in_stock": in_stock})
+    assert response.status_code == 200
+
+    statement = statements[0].compile()
+    assert condition in str(statement)
+    assert "is" in statement.params.values()
+
+
+"""
+- [ ] Test GET products with an invalid cursor or limit
+"""
+
+
+def test_unit_list_products_invalid_params(client):
+    assert client.get("/api/product/?cursor=abc").status_code == 400
+    assert client.get("/api/product/?limit=0").status_code == 422
+    assert client.get("/api/product/?limit=101").status_code == 422
+
+
+"""
+- [ ] Test GET products with fields only fetches and returns those fields
+"""
+
+
+def test_unit_list_products_fields(client, monkeypatch):
+    products = [get_random_product_dict(id_) for id_ in range(1, 4)]
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return mock_rows(products)
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get("/api/product/?limit=2&fields=name,slug")
+    assert response.status_code == 200
+    assert response.json()["items"] == [
+        {"name": product["name"], "slug": product["slug"]} for product in products[:2]
+    ]
+    assert decode_cursor(response.json()["next_cursor"], (int,)) == [2]
+
+    selected = [column.name for column in statements[0].selected_columns]
+    assert selected == ["id", "name", "slug"]
+
+
+def get_product_detail_model():
+    product_data = get_random_product_dict(1)
+    product_data["created_at"] = datetime.fromisoformat(product_data["created_at"])
+    product_data["updated_at"] = datetime.fromisoformat(product_data["updated_at"])
+
+    attribute = Attribute(id=1, name="size", description=None)
+    product_line = ProductLine(
+        id=1,
+        price=Decimal("9.99"),
+        sku=uuid4(),
+        stock_qty=3,
+        is_active=True,
+        order=1,
+        weight=1.5,
+        created_at=datetime(2024, 1, 1),
+        product_images=[
+            ProductImage(id=1, alternative_text="front", url="/front.png", order=1)
+        ],
+        attribute_values=[
+            AttributeValue(id=1, attribute_value="L", attribute=attribute)
+        ],
+    )
+    return Product(
+        **product_data,
+        category=Category(**get_random_category_dict(product_data["category_id"])),
+        product_types=[ProductType(id=1, name="shirts", level=1, parent_id=None)],
+        product_lines=[product_line],
+    )
+
+
+"""
+- [ ] Test GET product detail loads relationships with the loader preset
+"""
+
+
+def test_unit_get_product_detail(client, monkeypatch):
+    product = get_product_detail_model()
+    statements = []
+
+    def mock_scalar(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return product
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.scalar", mock_scalar)
+
+    response = client.get("/api/product/1")
+    assert response.status_code == 200
+
+    detail = response.json()
+    assert detail["category"]["id"] == product.category_id
+    assert detail["product_types"][0]["name"] == "shirts"
+    assert detail["product_lines"][0]["price"] == "9.99"
+    assert detail["product_lines"][0]["product_images"][0]["url"] == "/front.png"
+    assert detail["product_lines"][0]["attribute_values"][0] == {
+        "id": 1,
+        "attribute_value": "L",
+        "attribute": {"id": 1, "name": "size", "description": None},
+    }
+    assert statements[0]._with_options == PRODUCT_DETAIL
+
+
+"""
+- [ ] Test GET product detail when the product does not exist
+"""
+
+
+def test_unit_get_product_detail_not_found(client, monkeypatch):
+    monkeypatch.setattr("sqlalchemy.orm.Session.scalar", mock_output())
+
+    response = client.get("/api/product/1")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Product not found"}
+
+
+"""
+- [ ] Test GET product by slug passes the database json through untouched
+"""
+
+
+def test_unit_get_product_by_slug(client, monkeypatch):
+    document = '{"id" : 1, "slug" : "product-1", "product_lines" : []}'
+    statements = []
+
+    def mock_scalar(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return document
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.scalar", mock_scalar)
+
+    response = client.get("/api/product/slug/product-1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.text == document
+
+    compiled = statements[0].compile(dialect=postgresql.dialect())
+    assert str(compiled).count("json_agg") == 3
+    assert "product-1" in compiled.params.values()
+
+
+"""
+- [ ] Test GET product by pid when the product does not exist
+"""
+
+
+def test_unit_get_product_by_pid_not_found(client, monkeypatch):
+    monkeypatch.setattr("sqlalchemy.orm.Session.scalar", mock_output())
+
+    response = client.get(f"/api/product/pid/{uuid4()}")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Product not found"}
+
+
+"""
+- [ ] Test GET product by pid with a malformed pid
+"""
+
+
+def test_unit_get_product_by_pid_invalid(client):
+    response = client.get("/api/product/pid/not-a-uuid")
+    assert response.status_code == 422
+
+
+"""
+- [ ] Test GET filtered products pages through the matches with facet counts
+"""
+
+
+def test_unit_filter_products(client, monkeypatch):
+    products = [get_random_product_dict(id_) for id_ in (5, 9)]
+    facets = [
+        {
+            "attribute_id": 1,
+            "attribute": "size",
+            "attribute_value_id": 1,
+            "attribute_value": "S",
+            "count": 3,
+        }
+    ]
+    results = [
+        SimpleNamespace(all=lambda: [(1, 1)]),
+        mock_rows(products),
+        mock_rows(facets),
+    ]
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return results[len(statements) - 1]
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get(
+        "/api/product/filter",
+        params={"attribute_value_id": 1, "cursor": encode_cursor(2), "limit": 1},
+    )
+    assert response.status_code == 200
+    assert response.json()["items"] == products[:1]
+    assert decode_cursor(response.json()["next_cursor"], (int,)) == [5]
+    assert response.json()["facets"] == facets
+
+    page = statements[1].compile(dialect=postgresql.dialect())
+    assert "FROM product_facet" in str(page)
+    assert "product.id > %(id_1)s" in str(page)
+    assert page.params["id_1"] == 2
+    assert page.params["param_1"] == 2
+
+
+"""
+- [ ] Test GET filtered products rejects unknown attribute values
+"""
+
+
+def test_unit_filter_products_unknown_value(client, monkeypatch):
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute",
+        mock_output(SimpleNamespace(all=lambda: [(1, 1)])),
+    )
+
+    response = client.get("/api/product/filter", params={"attribute_value_id": [1, 99]})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown attribute values: 99"}
+
+
+"""
+- [ ] Test GET filtered products requires an attribute value
+"""
+
+
+def test_unit_filter_products_without_values(client):
+    assert client.get("/api/product/filter").status_code == 422
+
+
+"""
+- [ ] Test GET product search ranks matches and pages by rank and id
+"""
+
+
+def test_unit_search_products(client, monkeypatch):
+    products = [
+        {**get_random_product_dict(id_), "rank": rank}
+        for id_, rank in ((4, 0.9), (2, 0.5), (3, 0.5))
+    ]
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute", mock_output(mock_rows(products))
+    )
+
+    response = client.get("/api/product/search", params={"q": "shirt", "limit": 2})
+    assert response.status_code == 200
+    assert response.json()["items"] == products[:2]
+    assert decode_cursor(response.json()["next_cursor"], (float, int)) == [0.5, 2]
+
+
+"""
+- [ ] Test GET product search seeks past the rank and id of the cursor
+"""
+
+
+def test_unit_search_products_cursor(client, monkeypatch):
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return mock_rows([])
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get(
+        "/api/product/search",
+        params={"q": "red shirt", "cursor": encode_cursor(0.5, 2)},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
+
+    statement = statements[0].compile(dialect=postgresql.dialect())
+    assert "search_vector @@ websearch_to_tsquery" in str(statement)
+    assert "ORDER BY ts_rank" in str(statement)
+    assert "red shirt" in statement.params.values()
+    assert statement.params["id_1"] == 2
+    assert [column.name for column in statements[0].selected_columns][-1] == "rank"
+
+
+"""
+- [ ] Test GET product search with a missing query or a malformed cursor
+"""
+
+
+def test_unit_search_products_invalid_params(client):
+    assert client.get("/api/product/search").status_code == 422
+    assert client.get("/api/product/search?q=").status_code == 422
+    cursor = encode_cursor(7)
+    assert client.get(f"/api/product/search?q=a&cursor={cursor}").status_code == 400
+
+
+"""
+- [ ] Test GET product suggestions match prefixes of name and slug first
+"""
+
+
+def test_unit_suggest_products(client, monkeypatch):
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return SimpleNamespace(mappings=lambda: [])
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+    product_suggest_cache.clear()
+
+    response = client.get("/api/product/suggest", params={"q": "100%", "limit": 5})
+    assert response.status_code == 200
+    assert response.json() == []
+
+    compiled = statements[0].compile(dialect=postgresql.dialect())
+    assert "product.name ILIKE" in str(compiled)
+    assert "product.slug ILIKE" in str(compiled)
+    assert "<%" in str(compiled)
+    assert "ORDER BY ((product.name ILIKE" in str(compiled)
+    # LIKE wildcards typed by the user are matched literally
+    assert "100/%" in compiled.params.values()
+    product_suggest_cache.clear()
+
+
+"""
+- [ ] Test GET product suggestions with invalid parameters
+"""
+
+
+def test_unit_suggest_products_invalid_params(client, monkeypatch):
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_output())
+
+    assert client.get("/api/product/suggest").status_code == 422
+    assert client.get("/api/product/suggest?q=a&limit=21").status_code == 422
+    assert client.get("/api/product/suggest?q=%20").json() == []
@@ -0,0 +1,191 @@
+import csv
+import gzip
+import io
+import zlib
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.utils.product_export import (
+    export_documents_query,
+    gzip_batches,
+    write_csv,
+    write_ndjson,
+)
+
+DOCUMENTS = ['{"id" : 1, "slug" : "a"}', '{"id" : 2, "slug" : "b"}']
+
+
+def line_row(id_, sku, attribute_values):
+    return {
+        "id": id_,
+        "slug": f"product-{id_}",
+        "name": f"Product {id_}",
+        "description": None,
+        "is_digital": False,
+        "is_active": True,
+        "category_id": 1,
+        "seasonal_id": None,
+        "sku": sku,
+        "price": "9.50",
+        "stock_qty": 3,
+        "line_is_active": True,
+        "order": 1,
+        "weight": 0.5,
+        "images": "[]",
+        "attribute_values": attribute_values,
+    }
+
+
+def mock_partitions(*partitions):
+    return SimpleNamespace(
+        partitions=lambda: iter(partitions),
+        scalars=lambda: SimpleNamespace(partitions=lambda: iter(partitions)),
+        mappings=lambda: SimpleNamespace(partitions=lambda: iter(partitions)),
+    )
+
+
+@pytest.fixture(scope="function")
+def executed(monkeypatch):
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return mock_partitions(DOCUMENTS[:1], DOCUMENTS[1:])
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+    monkeypatch.setattr("sqlalchemy.orm.Session.connection", lambda self, **kw: None)
+    return statements
+
+
+"""
+- [ ] Test the export reads products in id order after the resume id
+"""
+
+
+def test_unit_export_documents_query():
+    statement = export_documents_query(41).compile(dialect=postgresql.dialect())
+    assert "WHERE product.id > %(id_1)s ORDER BY product.id" in str(statement)
+    assert statement.params["id_1"] == 41
+    assert "json_object_agg(attribute.name, attribute_value.attribute_value)" in (
+        str(statement)
+    )
+
+
+"""
+- [ ] Test NDJSON is written one batch per server-side cursor partition
+"""
+
+
+def test_unit_write_ndjson(executed):
+    batches = list(write_ndjson(Session(), None, 500))
+
+    assert batches == [f"{DOCUMENTS[0]}\n", f"{DOCUMENTS[1]}\n"]
+    assert executed[0].get_execution_options()["yield_per"] == 500
+
+
+"""
+- [ ] Test CSV has a column per attribute, in the import's layout
+"""
+
+
+def test_unit_write_csv(monkeypatch):
+    rows = [line_row(1, "sku-1", '{"size" : "M"}'), line_row(2, "sku-2", "{}")]
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.scalars",
+        lambda self, statement: SimpleNamespace(all=lambda: ["colour", "size"]),
+    )
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute",
+        lambda self, statement: mock_partitions(rows[:1], rows[1:]),
+    )
+
+    batches = list(write_csv(Session(), None, 1))
+
+    assert len(batches) == 2
+    header, first, second = csv.reader(io.StringIO("".join(batches)))
+    assert header[-3:] == ["images", "attribute.colour", "attribute.size"]
+    assert header[8:14] == [
+        "sku",
+        "price",
+        "stock_qty",
+        "line_is_active",
+        "order",
+        "weight",
+    ]
+    assert first[-2:] == ["", "M"]
+    assert second[:2] == ["2", "product-2"]
+
+
+"""
+- [ ] Test CSV batches end on whole products when a partition splits one
+"""
+
+
+def test_unit_write_csv_product_boundaries(monkeypatch):
+    rows = [
+        line_row(1, "sku-1", "{}"),
+        line_row(2, "sku-2", "{}"),
+        line_row(2, "sku-3", "{}"),
+        line_row(2, "sku-4", "{}"),
+        line_row(3, "sku-5", "{}"),
+    ]
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.scalars",
+        lambda self, statement: SimpleNamespace(all=lambda: []),
+    )
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute",
+        lambda self, statement: mock_partitions(rows[:2], rows[2:3], rows[3:]),
+    )
+
+    batches = list(write_csv(Session(), None, 2))
+
+    assert [
+        [row[0] for row in csv.reader(io.StringIO(batch))] for batch in batches
+    ] == [["id", "1"], ["2", "2", "2"], ["3"]]
+
+
+"""
+- [ ] Test every gzip batch is flushed, so it can be decompressed on arrival
+"""
+
+
+def test_unit_gzip_batches():
+    batches = gzip_batches(iter([b"first\n", b"second\n"]))
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+
+    assert decompressor.decompress(next(batches)) == b"first\n"
+    assert decompressor.decompress(next(batches)) == b"second\n"
+    assert gzip.decompress(b"".join(gzip_batches(iter([b"a", b"b"])))) == b"ab"
+
+
+"""
+- [ ] Test GET product export streams NDJSON as an attachment
+"""
+
+
+def test_unit_export_product_feed(client, executed):
+    response = client.get("/api/product/export", params={"after_id": 0})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == (
+        'attachment; filename="catalog.ndjson"'
+    )
+    assert response.text.splitlines() == DOCUMENTS
+
+
+"""
+- [ ] Test GET product export compresses the stream on request
+"""
+
+
+def test_unit_export_product_feed_gzip(client, executed):
+    response = client.get("/api/product/export", params={"gzip": True})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(response.content).decode().splitlines() == DOCUMENTS
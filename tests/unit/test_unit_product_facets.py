@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.utils.product_facets import (
+    facet_counts_query,
+    group_by_attribute,
+    matching_products_query,
+)
+
+# attribute 1 is size with values 1 and 2, attribute 2 colour with value 4
+ATTRIBUTE_IDS = [(1, 1), (2, 1), (4, 2)]
+
+
+def mock_output(return_value=None):
+    return lambda *args, **kwargs: return_value
+
+
+def compile_query(query) -> str:
+    return str(
+        query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+@pytest.fixture
+def attribute_ids(monkeypatch):
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.execute",
+        mock_output(SimpleNamespace(all=lambda: ATTRIBUTE_IDS)),
+    )
+
+
+"""
+- [ ] Test attribute values are grouped by attribute in request order
+"""
+
+
+def test_unit_group_by_attribute(attribute_ids):
+    assert group_by_attribute(Session(), [4, 2, 1, 2]) == {2: [4], 1: [2, 1]}
+
+
+"""
+- [ ] Test filtering by an attribute value that does not exist
+"""
+
+
+def test_unit_group_by_attribute_unknown_value(attribute_ids):
+    with pytest.raises(HTTPException) as error:
+        group_by_attribute(Session(), [1, 99])
+    assert error.value.status_code == 400
+    assert error.value.detail == "Unknown attribute values: 99"
+
+
+"""
+- [ ] Test values of one attribute are OR-ed and attributes are AND-ed
+"""
+
+
+def test_unit_matching_products_query():
+    size = compile_query(matching_products_query({1: [1, 2]}))
+    assert "product_facet.attribute_value_id IN (1, 2)" in size
+    assert "INTERSECT" not in size
+
+    small_blue = compile_query(matching_products_query({1: [1], 2: [4]}))
+    assert small_blue.count("INTERSECT") == 1
+    assert "product_facet.attribute_value_id IN (4)" in small_blue
+
+    assert matching_products_query({1: [1]}, exclude=1) is None
+
+
+"""
+- [ ] Test facet counts ignore the filter on their own attribute
+"""
+
+
+def test_unit_facet_counts_query():
+    statement = compile_query(facet_counts_query({1: [1], 2: [4]}))
+
+    # one count per filtered attribute, one for all the unfiltered ones
+    assert statement.count("UNION ALL") == 2
+    assert "attribute_value.attribute_id = 1" in statement
+    assert "attribute_value.attribute_id = 2" in statement
+    assert "attribute_value.attribute_id NOT IN (1, 2)" in statement
+    assert "coalesce(facet_counts.count, 0) AS count" in statement
+    assert "LEFT OUTER JOIN" in statement
@@ -0,0 +1,313 @@
+import io
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.schemas.import_schemas import ProductImport
+from app.utils.product_import import (
+    copy_value,
+    get_import_format,
+    import_product,
+    import_product_line,
+    import_products,
+    read_csv,
+    staging_rows,
+    upsert_products_query,
+)
+
+CSV_FEED = """slug,name,category_id,sku,price,order,weight,images,attribute.size
+shirt,Shirt,1,{sku_1},9.50,1,0.2,"[{{""url"": ""a.jpg"", ""alternative_text"": ""front"", ""order"": 0}}]",M
+shirt,Shirt,1,{sku_2},9.50,2,0.2,,L
+socks,Socks,2,,,,,,
+"""
+
+
+def ndjson_product(slug, **values):
+    return json.dumps({"slug": slug, "name": slug.title(), "category_id": 1, **values})
+
+
+@pytest.fixture(scope="function")
+def merged_chunks(monkeypatch):
+    chunks = []
+
+    def mock_merge_chunk(db, chunk):
+        chunks.append(chunk)
+        return {"products": len(chunk)}, []
+
+    monkeypatch.setattr("app.utils.product_import.merge_chunk", mock_merge_chunk)
+    monkeypatch.setattr("sqlalchemy.orm.Session.commit", lambda self: None)
+    return chunks
+
+
+"""
+- [ ] Test the import format is taken from the file extension
+"""
+
+
+def test_unit_get_import_format():
+    assert get_import_format("feed.CSV") == "csv"
+    assert get_import_format("feed.jsonl") == "ndjson"
+    with pytest.raises(ValueError):
+        get_import_format("feed.xml")
+
+
+"""
+- [ ] Test consecutive CSV rows of one slug are read as one product
+"""
+
+
+def test_unit_read_csv():
+    sku_1, sku_2 = uuid4(), uuid4()
+    feed = io.StringIO(CSV_FEED.format(sku_1=sku_1, sku_2=sku_2))
+
+    (shirt_line, shirt), (socks_line, socks) = read_csv(feed)
+
+    assert (shirt_line, socks_line) == (2, 4)
+    assert socks == {
+        "slug": "socks",
+        "name": "Socks",
+        "category_id": "2",
+        "product_lines": [],
+    }
+    first, second = ProductImport.model_validate(shirt).product_lines
+    assert (first.sku, first.attribute_values) == (sku_1, {"size": "M"})
+    assert first.product_images[0].url == "a.jpg"
+    assert (second.sku, second.product_images) == (sku_2, [])
+
+
+"""
+- [ ] Test a slug or sku repeated in one chunk is staged once, the last one wins
+"""
+
+
+def test_unit_staging_rows_last_wins():
+    sku = uuid4()
+    line = {"sku": sku, "price": "1.00", "order": 1, "weight": 1}
+    chunk = [
+        (1, ProductImport(slug="a", name="First", category_id=1, product_lines=[line])),
+        (2, ProductImport(slug="b", name="B", category_id=1, product_lines=[line])),
+        (3, ProductImport(slug="a", name="Second", category_id=1)),
+    ]
+
+    rows = staging_rows(chunk)
+
+    assert [(row["line"], row["name"]) for row in rows[import_product]] == [
+        (3, "Second"),
+        (2, "B"),
+    ]
+    assert [row["product_slug"] for row in rows[import_product_line]] == ["b"]
+
+
+"""
+- [ ] Test a slug repeated in one chunk takes the lines of its last record
+"""
+
+
+def test_unit_staging_rows_repeated_slug_lines():
+    first, second = uuid4(), uuid4()
+    chunk = [
+        (
+            1,
+            ProductImport(
+                slug="a",
+                name="A",
+                category_id=1,
+                product_lines=[
+                    {"sku": first, "price": "1.00", "order": 1, "weight": 1}
+                ],
+            ),
+        ),
+        (
+            2,
+            ProductImport(
+                slug="a",
+                name="A",
+                category_id=1,
+                product_lines=[
+                    {"sku": second, "price": "1.00", "order": 1, "weight": 1}
+                ],
+            ),
+        ),
+    ]
+
+    rows = staging_rows(chunk)
+
+    assert [row["sku"] for row in rows[import_product_line]] == [second]
+
+
+"""
+- [ ] Test staged values are escaped for the COPY text format
+"""
+
+
+def test_unit_copy_value():
+    assert copy_value(None) == "\\N"
+    assert copy_value(False) == "False"
+    assert copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+
+"""
+- [ ] Test products are upserted by slug and only rewritten when they changed
+"""
+
+
+def test_unit_upsert_products_query():
+    statement = str(upsert_products_query().compile(dialect=postgresql.dialect()))
+    assert "FROM import_product ON CONFLICT ON CONSTRAINT uq_product_slug" in statement
+    assert "updated_at = now()" in statement
+    assert (
+        "WHERE (product.name, product.description, product.is_digital, "
+        "product.is_active, product.category_id, product.seasonal_id) "
+        "IS DISTINCT FROM (excluded.name" in statement
+    )
+
+
+"""
+- [ ] Test invalid records are skipped and reported by line, the rest are chunked
+"""
+
+
+def test_unit_import_products_skips_invalid_records(merged_chunks):
+    feed = io.StringIO(
+        "\n".join(
+            [
+                ndjson_product("a"),
+                "",
+                '{"slug": "b"}',
+                "not json",
+                ndjson_product("c"),
+                ndjson_product("d"),
+            ]
+        )
+    )
+
+    result = import_products(Session(), feed, "ndjson", chunk_size=2)
+
+    assert [[line for line, _ in chunk] for chunk in merged_chunks] == [[1, 5], [6]]
+    assert result["records"] == 5
+    assert result["products"] == 3
+    assert result["skipped"] == 2
+    assert [error["line"] for error in result["errors"]] == [3, 4]
+    assert result["errors"][0]["detail"] == (
+        "name: Field required; category_id: Field required"
+    )
+
+
+"""
+- [ ] Test a line that is not valid UTF-8 ends the import, earlier records are merged
+"""
+
+
+def test_unit_import_products_undecodable_line(merged_chunks):
+    def lines():
+        yield ndjson_product("a") + "\n"
+        yield ndjson_product("b") + "\n"
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    result = import_products(Session(), lines(), "ndjson")
+
+    assert [[line for line, _ in chunk] for chunk in merged_chunks] == [[1, 2]]
+    assert result["products"] == 2
+    assert result["errors"] == [
+        {
+            "line": 3,
+            "detail": "Feed not read from this line: not valid UTF-8, "
+            "invalid start byte",
+        }
+    ]
+
+
+"""
+- [ ] Test a malformed CSV line ends the import, the product before it is merged
+"""
+
+
+def test_unit_import_products_malformed_csv(merged_chunks):
+    feed = io.StringIO(
+        "slug,name,category_id\na,A,1\nb,B,1\nc,C," + "1" * 200_000 + "\nd,D,1\n"
+    )
+
+    result = import_products(Session(), feed, "csv")
+
+    assert [product.slug for _, product in merged_chunks[0]] == ["a", "b"]
+    assert result["skipped"] == 1
+    assert result["errors"][0]["line"] == 4
+    assert result["errors"][0]["detail"].startswith(
+        "Feed not read from this line: field larger than field limit"
+    )
+
+
+"""
+- [ ] Test a chunk failing in the database is rolled back and reported
+"""
+
+
+def test_unit_import_products_rejected_chunk(monkeypatch):
+    calls = []
+
+    def mock_merge_chunk(db, chunk):
+        raise IntegrityError("INSERT", {}, Exception("duplicate key value\nDETAIL"))
+
+    monkeypatch.setattr("app.utils.product_import.merge_chunk", mock_merge_chunk)
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.rollback", lambda self: calls.append("rollback")
+    )
+    feed = io.StringIO("\n".join([ndjson_product("a"), ndjson_product("b")]))
+
+    result = import_products(Session(), feed, "ndjson")
+
+    assert calls == ["rollback"]
+    assert result["products"] == 0
+    assert result["errors"] == [
+        {"line": 1, "detail": "Chunk not imported: duplicate key value"},
+        {"line": 2, "detail": "Chunk not imported: duplicate key value"},
+    ]
+
+
+"""
+- [ ] Test POST product import streams the uploaded feed
+"""
+
+
+def test_unit_import_product_feed(client, merged_chunks):
+    feed = "\n".join([ndjson_product("a"), ndjson_product("b")])
+
+    response = client.post(
+        "/api/product/import", files={"file": ("feed.ndjson", feed.encode())}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["products"] == 2
+    assert [product.slug for _, product in merged_chunks[0]] == ["a", "b"]
+
+
+"""
+- [ ] Test POST product import reports an upload that is not valid UTF-8
+"""
+
+
+def test_unit_import_product_feed_not_utf8(client, merged_chunks):
+    feed = ndjson_product("a").encode().replace(b"A", b"\xff")
+
+    response = client.post("/api/product/import", files={"file": ("feed.ndjson", feed)})
+
+    assert response.status_code == 200
+    assert response.json()["skipped"] == 1
+    assert response.json()["errors"][0]["line"] == 1
+
+
+"""
+- [ ] Test POST product import rejects a file of unknown format
+"""
+
+
+def test_unit_import_product_feed_unknown_format(client):
+    response = client.post("/api/product/import", files={"file": ("feed.xml", b"")})
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": "Unknown import format, expected one of: .csv, .ndjson, .jsonl"
+    }
@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.pagination import decode_cursor
+from app.utils.product_type_cache import ProductTypeSnapshot, product_type_cache
+from tests.factories.models_factory import get_random_product_dict
+
+# clothing > tops > shirts, clothing > bottoms
+PRODUCT_TYPES = [
+    {"id": 1, "name": "clothing", "level": 1, "parent_id": None},
+    {"id": 2, "name": "bottoms", "level": 2, "parent_id": 1},
+    {"id": 3, "name": "tops", "level": 2, "parent_id": 1},
+    {"id": 4, "name": "shirts", "level": 3, "parent_id": 3},
+]
+
+
+def mock_rows(rows):
+    return SimpleNamespace(mappings=lambda: SimpleNamespace(all=lambda: rows))
+
+
+@pytest.fixture(scope="function")
+def product_type_snapshot(monkeypatch):
+    snapshot = ProductTypeSnapshot(PRODUCT_TYPES)
+    monkeypatch.setattr(product_type_cache, "get", lambda db: snapshot)
+    return snapshot
+
+
+"""
+- [ ] Test the snapshot precomputes ancestors and descendants of every type
+"""
+
+
+def test_unit_product_type_snapshot_maps():
+    snapshot = ProductTypeSnapshot(PRODUCT_TYPES)
+
+    assert snapshot.ancestor_ids == {1: [], 2: [1], 3: [1], 4: [1, 3]}
+    assert snapshot.descendant_ids == {1: [1, 2, 3, 4], 2: [2], 3: [3, 4], 4: [4]}
+
+
+"""
+- [ ] Test a parent_id cycle does not loop forever
+"""
+
+
+def test_unit_product_type_snapshot_cycle():
+    snapshot = ProductTypeSnapshot(
+        [
+            {"id": 1, "name": "a", "level": 1, "parent_id": 2},
+            {"id": 2, "name": "b", "level": 2, "parent_id": 1},
+        ]
+    )
+
+    assert snapshot.ancestor_ids == {1: [1, 2], 2: [2, 1]}
+    assert snapshot.get_subtree(1)["children"][0]["children"] == []
+
+
+"""
+- [ ] Test GET product type tree nests every type under its parent
+"""
+
+
+def test_unit_get_product_type_tree(client, product_type_snapshot):
+    response = client.get("/api/product-type/tree")
+    assert response.status_code == 200
+
+    (clothing,) = response.json()
+    assert [child["name"] for child in clothing["children"]] == ["bottoms", "tops"]
+    assert clothing["children"][1]["children"][0]["name"] == "shirts"
+
+
+"""
+- [ ] Test GET product type subtree and ancestors
+"""
+
+
+def test_unit_get_product_type_subtree_and_ancestors(client, product_type_snapshot):
+    response = client.get("/api/product-type/3/subtree")
+    assert response.status_code == 200
+    assert response.json() == {
+        **PRODUCT_TYPES[2],
+        "children": [{**PRODUCT_TYPES[3], "children": []}],
+    }
+
+    response = client.get("/api/product-type/4/ancestors")
+    assert response.status_code == 200
+    assert response.json() == [PRODUCT_TYPES[0], PRODUCT_TYPES[2]]
+
+
+"""
+- [ ] Test GET product type endpoints when the type does not exist
+"""
+
+
+@pytest.mark.parametrize("path", ["subtree", "ancestors", "products"])
+def test_unit_product_type_not_found(client, product_type_snapshot, path):
+    response = client.get(f"/api/product-type/99/{path}")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Product type not found"}
+
+
+"""
+- [ ] Test GET product type products covers the type and all of its subtypes
+"""
+
+
+@pytest.mark.parametrize(
+    "include_subtypes, product_type_ids", [("true", [3, 4]), ("false", [3])]
+)
+def test_unit_list_product_type_products(
+    client, monkeypatch, product_type_snapshot, include_subtypes, product_type_ids
+):
+    products = [get_random_product_dict(id_) for id_ in range(1, 4)]
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return mock_rows(products)
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get(
+        "/api/product-type/3/products",
+        params={"limit": 2, "include_subtypes": include_subtypes},
+    )
+    assert response.status_code == 200
+    assert response.json()["items"] == products[:2]
+    assert decode_cursor(response.json()["next_cursor"], (int,)) == [2]
+
+    statement = statements[0].compile()
+    assert "product_product_type.product_type_id IN" in str(statement)
+    assert statement.params["product_type_id_1"] == product_type_ids
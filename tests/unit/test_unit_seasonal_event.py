@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.pagination import decode_cursor
+from app.utils.seasonal_schedule import (
+    SeasonalSchedule,
+    get_seasonal_schedule,
+    seasonal_schedule_cache,
+)
+from tests.factories.models_factory import get_random_product_dict
+
+NOW = datetime(2024, 12, 1, 12, 0)
+
+
+def get_event(id_, start_days, end_days):
+    return {
+        "id": id_,
+        "name": f"event-{id_}",
+        "start_date": NOW + timedelta(days=start_days),
+        "end_date": NOW + timedelta(days=end_days),
+    }
+
+
+def mock_rows(rows):
+    return SimpleNamespace(mappings=lambda: SimpleNamespace(all=lambda: rows))
+
+
+@pytest.fixture(scope="function")
+def seasonal_schedule(monkeypatch):
+    schedule = SeasonalSchedule([get_event(1, -1, 2), get_event(2, -3, 5)], None)
+    monkeypatch.setattr(seasonal_schedule_cache, "get", lambda db: schedule)
+    return schedule
+
+
+"""
+- [ ] Test the schedule is valid until the next event starts or ends
+"""
+
+
+def test_unit_seasonal_schedule_next_change():
+    schedule = SeasonalSchedule([get_event(1, -1, 2)], NOW + timedelta(days=1))
+    assert schedule.event_ids == [1]
+    assert schedule.next_change == NOW + timedelta(days=1)
+    assert not schedule.expired(NOW)
+    assert schedule.expired(NOW + timedelta(days=1))
+
+    schedule = SeasonalSchedule([get_event(1, -1, 2)], None)
+    assert schedule.next_change == NOW + timedelta(days=2)
+
+    schedule = SeasonalSchedule([], None)
+    assert schedule.next_change is None
+    assert not schedule.expired(NOW + timedelta(days=1000))
+
+
+"""
+- [ ] Test an expired schedule is rebuilt, a valid one is served from memory
+"""
+
+
+def test_unit_get_seasonal_schedule_rebuilds_when_expired(monkeypatch):
+    schedules = [
+        SeasonalSchedule([], NOW + timedelta(days=1)),
+        SeasonalSchedule([get_event(1, 1, 2)], None),
+    ]
+    invalidations = []
+    monkeypatch.setattr(seasonal_schedule_cache, "get", lambda db: schedules[0])
+    monkeypatch.setattr(
+        seasonal_schedule_cache,
+        "invalidate",
+        lambda: invalidations.append(schedules.pop(0)),
+    )
+
+    class FakeDatetime(datetime):
+        now_value = NOW
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.now_value
+
+    monkeypatch.setattr("app.utils.seasonal_schedule.datetime", FakeDatetime)
+
+    assert get_seasonal_schedule(None).event_ids == []
+    assert invalidations == []
+
+    FakeDatetime.now_value = NOW + timedelta(days=1)
+    assert get_seasonal_schedule(None).event_ids == [1]
+    assert len(invalidations) == 1
+
+
+"""
+- [ ] Test GET active seasonal events is served from the schedule
+"""
+
+
+def test_unit_get_active_seasonal_events(client, monkeypatch, seasonal_schedule):
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", None)
+
+    response = client.get("/api/seasonal-event/active")
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == [1, 2]
+
+
+"""
+- [ ] Test GET active seasonal products only asks for the active event ids
+"""
+
+
+def test_unit_list_active_seasonal_products(client, monkeypatch, seasonal_schedule):
+    products = [get_random_product_dict(id_) for id_ in range(1, 4)]
+    statements = []
+
+    def mock_execute(self, statement, *args, **kwargs):
+        statements.append(statement)
+        return mock_rows(products)
+
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_execute)
+
+    response = client.get("/api/seasonal-event/active/products?limit=2")
+    assert response.status_code == 200
+    assert response.json()["items"] == products[:2]
+    assert decode_cursor(response.json()["next_cursor"], (int,)) == [2]
+
+    statement = statements[0].compile()
+    assert "product.seasonal_id IN" in str(statement)
+    assert statement.params["seasonal_id_1"] == [1, 2]
+
+
+"""
+- [ ] Test GET active seasonal products without a running event skips the query
+"""
+
+
+def test_unit_list_active_seasonal_products_none_active(client, monkeypatch):
+    monkeypatch.setattr(
+        seasonal_schedule_cache, "get", lambda db: SeasonalSchedule([], None)
+    )
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", None)
+
+    response = client.get("/api/seasonal-event/active/products")
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
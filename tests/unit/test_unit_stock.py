@@ -0,0 +1,192 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import db_connection
+from app.schemas.stock_schemas import StockReservationItem
+from app.utils.stock_routes import aggregate_reservation_items, reserve_stock_query
+
+
+def mock_output(return_value=None):
+    return lambda *args, **kwargs: return_value
+
+
+def reservation_row(sku, qty, reserved, available, stock_qty=None):
+    return SimpleNamespace(
+        sku=sku, qty=qty, reserved=reserved, available=available, stock_qty=stock_qty
+    )
+
+
+@pytest.fixture(scope="function")
+def transaction(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.commit", lambda self: calls.append("commit")
+    )
+    monkeypatch.setattr(
+        "sqlalchemy.orm.Session.rollback", lambda self: calls.append("rollback")
+    )
+    return calls
+
+
+"""
+- [ ] Test duplicate skus are reserved once with the summed quantity
+"""
+
+
+def test_unit_aggregate_reservation_items():
+    first, second = uuid4(), uuid4()
+    items = [
+        StockReservationItem(sku=first, qty=2),
+        StockReservationItem(sku=second, qty=1),
+        StockReservationItem(sku=first, qty=3),
+    ]
+    assert aggregate_reservation_items(items) == {first: 5, second: 1}
+
+
+"""
+- [ ] Test the reservation is one conditional update over rows locked in id order
+"""
+
+
+def test_unit_reserve_stock_query():
+    statement = str(
+        reserve_stock_query({uuid4(): 2}).compile(dialect=postgresql.dialect())
+    )
+    assert (
+        "FROM unnest(CAST(%(skus)s AS UUID[]), CAST(%(qtys)s AS INTEGER[])) "
+        "AS requested_values(sku, qty)" in statement
+    )
+    assert "ORDER BY product_line.id FOR UPDATE OF product_line" in statement
+    assert (
+        "UPDATE product_line SET stock_qty=(product_line.stock_qty - locked.qty)"
+        in (statement)
+    )
+    assert "product_line.stock_qty >= locked.qty RETURNING" in statement
+
+
+"""
+- [ ] Test reserve stock query compiles once whatever the number of items
+"""
+
+
+def test_unit_reserve_stock_query_cache_key():
+    one_item = reserve_stock_query({uuid4(): 1})._generate_cache_key()
+    many_items = reserve_stock_query(
+        {uuid4(): 2 for _ in range(30)}
+    )._generate_cache_key()
+    assert one_item is not None
+    assert one_item.key == many_items.key
+
+
+"""
+- [ ] Test POST reserve commits what could be reserved and reports the rest
+"""
+
+
+def test_unit_reserve_stock_partial(client, monkeypatch, transaction):
+    reserved, short, missing = uuid4(), uuid4(), uuid4()
+    rows = [
+        reservation_row(reserved, 3, True, 5, stock_qty=2),
+        reservation_row(short, 9, False, 5),
+        reservation_row(missing, 1, False, None),
+    ]
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_output(rows))
+
+    body = {
+        "items": [
+            {"sku": str(reserved), "qty": 2},
+            {"sku": str(short), "qty": 9},
+            {"sku": str(missing), "qty": 1},
+            {"sku": str(reserved), "qty": 1},
+        ]
+    }
+    response = client.post("/api/stock/reserve", json=body)
+    assert response.status_code == 200
+    assert response.json() == {
+        "reserved": False,
+        "items": [
+            {
+                "sku": str(reserved),
+                "qty": 3,
+                "reserved": True,
+                "stock_qty": 2,
+                "detail": None,
+            },
+            {
+                "sku": str(short),
+                "qty": 9,
+                "reserved": False,
+                "stock_qty": 5,
+                "detail": "Insufficient stock",
+            },
+            {
+                "sku": str(missing),
+                "qty": 1,
+                "reserved": False,
+                "stock_qty": None,
+                "detail": "SKU not found",
+            },
+        ],
+    }
+    assert transaction[0] == "commit"
+
+
+"""
+- [ ] Test POST reserve all or nothing rolls back when any sku is short
+"""
+
+
+def test_unit_reserve_stock_all_or_nothing(client, monkeypatch, transaction):
+    reserved, short = uuid4(), uuid4()
+    rows = [
+        reservation_row(reserved, 2, True, 5, stock_qty=3),
+        reservation_row(short, 9, False, 5),
+    ]
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_output(rows))
+
+    body = {
+        "items": [{"sku": str(reserved), "qty": 2}, {"sku": str(short), "qty": 9}],
+        "all_or_nothing": True,
+    }
+    response = client.post("/api/stock/reserve", json=body)
+    assert response.status_code == 409
+    assert response.json()["reserved"] is False
+    assert [item["reserved"] for item in response.json()["items"]] == [False, False]
+    assert response.json()["items"][0]["stock_qty"] == 5
+    assert transaction[0] == "rollback"
+
+
+"""
+- [ ] Test POST reserve with an empty batch or a non positive quantity
+"""
+
+
+@pytest.mark.parametrize(
+    "items",
+    [[], [{"sku": str(uuid4()), "qty": 0}], [{"sku": "not-a-sku", "qty": 1}]],
+)
+def test_unit_reserve_stock_invalid_items(client, items):
+    response = client.post("/api/stock/reserve", json={"items": items})
+    assert response.status_code == 422
+
+
+"""
+- [ ] Test POST reserve pins the client's reads to the primary
+"""
+
+
+def test_unit_reserve_stock_read_your_writes(client, monkeypatch, transaction):
+    # the reservation is an UPDATE ... RETURNING CTE inside a select()
+    monkeypatch.setattr(db_connection, "replica_engines", [db_connection.engine])
+    sku = uuid4()
+    rows = [reservation_row(sku, 1, True, 5, stock_qty=4)]
+    monkeypatch.setattr("sqlalchemy.orm.Session.execute", mock_output(rows))
+
+    response = client.post(
+        "/api/stock/reserve", json={"items": [{"sku": str(sku), "qty": 1}]}
+    )
+    assert response.status_code == 200
+    assert "db_read_primary=1" in response.headers["set-cookie"]